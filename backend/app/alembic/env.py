@@ -30,6 +30,7 @@ from app.models.core import * # noqa: F401, F403
 from app.models.tag import * # noqa: F401, F403
 from app.models.job import * # noqa: F401, F403
 from app.models.ai import * # noqa: F401, F403
+from app.models.snapshot import * # noqa: F401, F403
 from app.models.base import Base
 
 target_metadata = Base.metadata
@@ -0,0 +1,38 @@
+"""embedding_hnsw_indexes
+
+Revision ID: 5e1b7d3f9a20
+Revises: 9630211f4e88
+Create Date: 2026-10-16 21:42:07.518304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1b7d3f9a20'
+down_revision: Union[str, None] = '9630211f4e88'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same as HNSW_M and HNSW_EF_CONSTRUCTION in app.models.ai at the time of
+# this revision
+HNSW_WITH = {'m': 16, 'ef_construction': 64}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently, outside the migration transaction, so that pages
+    # can still be stored while the indexes are built on a large table
+    with op.get_context().autocommit_block():
+        op.create_index('ix_content_embedding_embedding_hnsw', 'content_embedding', ['embedding'], unique=False, postgresql_using='hnsw', postgresql_with=HNSW_WITH, postgresql_ops={'embedding': 'vector_cosine_ops'}, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_content_chunk_embedding_hnsw', 'content_chunk', ['embedding'], unique=False, postgresql_using='hnsw', postgresql_with=HNSW_WITH, postgresql_ops={'embedding': 'vector_cosine_ops'}, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_content_chunk_embedding_hnsw', table_name='content_chunk', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_content_embedding_embedding_hnsw', table_name='content_embedding', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,41 @@
+"""full_text_search
+
+Revision ID: e3a95c07b218
+Revises: b6c2e8f41d97
+Create Date: 2026-10-16 22:14:46.871530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a95c07b218'
+down_revision: Union[str, None] = 'b6c2e8f41d97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('bookmark', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("setweight(to_tsvector('simple', coalesce(title, '')), 'A') || setweight(to_tsvector('simple', url), 'B') || setweight(to_tsvector('simple', coalesce(description, '')), 'B')", persisted=True), nullable=True))
+    op.add_column('content_embedding', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("setweight(to_tsvector('simple', coalesce(content_preview, '')), 'C')", persisted=True), nullable=True))
+
+    # Built concurrently, outside the migration transaction, like the
+    # embedding indexes
+    with op.get_context().autocommit_block():
+        op.create_index('ix_bookmark_search_vector', 'bookmark', ['search_vector'], unique=False, postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_content_embedding_search_vector', 'content_embedding', ['search_vector'], unique=False, postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_content_embedding_search_vector', table_name='content_embedding', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_bookmark_search_vector', table_name='bookmark', postgresql_concurrently=True, if_exists=True)
+
+    op.drop_column('content_embedding', 'search_vector')
+    op.drop_column('bookmark', 'search_vector')
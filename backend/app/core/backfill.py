@@ -0,0 +1,99 @@
+"""
+Backfill of the passages of pages embedded before passages existed.
+
+The analysis pipeline reuses the previous results of an unchanged page, so
+pages embedded before passage search never get passages on their own. This
+task finds every content embedding without passages, replays the stored
+snapshot of its URL, and embeds the passages if the extracted content still
+matches the embedded content. Pages without a snapshot, or whose snapshot no
+longer matches, are skipped and get passages when they are next analysed.
+Nothing is fetched from the network.
+
+Usage:
+    uv run python -m app.core.backfill [--limit 1000] [--concurrency 4]
+"""
+
+import argparse
+import asyncio
+import json
+from collections import Counter
+
+from sqlalchemy import exists, select
+
+from app.core.jobs import _save_passages
+from app.db import get_db_session_manager
+from app.hashing import generate_content_hash
+from app.models import ContentChunk, ContentEmbedding
+from app.scrapper.page_extractor import PageExtractor, parse_html
+from app.scrapper.snapshots import get_snapshot_store
+
+
+async def pages_without_passages(limit: int | None = None) -> list[tuple[str, str]]:
+    """Return the URL and content hash of every page without passages."""
+    query = (
+        select(ContentEmbedding.url, ContentEmbedding.content_hash)
+        .where(
+            ~exists().where(ContentChunk.content_embedding_id == ContentEmbedding.id)
+        )
+        .order_by(ContentEmbedding.updated_at.desc())
+        .limit(limit)
+    )
+    async with get_db_session_manager().get_session() as session:
+        result = await session.execute(query)
+        return [(url, content_hash) for url, content_hash in result.all()]
+
+
+async def backfill_page(url: str, content_hash: str) -> str:
+    """Embed the passages of one page from its snapshot.
+
+    Returns:
+        The outcome: "embedded", "empty", "no_snapshot", "changed" or "failed".
+    """
+    try:
+        html = await get_snapshot_store().load(url)
+        if html is None:
+            return "no_snapshot"
+        content = PageExtractor(parse_html(html)).extract().markdown
+        if generate_content_hash(content) != content_hash:
+            return "changed"
+        return "embedded" if await _save_passages(url, content) else "empty"
+    except Exception as e:
+        print(f"❌ Error backfilling passages for URL {url}: {e}")
+        return "failed"
+
+
+async def backfill_passages(
+    limit: int | None = None, concurrency: int = 4
+) -> dict[str, int]:
+    """Embed the passages of all pages without them, a few pages at a time.
+
+    Args:
+        limit: Maximum number of pages to process, None for all.
+        concurrency: Pages processed at once; their passages share the
+            batches of the embedding service.
+
+    Returns:
+        The number of pages per outcome.
+    """
+    pages = await pages_without_passages(limit)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(url: str, content_hash: str) -> str:
+        async with semaphore:
+            return await backfill_page(url, content_hash)
+
+    outcomes = await asyncio.gather(*(run(*page) for page in pages))
+    return {"pages": len(pages), **Counter(outcomes)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--limit", type=int, help="maximum number of pages")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(backfill_passages(args.limit, args.concurrency))))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,45 @@
 """Job management functions for scrapper module."""
 
 import asyncio
+import uuid
 from collections.abc import Sequence
+from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 from typing import Any
 
-from pydantic import BaseModel, field_serializer
-from sqlalchemy import select
+from bs4 import BeautifulSoup
+from pydantic import BaseModel, Field, field_serializer
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.pipeline import Stage, StageGraph, wait_for_active
 from app.db import get_db_session_manager
-from app.llm.embeddings import EmbeddingLayer
+from app.hashing import generate_content_hash
+from app.llm.chunking import Chunk, chunk_markdown
+from app.llm.collection_classifier import get_collection_classifier
+from app.llm.embeddings import EmbeddingLayer, get_embedding_service
+from app.llm.metadata_policy import get_publisher_text
 from app.llm.nlp import NLPLayer
+from app.llm.rate_limiter import StallClock, get_llm_rate_limiter
+from app.llm.tag_suggester import TagSuggestion, get_tag_suggester
+from app.llm.topics import get_topic_vocabulary
 from app.models import (
     Bookmark,
     BookmarkAISuggestion,
     Collection,
+    ContentChunk,
     ContentEmbedding,
     Job,
     JobStatus,
 )
 from app.schemas.base import convert_numpy_types
-from app.scrapper.content_extractor import ContentExtractor
+from app.scrapper.page_extractor import PageExtractor, parse_html
+from app.scrapper.scheduler import get_scrape_scheduler
 from app.scrapper.scrapper import Scrapper
+from app.scrapper.snapshots import get_snapshot_store
+from app.settings import get_settings
 
 JOB_TIMEOUT_SECONDS = 600
 
@@ -34,8 +51,11 @@ class AnalysisResults(BaseModel):
     collection: str
     title: str
     tags: list[str]
+    metadata: dict[str, Any] = Field(default_factory=dict)
+    sources: dict[str, str] = Field(default_factory=dict)
+    failed_stages: list[str] = Field(default_factory=list)
 
-    @field_serializer("summary", "collection", "title", "tags")
+    @field_serializer("summary", "collection", "title", "tags", "metadata")
     def serialize_fields(self, value: Any) -> Any:
         """Custom serializer to handle numpy types."""
         return convert_numpy_types(value)
@@ -82,25 +102,24 @@ async def cleanup_orphaned_jobs() -> None:
             print(f"❌ Error cleaning up orphaned jobs: {e}")
 
 
-async def process_url(task_id: str, url: str) -> None:
+async def process_url(task_id: str, url: str, replay: bool = False) -> None:
     """Background task to process URL scraping with timeout.
 
+    No database connection is held while the job waits for the LLM API, the
+    scrape scheduler or the analysis: the job and the collections are loaded
+    up front, and the results are written with a fresh session.
+
     Args:
         task_id (str): Unique identifier for the processing task.
         url (str): The URL to process.
+        replay (bool): Analyze the stored snapshot of the URL instead of
+            fetching it again. Falls back to fetching if there is none.
     """
     session_manager = get_db_session_manager()
-    async with session_manager.get_session() as session:
-        result = await session.execute(
-            select(Job)
-            .where(Job.id == task_id)
-            .options(
-                selectinload(Job.bookmark),
-            )
-        )
-        job = result.scalar_one_or_none()
-        try:
-            # Get the job from database
+    try:
+        async with session_manager.get_session() as session:
+            result = await session.execute(select(Job).where(Job.id == task_id))
+            job = result.scalar_one_or_none()
             if not job:
                 print(f"❌ Job {task_id} not found in database")
                 return
@@ -113,149 +132,529 @@ async def process_url(task_id: str, url: str) -> None:
             await session.commit()
             print(f"⏳ Job {task_id} status updated to PROCESSING")
 
-            # Run URL processing with timeout
-            print(
-                f"🤖 Running analysis for job {task_id} (timeout: {JOB_TIMEOUT_SECONDS}s)"
-            )
+            bookmark_id = job.bookmark_id
+            collections = await session.execute(select(Collection))
+            collections = collections.scalars().all()
 
-            try:
-                collections = await session.execute(select(Collection))
-                collections = collections.scalars().all()
+        # Run URL processing with timeout
+        print(
+            f"🤖 Running analysis for job {task_id} (timeout: {JOB_TIMEOUT_SECONDS}s)"
+        )
 
-                results = await asyncio.wait_for(
-                    _process_url(url, collections), timeout=JOB_TIMEOUT_SECONDS
-                )
-                print(f"🧠 Analysis completed for job {task_id}")
+        try:
+            # New jobs wait while the LLM API is unavailable instead of
+            # scraping pages they cannot analyze
+            await get_llm_rate_limiter().wait_while_open()
+
+            page = await _fetch_url(url, replay=replay)
+            # Time the job's own LLM requests wait for the rate limiter or
+            # its breaker pauses the job rather than counting toward its
+            # timeout
+            clock = StallClock()
+            results = await wait_for_active(
+                clock.track(_process_url)(url, page, collections),
+                JOB_TIMEOUT_SECONDS,
+                clock.seconds,
+            )
+        except asyncio.TimeoutError:
+            print(f"⏰ Job {task_id} timed out after {JOB_TIMEOUT_SECONDS} seconds")
+            await _fail_job(
+                task_id, f"Job timed out after {JOB_TIMEOUT_SECONDS} seconds"
+            )
+            print(f"❌ Job {task_id} marked as FAILED due to timeout")
+            return
+        print(f"🧠 Analysis completed for job {task_id}")
+
+        # Convert results using Pydantic for validation and numpy type conversion
+        analysis_results = AnalysisResults(**results)
+        serializable_results = analysis_results.model_dump()
 
-                # Convert results using Pydantic for validation and numpy type conversion
-                analysis_results = AnalysisResults(**results)
-                serializable_results = analysis_results.model_dump()
+        print(f"📚 Update bookmark with results: {analysis_results}")
 
-                print(f"📚 Update bookmark with results: {analysis_results}")
+        async with session_manager.get_session() as session:
+            bookmark = await session.get(Bookmark, bookmark_id)
 
-                bookmark = await session.get(Bookmark, job.bookmark_id)
+            if not bookmark:
+                print(f"❌ Bookmark {bookmark_id} not found in database")
+                return
 
-                if not bookmark:
-                    print(f"❌ Bookmark {job.bookmark_id} not found in database")
-                    return
+            collection = await session.execute(
+                select(Collection).where(Collection.name == analysis_results.collection)
+            )
+            collection = collection.scalars().first()
 
-                collection = await session.execute(
-                    select(Collection).where(
-                        Collection.name == analysis_results.collection
-                    )
+            if not collection:
+                print(
+                    f"❌ Collection '{analysis_results.collection}' not found. Assigning None."
                 )
-                collection = collection.scalars().first()
-
-                if not collection:
-                    print(
-                        f"❌ Collection '{analysis_results.collection}' not found. Assigning None."
-                    )
-                    # Do not create a new collection, just assign None
-                else:
-                    print(f"📂 Using collection: {collection.name}")
-                    # bookmark.collection_id = collection.id
-
-                print(f"📖 Bookmark ID: {bookmark.id}")
-                print(f"🔖 Bookmark URL: {bookmark.url}")
-                print(f"📝 Bookmark Title: {analysis_results.title}")
-                print(f"📄 Bookmark Description: {analysis_results.summary}")
-                print(f"🏷️ Bookmark Tags: {analysis_results.tags}")
-                # bookmark.collection_id = collection.id
+                # Do not create a new collection, just assign None
+            else:
+                print(f"📂 Using collection: {collection.name}")
+
+            print(f"📖 Bookmark ID: {bookmark.id}")
+            print(f"🔖 Bookmark URL: {bookmark.url}")
+            print(f"📝 Bookmark Title: {analysis_results.title}")
+            print(f"📄 Bookmark Description: {analysis_results.summary}")
+            print(f"🏷️ Bookmark Tags: {analysis_results.tags}")
+            ai_suggestion = await session.get(BookmarkAISuggestion, bookmark_id)
+            if ai_suggestion is None:
                 ai_suggestion = BookmarkAISuggestion(
                     title=analysis_results.title,
                     description=analysis_results.summary,
-                    bookmark_id=job.bookmark_id,
+                    bookmark_id=bookmark_id,
                     collection_id=collection.id if collection else None,
                     tags=analysis_results.tags,
                 )
+            else:
+                ai_suggestion.title = analysis_results.title
+                ai_suggestion.description = analysis_results.summary
+                ai_suggestion.collection_id = collection.id if collection else None
+                ai_suggestion.tags = analysis_results.tags
+            session.add(ai_suggestion)
+
+            # Update job with results
+            job = await session.get(Job, job.id)
+            job.status = JobStatus.COMPLETED
+            job.completed_at = datetime.now(UTC)
+            job.results = serializable_results
+            session.add(job)
+            await session.commit()
+        print(f"🎉 Job {task_id} completed successfully!")
 
-                session.add(ai_suggestion)
-                session.add(bookmark)
-                await session.commit()
-                await session.refresh(ai_suggestion)
-                await session.refresh(bookmark)
+    except Exception as e:
+        print(f"💥 Job {task_id} failed with error: {str(e)}")
+        # Update job with error information
+        await _fail_job(task_id, str(e))
 
-                # Update job with results
-                job.status = JobStatus.COMPLETED
-                job.completed_at = datetime.now(UTC)
-                job.results = serializable_results
-                session.add(job)
-                await session.commit()
-                print(f"🎉 Job {task_id} completed successfully!")
 
-            except asyncio.TimeoutError:
-                print(f"⏰ Job {task_id} timed out after {JOB_TIMEOUT_SECONDS} seconds")
-                job.status = JobStatus.FAILED
-                job.completed_at = datetime.now(UTC)
-                job.error_message = f"Job timed out after {JOB_TIMEOUT_SECONDS} seconds"
-                session.add(job)
-                await session.commit()
-                print(f"❌ Job {task_id} marked as FAILED due to timeout")
-        except Exception as e:
-            print(f"💥 Job {task_id} failed with error: {str(e)}")
-            # Update job with error information
-            if job:
-                job.status = JobStatus.FAILED
-                job.completed_at = datetime.now(UTC)
-                job.error_message = str(e)
-                session.add(job)
-                await session.commit()
-                print(f"❌ Job {task_id} marked as FAILED in database")
+async def _fail_job(task_id: str, error_message: str) -> None:
+    """Mark a job as FAILED with a fresh session."""
+    try:
+        async with get_db_session_manager().get_session() as session:
+            result = await session.execute(select(Job).where(Job.id == task_id))
+            job = result.scalar_one_or_none()
+            if job is None:
+                return
+            job.status = JobStatus.FAILED
+            job.completed_at = datetime.now(UTC)
+            job.error_message = error_message
+            session.add(job)
+            await session.commit()
+        print(f"❌ Job {task_id} marked as FAILED in database")
+    except Exception as e:
+        print(f"❌ Error marking job {task_id} as FAILED: {e}")
+
+
+@dataclass
+class FetchedPage:
+    """A page ready for analysis, with what is known about its last version."""
 
+    soup: BeautifulSoup
+    previous_content_hash: str | None = None
 
-async def _process_url(url: str, collections: Sequence[Collection]) -> dict[str, Any]:
-    """Process a single URL through the complete analysis pipeline.
 
-    This function handles the full scraping and analysis workflow for a given URL,
-    including content fetching, parsing, and comprehensive AI-powered analysis.
+async def _fetch_url(url: str, replay: bool = False) -> FetchedPage:
+    """Fetch a URL once the scrape scheduler grants a slot for its host.
+
+    Time spent waiting in the scheduler queue does not count towards the job
+    timeout; the fetch itself does. The fetched document is saved to the
+    snapshot store so later analyses can replay it.
+
+    If the URL was fetched before, the request is made conditional on the
+    stored ETag and Last-Modified validators. On 304 Not Modified the stored
+    snapshot is used instead.
 
     Args:
-        url (str): The URL to scrape and analyze. Must be a valid HTTP/HTTPS URL.
+        url (str): The URL to fetch. Must be a valid HTTP/HTTPS URL.
+        replay (bool): Load the stored snapshot instead of fetching, if any.
 
     Returns:
-        dict[str, Any]: Analysis results from ScrapperAnalyzer containing
-                       sentiment, summary, topics, meta, and tags data.
+        FetchedPage: The parsed page and the state of its previous version.
 
     Raises:
         ValueError: If the scrapper fails to fetch content from the URL.
-        Exception: If any part of the analysis pipeline fails.
-
-    Note:
-        The process includes:
-        1. Initialize Scrapper with the URL
-        2. Fetch and parse web content using Playwright
-        3. Verify content was successfully retrieved
-        4. Run complete analysis pipeline (NLP, metadata, content extraction)
-        5. Return structured results for further processing
+        asyncio.TimeoutError: If the fetch takes longer than the job timeout.
     """
+    settings = get_settings()
+    snapshot_store = get_snapshot_store()
+
+    if replay:
+        html = await snapshot_store.load(url)
+        if html is not None:
+            print(f"📼 Replaying stored snapshot for URL: {url}")
+            return FetchedPage(soup=parse_html(html))
+        print(f"📼 No snapshot stored for URL: {url}, fetching it")
+
+    previous = await snapshot_store.get_page(url) if settings.SNAPSHOT_ENABLED else None
+
     scrapper = Scrapper(url)
-    await scrapper.fetch()
+    async with get_scrape_scheduler().slot(url):
+        await asyncio.wait_for(
+            scrapper.fetch(
+                etag=previous.etag if previous else None,
+                last_modified=previous.last_modified if previous else None,
+            ),
+            timeout=JOB_TIMEOUT_SECONDS,
+        )
+
+    if scrapper.not_modified and previous:
+        html = await snapshot_store.load(url)
+        if html is not None:
+            print(f"📼 URL not modified since last fetch: {url}")
+            return FetchedPage(
+                soup=parse_html(html),
+                previous_content_hash=previous.content_hash,
+            )
+
+        # The snapshot was evicted, fetch the page unconditionally
+        async with get_scrape_scheduler().slot(url):
+            await asyncio.wait_for(scrapper.fetch(), timeout=JOB_TIMEOUT_SECONDS)
 
     # Ensure soup is not None after fetch
     if scrapper.soup is None:
         raise ValueError("Failed to fetch content from URL")
 
-    content_extractor = ContentExtractor(scrapper.soup)
-    content = content_extractor.extract()
+    if settings.SNAPSHOT_ENABLED and scrapper.html:
+        try:
+            await snapshot_store.save(
+                url,
+                scrapper.html,
+                etag=scrapper.etag,
+                last_modified=scrapper.last_modified,
+            )
+        except Exception as e:
+            print(f"❌ Error saving snapshot for URL {url}: {e}")
+
+    return FetchedPage(
+        soup=scrapper.soup,
+        previous_content_hash=previous.content_hash if previous else None,
+    )
+
+
+async def _process_url(
+    url: str, page: FetchedPage, collections: Sequence[Collection]
+) -> dict[str, Any]:
+    """Process a fetched page through the complete analysis pipeline.
+
+    This function handles the analysis workflow for a given URL, including
+    content extraction and comprehensive AI-powered analysis.
+
+    Args:
+        url (str): The URL the page was fetched from.
+        page (FetchedPage): The page returned by ``_fetch_url``.
+        collections (Sequence[Collection]): Known collections to choose from.
+
+    Returns:
+        dict[str, Any]: Analysis results containing summary, collection,
+                       title, tags, the page metadata, where the title,
+                       summary, collection and tags came from and the
+                       failed steps.
+
+    Raises:
+        RuntimeError: If all AI-powered analysis steps fail.
+
+    Note:
+        The process includes:
+        1. Extract the main content and metadata of the page
+        2. Reuse the previous results if the content is unchanged since the
+           last complete analysis, also when the page answered 304
+        3. Take the title and summary from publisher metadata when usable
+        4. Run the AI-powered analysis (summary, collection, title, tags) and
+           save the content embedding concurrently, each step with a timeout.
+           Steps sending LLM requests start once the rate limiter has
+           capacity, and the time their own requests wait for the limiter
+           does not count toward their timeouts.
+           The passages are embedded once the page embedding is saved, and
+           no analysis step waits for them.
+           In the combined mode a single structured request produces all
+           fields, with the separate requests as a fallback unless the
+           limiter is saturated. The collection
+           comes from the nearest collection centroid of the embedding when
+           the match is clear, and the tags from the vote of the nearest
+           tagged bookmarks when it is confident. Otherwise only the best
+           voted tags are offered to the LLM. Prompts offer the known
+           collections and the generated topics closest to the page
+        5. Return structured results for further processing; failed steps
+           fall back to defaults and are listed in ``failed_stages``
+    """
+    # Content and metadata come from a single walk over the parsed tree
+    extracted = PageExtractor(page.soup).extract()
+    content = extracted.markdown
+    content_hash = generate_content_hash(content)
+
+    if content_hash == page.previous_content_hash:
+        previous_results = await _load_previous_results(url)
+        if previous_results is not None:
+            print(f"♻️ Reusing previous analysis for unchanged content: {url}")
+            return previous_results
 
     collection_names = [collection.name for collection in collections]
 
+    # Editorial title and description of the publisher replace the generated
+    # ones when they are good enough
+    publisher = get_publisher_text(extracted.metadata)
+    sources = {
+        "title": "metadata" if publisher.title else "llm",
+        "summary": "metadata" if publisher.summary else "llm",
+    }
+    if publisher.title or publisher.summary:
+        print(f"🏷️ Using publisher metadata for {url}: {sources}")
+
     nlp = NLPLayer(content)
-    summary = await nlp.summarize()
-    collection = await nlp.collection(collection_names)
-    title = await nlp.title()
-    tags = await nlp.tags()
+    classifier = get_collection_classifier()
+    suggester = get_tag_suggester()
+    vocabulary = get_topic_vocabulary()
+    settings = get_settings()
+    limiter = get_llm_rate_limiter()
+    stage_timeout = settings.ANALYSIS_STAGE_TIMEOUT_SECONDS
+    combined = settings.LLM_ANALYSIS_MODE == "combined"
+    analysis_deps = ("analysis",) if combined else ()
+
+    # Whether fields are requested separately when the combined analysis fails
+    separate_requests = True
+
+    def llm_stage(name: str, func, sends_requests: bool, **kwargs) -> Stage:
+        # Stages sending LLM requests start once the limiter has capacity,
+        # and the time their requests wait for it does not count toward
+        # their timeout
+        clock = StallClock()
+        return Stage(
+            name,
+            clock.track(func),
+            gate=limiter.wait_for_capacity if sends_requests else None,
+            pause_clock=clock.seconds,
+            **kwargs,
+        )
 
-    await _save_embedding(url, content)
+    def check_separate_request(field: str) -> None:
+        if not separate_requests:
+            raise RuntimeError(
+                f"Combined analysis failed, {field} not requested separately "
+                "while the LLM rate limiter is saturated"
+            )
+
+    async def suggest_tags(embedding: list[float] | None = None) -> TagSuggestion:
+        return await suggester.suggest(embedding, exclude_url=url)
+
+    async def suggest_topics(embedding: list[float] | None = None) -> list[str]:
+        # Known collections plus the generated topics closest to the page
+        return collection_names + await vocabulary.relevant(embedding)
+
+    async def analyze(
+        tag_suggestion: TagSuggestion | None = None,
+        topics: list[str] | None = None,
+    ) -> AnalysisResults | None:
+        # One structured request for all fields; None falls back to the
+        # separate per-field requests
+        nonlocal separate_requests
+        candidate_tags = tag_suggestion.candidates if tag_suggestion else None
+        clock = StallClock()
+        try:
+            result = await wait_for_active(
+                clock.track(nlp.analyze)(topics or collection_names, candidate_tags),
+                stage_timeout,
+                clock.seconds,
+            )
+            return AnalysisResults.model_validate(result)
+        except Exception as e:
+            # Separate calls would only add four requests to the queue of a
+            # saturated limiter; the fields fall back to their defaults
+            if limiter.saturated:
+                separate_requests = False
+                print(f"⚠️ Combined analysis failed for {url}, limiter saturated: {e}")
+            else:
+                print(
+                    f"⚠️ Combined analysis failed for {url}, using separate calls: {e}"
+                )
+            return None
+
+    async def summarize(analysis: AnalysisResults | None = None) -> str:
+        if publisher.summary:
+            return publisher.summary
+        if analysis:
+            return analysis.summary
+        check_separate_request("summary")
+        return await nlp.summarize()
+
+    async def classify(
+        analysis: AnalysisResults | None = None,
+        embedding: list[float] | None = None,
+        topics: list[str] | None = None,
+    ) -> str:
+        # The nearest collection centroid decides when the match is clear,
+        # the LLM only otherwise
+        match = await classifier.classify(embedding) if embedding is not None else None
+        if match:
+            sources["collection"] = "centroid"
+            return match.name
+        sources["collection"] = "llm"
+        if analysis:
+            return analysis.collection
+        check_separate_request("collection")
+        return await nlp.collection(topics or collection_names)
+
+    async def title(analysis: AnalysisResults | None = None) -> str:
+        if publisher.title:
+            return publisher.title
+        if analysis:
+            return analysis.title
+        check_separate_request("title")
+        return await nlp.title()
+
+    async def tags(
+        analysis: AnalysisResults | None = None,
+        tag_suggestion: TagSuggestion | None = None,
+    ) -> list[str]:
+        # A clear vote of the nearest tagged bookmarks replaces the LLM
+        if tag_suggestion and tag_suggestion.confident:
+            sources["tags"] = "neighbours"
+            return tag_suggestion.tags
+        sources["tags"] = "llm"
+        if analysis:
+            return analysis.tags
+        check_separate_request("tags")
+        return await nlp.tags(tag_suggestion.candidates if tag_suggestion else None)
+
+    # Independent steps run concurrently; a failed step falls back to its
+    # default instead of failing the whole job
+    stage_list = [
+        llm_stage(
+            "summary",
+            summarize,
+            not combined and not publisher.summary,
+            deps=analysis_deps,
+            timeout=stage_timeout,
+            required=False,
+            default=(extracted.metadata.get("description") or "")[:1024],
+        ),
+        llm_stage(
+            "collection",
+            classify,
+            not combined,
+            deps=analysis_deps,
+            optional_deps=("embedding", "topics"),
+            timeout=stage_timeout,
+            required=False,
+            default="",
+        ),
+        llm_stage(
+            "title",
+            title,
+            not combined and not publisher.title,
+            deps=analysis_deps,
+            timeout=stage_timeout,
+            required=False,
+            default=(extracted.metadata.get("title") or url)[:256],
+        ),
+        llm_stage(
+            "tags",
+            tags,
+            not combined,
+            deps=analysis_deps,
+            optional_deps=("tag_suggestion",),
+            timeout=stage_timeout,
+            required=False,
+            default=[],
+        ),
+        Stage(
+            "embedding",
+            lambda: _save_embedding(url, content),
+            timeout=stage_timeout,
+            required=False,
+        ),
+        # Passages only serve search, no other stage waits for them
+        Stage(
+            "passages",
+            lambda embedding: _save_passages(url, content),
+            deps=("embedding",),
+            timeout=stage_timeout,
+            required=False,
+            default=0,
+        ),
+        Stage(
+            "tag_suggestion",
+            suggest_tags,
+            optional_deps=("embedding",),
+            timeout=stage_timeout,
+            required=False,
+        ),
+        Stage(
+            "topics",
+            suggest_topics,
+            optional_deps=("embedding",),
+            timeout=stage_timeout,
+            required=False,
+        ),
+    ]
+    if combined:
+        stage_list.append(
+            Stage(
+                "analysis",
+                analyze,
+                optional_deps=("tag_suggestion", "topics"),
+                required=False,
+                gate=limiter.wait_for_capacity,
+            )
+        )
+    graph = StageGraph(stage_list)
+    stages = await graph.run()
+    timings = ", ".join(
+        f"{name}={duration:.2f}s" for name, duration in stages.durations.items()
+    )
+    print(f"⏱️ Analysis stages for {url}: {timings}")
+
+    if {"summary", "collection", "title", "tags"} <= set(stages.failed):
+        raise RuntimeError(f"All analysis steps failed: {stages.errors}")
+    if stages.failed:
+        print(f"⚠️ Partial analysis for {url}, failed steps: {stages.errors}")
+
+    # Only recorded once the whole analysis succeeded, so an unchanged hash
+    # always has complete results to reuse
+    if not stages.failed and settings.SNAPSHOT_ENABLED:
+        await get_snapshot_store().set_content_hash(url, content_hash)
 
     return {
-        "summary": summary,
-        "collection": collection,
-        "title": title,
-        "tags": tags,
+        "summary": stages.values["summary"],
+        "collection": stages.values["collection"],
+        "title": stages.values["title"],
+        "tags": stages.values["tags"],
+        "metadata": extracted.metadata,
+        "sources": sources,
+        "failed_stages": stages.failed,
     }
 
 
+async def _load_previous_results(url: str) -> dict[str, Any] | None:
+    """Load the results of the latest completed analysis of a URL.
+
+    Args:
+        url: The URL to look up, possibly bookmarked more than once.
+
+    Returns:
+        The stored analysis results, or None if the URL was never analyzed
+        or its latest analysis was partial.
+    """
+    session_manager = get_db_session_manager()
+    async with session_manager.get_session() as session:
+        result = await session.execute(
+            select(Job.results)
+            .join(Bookmark, Bookmark.id == Job.bookmark_id)
+            .where(
+                Bookmark.url == url,
+                Job.status == JobStatus.COMPLETED,
+                Job.results.is_not(None),
+            )
+            .order_by(Job.completed_at.desc())
+            .limit(1)
+        )
+        results = result.scalar_one_or_none()
+
+    # Partial results are not reused, the failed steps get another chance
+    if results is None or results.get("failed_stages"):
+        return None
+    return results
+
+
 async def _save_embedding(url: str, content: str) -> list[float]:
     """Create an embedding for the given content and save it to the database.
 
@@ -283,22 +682,170 @@ async def _save_embedding(url: str, content: str) -> list[float]:
 
         if existing_embedding:
             print(f"📊 Embedding already exists for URL: {url}")
+            await _link_bookmarks(session, url, existing_embedding.id)
+            await session.commit()
             return existing_embedding.embedding
 
         # Create new embedding
         print(f"🤖 Creating embedding for URL: {url}")
         embedding_vector = await embedding_layer.create_embedding()
 
+        # A changed page replaces the embedding of its URL, so every URL has
+        # one current embedding to search and to build centroids from. Jobs
+        # saving the same URL take turns, so each updates the centroids from
+        # the embedding the previous one saved
+        await session.execute(select(func.pg_advisory_xact_lock(func.hashtext(url))))
+        previous = await session.execute(
+            select(ContentEmbedding.embedding)
+            .where(ContentEmbedding.url == url)
+            .with_for_update()
+        )
+        await get_collection_classifier().replace_embedding(
+            session, url, previous.scalar_one_or_none(), embedding_vector
+        )
+
         # Save to database
-        content_embedding = ContentEmbedding(
+        statement = insert(ContentEmbedding).values(
             url=url,
             content_hash=content_hash,
             content_preview=embedding_layer.get_content_preview(),
             embedding=embedding_vector,
         )
-
-        session.add(content_embedding)
+        result = await session.execute(
+            statement.on_conflict_do_update(
+                index_elements=["url"],
+                set_={
+                    "content_hash": statement.excluded.content_hash,
+                    "content_preview": statement.excluded.content_preview,
+                    "embedding": statement.excluded.embedding,
+                    "updated_at": func.now(),
+                },
+            ).returning(ContentEmbedding.id)
+        )
+        content_embedding_id = result.scalar_one()
+        # Passages of the previous content are stale, _save_passages embeds
+        # the new ones
+        await _replace_chunks(session, content_embedding_id, [])
+        await _link_bookmarks(session, url, content_embedding_id)
         await session.commit()
 
         print(f"💾 Embedding saved for URL: {url}")
         return embedding_vector
+
+
+async def _save_passages(url: str, content: str) -> int:
+    """Embed the passages of a page and save them with its content embedding.
+
+    Pages whose passages are already stored are left alone, so this only
+    embeds new and changed pages and those embedded before passages existed.
+
+    Args:
+        url: The URL of the content, saved by ``_save_embedding`` before
+        content: The Markdown content to split
+
+    Returns:
+        The number of stored passages
+    """
+    content_hash = generate_content_hash(content)
+    session_manager = get_db_session_manager()
+
+    async with session_manager.get_session() as session:
+        content_embedding = await session.scalar(
+            select(ContentEmbedding).where(
+                ContentEmbedding.url == url,
+                ContentEmbedding.content_hash == content_hash,
+            )
+        )
+        if content_embedding is None:
+            return 0
+        stored = await session.scalar(
+            select(func.count(ContentChunk.id)).where(
+                ContentChunk.content_embedding_id == content_embedding.id
+            )
+        )
+        if stored:
+            return stored
+
+        chunks = await _embed_chunks(url, content)
+        await _replace_chunks(session, content_embedding.id, chunks)
+        await session.commit()
+
+    print(f"💾 Saved {len(chunks)} passages for URL: {url}")
+    return len(chunks)
+
+
+async def _embed_chunks(url: str, content: str) -> list[tuple[int, Chunk, list[float]]]:
+    """Split content into passages and embed them.
+
+    Args:
+        url: The URL of the content
+        content: The Markdown content to split
+
+    Returns:
+        The position, passage and embedding of every passage that could be
+        embedded
+    """
+    settings = get_settings()
+    chunks = chunk_markdown(
+        content,
+        max_chars=settings.CHUNK_MAX_CHARS,
+        overlap_chars=settings.CHUNK_OVERLAP_CHARS,
+        max_chunks=settings.CHUNK_MAX_PER_DOCUMENT,
+    )
+    service = get_embedding_service()
+    embeddings = await asyncio.gather(
+        *(service.embed(chunk.embedding_text) for chunk in chunks),
+        return_exceptions=True,
+    )
+
+    embedded = [
+        (position, chunk, embedding)
+        for position, (chunk, embedding) in enumerate(
+            zip(chunks, embeddings, strict=True)
+        )
+        if not isinstance(embedding, BaseException)
+    ]
+    if len(embedded) < len(chunks):
+        print(f"⚠️ {len(chunks) - len(embedded)} passages of {url} were not embedded")
+    return embedded
+
+
+async def _link_bookmarks(
+    session: AsyncSession, url: str, content_embedding_id: uuid.UUID
+) -> None:
+    """Link the bookmarks of a URL to its embedding, to filter search by them."""
+    await session.execute(
+        update(Bookmark)
+        .where(
+            Bookmark.url == url,
+            Bookmark.content_embedding_id.is_distinct_from(content_embedding_id),
+        )
+        .values(content_embedding_id=content_embedding_id)
+    )
+
+
+async def _replace_chunks(
+    session: AsyncSession,
+    content_embedding_id: uuid.UUID,
+    chunks: list[tuple[int, Chunk, list[float]]],
+) -> None:
+    """Replace the stored passages of a content embedding."""
+    await session.execute(
+        delete(ContentChunk).where(
+            ContentChunk.content_embedding_id == content_embedding_id
+        )
+    )
+    if chunks:
+        await session.execute(
+            insert(ContentChunk),
+            [
+                {
+                    "content_embedding_id": content_embedding_id,
+                    "position": position,
+                    "heading": chunk.heading,
+                    "text": chunk.text,
+                    "embedding": embedding,
+                }
+                for position, chunk, embedding in chunks
+            ],
+        )
@@ -0,0 +1,199 @@
+"""
+End-to-end load test of the analysis pipeline against the local LLM stand-in.
+
+Runs the analysis of synthetic pages as concurrent jobs with the fake LLM
+provider, so throughput and queueing can be measured under controlled LLM
+latency, server errors and rate limiting. Fetching is skipped; everything
+after it (extraction, LLM requests through the rate limiter and batcher,
+embeddings, database access) runs as in production, so it needs a scratch
+database on the configured server, migrated to the latest revision. It refuses
+to run against the configured database, and deletes the page embeddings and
+topics it wrote when it is done.
+
+Usage:
+    uv run python -m app.core.loadtest --database loadtest [--jobs 200]
+        [--concurrency 50] [--latency-ms 500] [--error-rate 0.0]
+        [--rate-limit-rate 0.0] [--requests-per-minute 0]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+import uuid
+from typing import Any
+
+from sqlalchemy import delete, select
+
+from app.core.jobs import FetchedPage, _process_url
+from app.db import get_db_session_manager
+from app.llm.provider import get_llm_provider
+from app.llm.rate_limiter import get_llm_rate_limiter
+from app.metrics.registry import get_metrics_registry
+from app.models import ContentEmbedding, Topic
+from app.scrapper.page_extractor import parse_html
+from app.settings import get_settings
+
+URL_PREFIX = "https://loadtest.invalid/"
+
+
+def generate_page(index: int) -> str:
+    """Generate a unique article-like HTML page."""
+    marker = uuid.uuid4().hex
+    paragraphs = "".join(
+        f"<p>Paragraph {i} of article {index} ({marker}) about distributed "
+        f"systems, caching strategies and benchmark methodology.</p>"
+        for i in range(20)
+    )
+    return (
+        f"<html><head><title>Article {index}</title></head>"
+        f"<body><main><h1>Article {index}</h1>{paragraphs}</main></body></html>"
+    )
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def topic_names() -> set[str]:
+    """Names of the topics in the vocabulary."""
+    async with get_db_session_manager().get_session() as session:
+        result = await session.execute(select(Topic.name))
+        return set(result.scalars().all())
+
+
+async def cleanup(known_topics: set[str]) -> None:
+    """Delete the page embeddings with their passages and the topics the
+    load test added."""
+    async with get_db_session_manager().get_session() as session:
+        await session.execute(
+            delete(ContentEmbedding).where(ContentEmbedding.url.startswith(URL_PREFIX))
+        )
+        await session.execute(delete(Topic).where(Topic.name.not_in(known_topics)))
+        await session.commit()
+
+
+async def run(jobs: int, concurrency: int) -> dict[str, Any]:
+    """Run the jobs, at most ``concurrency`` at a time, and collect timings."""
+    provider = get_llm_provider()
+    limiter = get_llm_rate_limiter()
+    slots = asyncio.Semaphore(concurrency)
+    queue_waits: list[float] = []
+    durations: list[float] = []
+    failures = 0
+    peak = {"requests_waiting": 0, "tokens_waiting": 0}
+
+    async def job(index: int) -> None:
+        nonlocal failures
+        submitted = time.perf_counter()
+        async with slots:
+            started = time.perf_counter()
+            queue_waits.append(started - submitted)
+            url = f"{URL_PREFIX}{index}"
+            try:
+                page = FetchedPage(soup=parse_html(generate_page(index)))
+                results = await _process_url(url, page, [])
+                if results["failed_stages"]:
+                    failures += 1
+            except Exception as e:
+                print(f"❌ Job {index} failed: {e}")
+                failures += 1
+            durations.append(time.perf_counter() - started)
+
+    async def sample() -> None:
+        while True:
+            peak["requests_waiting"] = max(
+                peak["requests_waiting"], limiter.requests.waiting
+            )
+            peak["tokens_waiting"] = max(peak["tokens_waiting"], limiter.tokens.waiting)
+            await asyncio.sleep(0.05)
+
+    known_topics = await topic_names()
+    sampler = asyncio.create_task(sample())
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(job(index) for index in range(jobs)))
+    finally:
+        elapsed = time.perf_counter() - start
+        sampler.cancel()
+        await provider.aclose()
+        await cleanup(known_topics)
+
+    return {
+        "jobs": jobs,
+        "concurrency": concurrency,
+        "failed_jobs": failures,
+        "elapsed_seconds": round(elapsed, 2),
+        "jobs_per_second": round(jobs / elapsed, 2),
+        "job_seconds": {
+            "mean": round(statistics.mean(durations), 3),
+            "p50": round(percentile(durations, 0.5), 3),
+            "p95": round(percentile(durations, 0.95), 3),
+            "max": round(max(durations), 3),
+        },
+        "queue_wait_seconds": {
+            "p50": round(percentile(queue_waits, 0.5), 3),
+            "p95": round(percentile(queue_waits, 0.95), 3),
+            "max": round(max(queue_waits), 3),
+        },
+        "peak_limiter_waiting": peak,
+        "metrics": get_metrics_registry().snapshot(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--database",
+        required=True,
+        help="scratch database on the configured server, not POSTGRES_DB",
+    )
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=int, default=500)
+    parser.add_argument("--latency-jitter-ms", type=int, default=100)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--requests-per-minute",
+        type=int,
+        help="client-side request limit, zero to disable (default: settings)",
+    )
+    parser.add_argument(
+        "--cache", action="store_true", help="keep the LLM response cache enabled"
+    )
+    args = parser.parse_args()
+    if args.database == get_settings().POSTGRES_DB:
+        parser.error(
+            f"--database must name a scratch database, not the configured "
+            f"database '{args.database}'"
+        )
+
+    # Settings are read lazily, so the provider and the database are switched
+    # before first use
+    os.environ.update(
+        {
+            "POSTGRES_DB": args.database,
+            "LLM_PROVIDER": "fake",
+            "LLM_FAKE_LATENCY_MS": str(args.latency_ms),
+            "LLM_FAKE_LATENCY_JITTER_MS": str(args.latency_jitter_ms),
+            "LLM_FAKE_ERROR_RATE": str(args.error_rate),
+            "LLM_FAKE_RATE_LIMIT_RATE": str(args.rate_limit_rate),
+            "LLM_FAKE_SEED": str(args.seed),
+            "LLM_CACHE_ENABLED": str(args.cache).lower(),
+        }
+    )
+    if args.requests_per_minute is not None:
+        os.environ["LLM_REQUESTS_PER_MINUTE"] = str(args.requests_per_minute)
+    get_settings.cache_clear()
+
+    report = asyncio.run(run(args.jobs, args.concurrency))
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
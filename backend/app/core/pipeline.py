@@ -0,0 +1,252 @@
+"""
+Dependency-aware concurrent execution of analysis stages.
+
+Each stage declares the stages it depends on and starts as soon as they are
+done, so independent remote calls run together instead of one after another.
+Every stage has its own timeout; a failed or timed-out optional stage yields
+its default value, and the stages depending on it are skipped the same way,
+so one slow call does not fail the whole job. Stages that can do without a
+result declare it as an optional dependency and receive the default instead.
+
+Stages calling a rate limited API can wait at a gate until the API has
+capacity, and leave the time their own requests wait for the rate limiter out
+of their timeout, so queueing behind other jobs does not time a stage out.
+Requests to an API that stays down are failed by the rate limiter itself.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class StageError(Exception):
+    """Raised when a required stage fails."""
+
+    def __init__(self, stage: str, error: BaseException) -> None:
+        super().__init__(f"Stage '{stage}' failed: {error!r}")
+        self.stage = stage
+        self.error = error
+
+
+@dataclass
+class Stage:
+    """A step of the stage graph.
+
+    Attributes:
+        name: Unique name of the stage, also the key of its result.
+        func: Coroutine function called with the results of its dependencies
+            as keyword arguments named after them.
+        deps: Names of the stages whose results this stage needs.
+        optional_deps: Names of the stages whose results this stage uses if
+            available; it receives their defaults when they fail.
+        timeout: Seconds the stage may run, or None for no limit.
+        required: Whether a failure of this stage fails the whole graph.
+        default: Result used when an optional stage fails or is skipped.
+        gate: Coroutine function awaited once the dependencies are done and
+            before the stage starts, e.g. until a rate limiter has capacity.
+            The wait is limited by its own ``timeout``, and a failed or
+            timed-out gate fails the stage like its function would.
+        pause_clock: Function returning the seconds the stage's work was
+            paused from outside, e.g. ``StallClock.seconds``. Time it counts
+            while the stage runs extends the timeout.
+    """
+
+    name: str
+    func: Callable[..., Awaitable[Any]]
+    deps: tuple[str, ...] = ()
+    optional_deps: tuple[str, ...] = ()
+    timeout: float | None = None
+    required: bool = True
+    default: Any = None
+    gate: Callable[[], Awaitable[None]] | None = None
+    pause_clock: Callable[[], float] | None = None
+
+
+@dataclass
+class StageResults:
+    """Results of a stage graph run, including partial failures."""
+
+    values: dict[str, Any] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+    durations: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def failed(self) -> list[str]:
+        """Names of the stages that failed, timed out or were skipped."""
+        return list(self.errors)
+
+
+class StageGraph:
+    """Runs stages concurrently in dependency order.
+
+    Example:
+        ```python
+        graph = StageGraph(
+            [
+                Stage("summary", nlp.summarize, timeout=60, required=False, default=""),
+                Stage("embedding", embed, timeout=60),
+                Stage("tags", suggest_tags, deps=("embedding",), default=[]),
+            ]
+        )
+        results = await graph.run()
+        print(results.values["summary"], results.failed)
+        ```
+    """
+
+    def __init__(self, stages: list[Stage]) -> None:
+        """Validate the stages and their dependencies.
+
+        Args:
+            stages: The stages of the graph, in any order.
+
+        Raises:
+            ValueError: If stage names repeat, a dependency is unknown or the
+                dependencies form a cycle.
+        """
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique")
+        for stage in stages:
+            unknown = {*stage.deps, *stage.optional_deps} - set(self.stages)
+            if unknown:
+                raise ValueError(
+                    f"Stage '{stage.name}' depends on unknown stages {sorted(unknown)}"
+                )
+        self._check_acyclic()
+
+    async def run(self) -> StageResults:
+        """Run all stages, each as soon as its dependencies are done.
+
+        Returns:
+            StageResults: Values of all stages and the errors of failed ones.
+
+        Raises:
+            StageError: If a required stage fails. The remaining stages are
+                cancelled.
+        """
+        results = StageResults()
+        tasks: dict[str, asyncio.Task[Any]] = {}
+
+        async def run_stage(stage: Stage) -> Any:
+            deps = (*stage.deps, *stage.optional_deps)
+            if deps:
+                await asyncio.gather(*(tasks[dep] for dep in deps))
+            failed_deps = [dep for dep in stage.deps if dep in results.errors]
+            if failed_deps:
+                return self._fail(
+                    stage,
+                    results,
+                    RuntimeError(f"Skipped, dependencies failed: {failed_deps}"),
+                )
+
+            kwargs = {dep: results.values[dep] for dep in deps}
+            start = time.perf_counter()
+            try:
+                if stage.gate is not None:
+                    await asyncio.wait_for(stage.gate(), stage.timeout)
+                value = await wait_for_active(
+                    stage.func(**kwargs), stage.timeout, stage.pause_clock
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                return self._fail(stage, results, e)
+            finally:
+                results.durations[stage.name] = time.perf_counter() - start
+
+            results.values[stage.name] = value
+            return value
+
+        for name, stage in self.stages.items():
+            tasks[name] = asyncio.create_task(run_stage(stage), name=f"stage-{name}")
+
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+        return results
+
+    @staticmethod
+    def _fail(stage: Stage, results: StageResults, error: BaseException) -> Any:
+        """Record a stage failure and fall back to its default value."""
+        if stage.required:
+            raise StageError(stage.name, error)
+        if isinstance(error, asyncio.TimeoutError):
+            message = f"Timed out after {stage.timeout} seconds"
+        else:
+            message = str(error) or type(error).__name__
+        logger.warning(f"Stage '{stage.name}' failed, using default: {message}")
+        results.errors[stage.name] = message
+        results.values[stage.name] = stage.default
+        return stage.default
+
+    def _check_acyclic(self) -> None:
+        """Raise ValueError if the dependencies contain a cycle."""
+        visiting: set[str] = set()
+        done: set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Stage dependencies form a cycle at '{name}'")
+            visiting.add(name)
+            stage = self.stages[name]
+            for dep in (*stage.deps, *stage.optional_deps):
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+
+async def wait_for_active(
+    awaitable: Awaitable[T],
+    timeout: float | None,
+    pause_clock: Callable[[], float] | None = None,
+) -> T:
+    """Wait for an awaitable like ``asyncio.wait_for``, not counting pauses.
+
+    Args:
+        awaitable: The awaitable to wait for.
+        timeout: Seconds it may run, or None for no limit.
+        pause_clock: Function returning the seconds work was paused from
+            outside; the time it counts while waiting extends the timeout.
+
+    Returns:
+        The result of the awaitable.
+
+    Raises:
+        asyncio.TimeoutError: If the awaitable ran longer than ``timeout``
+            plus the paused time. It is cancelled.
+    """
+    if timeout is None or pause_clock is None:
+        return await asyncio.wait_for(awaitable, timeout)
+
+    task = asyncio.ensure_future(awaitable)
+    paused_before = pause_clock()
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            paused = pause_clock() - paused_before
+            remaining = deadline + paused - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            done, _ = await asyncio.wait({task}, timeout=remaining)
+            if done:
+                return task.result()
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
@@ -244,6 +244,47 @@ async def create_bookmark(
     return BookmarkPublic.model_validate(bookmark)
 
 
+@router.post(
+    "/bookmarks/{bookmark_id}/reanalyze/",
+    response_model=BookmarkPublic,
+    tags=["ai"],
+)
+async def reanalyze_bookmark(
+    bookmark_id: uuid.UUID,
+    bookmark_repository: BookmarkRepositoryDep,
+    session: DbSessionDep,
+    background_tasks: BackgroundTasks,
+):
+    """Re-run the AI analysis of a bookmark from its stored HTML snapshot."""
+    bookmark = await bookmark_repository.get_by_id(bookmark_id)
+    if bookmark is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail=f'Bookmark with id "{bookmark_id}" not found',
+        )
+
+    existing_job = await session.execute(
+        select(Job).where(Job.bookmark_id == bookmark.id)
+    )
+    job = existing_job.scalar_one_or_none()
+    if job and job.status in (JobStatus.PENDING, JobStatus.PROCESSING):
+        raise HTTPException(
+            status_code=HTTPStatus.CONFLICT,
+            detail=f'Bookmark with id "{bookmark_id}" is already being analyzed',
+        )
+    if not job:
+        job = Job(bookmark_id=bookmark.id)
+    job.status = JobStatus.PENDING
+    job.error_message = None
+    job.completed_at = None
+    session.add(job)
+    await session.commit()
+    await session.refresh(job)
+    background_tasks.add_task(process_url, str(job.id), bookmark.url, replay=True)
+
+    return BookmarkPublic.model_validate(bookmark)
+
+
 @router.delete("/bookmarks/{bookmark_id}/", tags=["bookmarks"])
 async def delete_bookmark(
     bookmark_id: uuid.UUID, bookmark_repository: BookmarkRepositoryDep
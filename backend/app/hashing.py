@@ -0,0 +1,6 @@
+import hashlib
+
+
+def generate_content_hash(content: str) -> str:
+    """Generate SHA-256 hash of content for deduplication."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
@@ -0,0 +1,139 @@
+"""
+Micro-batching of concurrent requests.
+
+Requests submitted within a short window are collected and handed to a
+batch handler together, so many concurrent callers share one round-trip.
+Each request waits for its own result; requests are only batched together
+when they share a key, e.g. the same prompt parameters.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+BatchHandler = Callable[[Hashable, list[T]], Awaitable[list[R | BaseException]]]
+
+
+class MicroBatcher(Generic[T, R]):
+    """Collects requests for a short window and processes them as a batch.
+
+    A batch is flushed once it reaches ``max_batch_size`` items or when the
+    window started by its first item ends. The handler returns one result per
+    item, in order; an exception in place of a result fails only that item.
+
+    Example:
+        ```python
+        async def handle(key, texts):
+            return [text.upper() for text in texts]
+
+        batcher = MicroBatcher(handle, max_batch_size=8, max_wait_ms=50)
+        results = await asyncio.gather(
+            batcher.submit("default", "a"), batcher.submit("default", "b")
+        )
+        ```
+    """
+
+    def __init__(
+        self,
+        handler: BatchHandler[T, R],
+        max_batch_size: int = 8,
+        max_wait_ms: int = 200,
+    ) -> None:
+        """Initialize the batcher.
+
+        Args:
+            handler: Coroutine function processing a batch of items that
+                share a key.
+            max_batch_size: Maximum number of items per batch.
+            max_wait_ms: Time the first item of a batch waits for others.
+        """
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending: dict[Hashable, list[tuple[T, asyncio.Future[R]]]] = {}
+        self._timers: dict[Hashable, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._batch_sizes: Counter[int] = Counter()
+
+    async def submit(self, key: Hashable, item: T) -> R:
+        """Add an item to the batch of its key and wait for its result.
+
+        Args:
+            key: Items are only batched with items of an equal key.
+            item: The item to process.
+
+        Returns:
+            The handler's result for the item.
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[R] = loop.create_future()
+        pending = self._pending.setdefault(key, [])
+        pending.append((item, future))
+
+        if len(pending) >= self.max_batch_size:
+            self._flush(key)
+        elif len(pending) == 1:
+            self._timers[key] = loop.call_later(
+                self.max_wait_ms / 1000, self._flush, key
+            )
+
+        return await future
+
+    def stats(self) -> dict[str, Any]:
+        """Return the number of batches, items and the batch size histogram."""
+        batches = sum(self._batch_sizes.values())
+        items = sum(size * count for size, count in self._batch_sizes.items())
+        return {
+            "batches": batches,
+            "items": items,
+            "avg_batch_size": items / batches if batches else 0.0,
+            "batch_sizes": dict(sorted(self._batch_sizes.items())),
+            "pending": sum(len(pending) for pending in self._pending.values()),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+        }
+
+    def _flush(self, key: Hashable) -> None:
+        """Hand the pending items of a key to the handler."""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, [])
+        if not batch:
+            return
+
+        self._batch_sizes[len(batch)] += 1
+        task = asyncio.create_task(self._run(key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(
+        self, key: Hashable, batch: list[tuple[T, asyncio.Future[R]]]
+    ) -> None:
+        """Run the handler and resolve the futures of the batch."""
+        items = [item for item, _ in batch]
+        try:
+            results = await self.handler(key, items)
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"Batch handler returned {len(results)} results for {len(items)} items"
+                )
+        except Exception as e:
+            logger.error(f"Batch of {len(items)} items failed: {e}")
+            results = [e] * len(items)
+
+        for (_, future), result in zip(batch, results, strict=True):
+            if future.done():
+                # The caller was cancelled while waiting
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
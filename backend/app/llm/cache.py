@@ -0,0 +1,264 @@
+"""
+Persistent cache of LLM responses.
+
+Identical prompts come up again and again, e.g. for a URL bookmarked by
+several users or re-submitted without changes. Responses are stored in
+Postgres under a key made of the model, the prompt template and its version,
+and a hash of the document and response schema. The candidate topics and tags
+offered in a prompt are not part of the key, as they change with every new
+bookmark. Entries expire after a TTL; beyond the
+maximum number of entries or the maximum total size of the responses the
+least recently used ones are evicted, together with entries of outdated
+template versions.
+"""
+
+import logging
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import and_, delete, func, not_, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db import DbSessionManager, get_db_session_manager
+from app.hashing import generate_content_hash
+from app.llm.prompts import PROMPT_TEMPLATES, PromptTemplate
+from app.metrics.registry import get_metrics_registry
+from app.models import LLMCacheEntry
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """Stores LLM responses by model, template version and input.
+
+    Example:
+        ```python
+        cache = get_llm_cache()
+        input_hash = cache.input_hash(text)
+        key = cache.key("gemini-2.0-flash", SUMMARY_PROMPT, input_hash)
+        response = await cache.get(key)
+        if response is None:
+            response = await client.generate(task, text)
+            await cache.set(key, "gemini-2.0-flash", SUMMARY_PROMPT, input_hash, response)
+        ```
+    """
+
+    def __init__(
+        self,
+        session_manager: DbSessionManager,
+        ttl_days: int = 30,
+        max_entries: int = 100_000,
+        max_size_bytes: int = 256 * 1024 * 1024,
+        prune_every: int = 500,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            session_manager: Database session manager to store entries with.
+            ttl_days: Days after which an entry expires. Zero disables expiry.
+            max_entries: Maximum number of entries kept. Zero disables the
+                limit.
+            max_size_bytes: Maximum total size of the cached responses in
+                bytes. Zero disables the limit.
+            prune_every: Number of stored entries between two eviction runs.
+        """
+        self.session_manager = session_manager
+        self.ttl_days = ttl_days
+        self.max_entries = max_entries
+        self.max_size_bytes = max_size_bytes
+        self.prune_every = prune_every
+        self._writes = 0
+        self._counters = {"hits": 0, "misses": 0, "writes": 0, "evicted": 0}
+
+    @staticmethod
+    def input_hash(*inputs: Any) -> str:
+        """Hash the inputs answers depend on, e.g. the document and schema."""
+        return generate_content_hash("\0".join(repr(value) for value in inputs))
+
+    @staticmethod
+    def key(model: str, template: PromptTemplate, input_hash: str) -> str:
+        """Build the cache key of a request.
+
+        Args:
+            model: Name of the model answering the request.
+            template: Template the task instructions were rendered from.
+            input_hash: Hash of the inputs, from ``input_hash``.
+
+        Returns:
+            str: SHA-256 based key.
+        """
+        return generate_content_hash(
+            f"{model}\0{template.name}\0{template.version}\0{input_hash}"
+        )
+
+    async def get(self, key: str) -> str | None:
+        """Look up a cached response and mark it as recently used.
+
+        Args:
+            key: Key built with ``key``.
+
+        Returns:
+            The cached response, or None on a miss or an expired entry.
+        """
+        async with self.session_manager.get_session() as session:
+            query = select(LLMCacheEntry.response).where(LLMCacheEntry.key == key)
+            if self.ttl_days > 0:
+                query = query.where(LLMCacheEntry.created_at >= self._expiry())
+            response = await session.scalar(query)
+            if response is None:
+                self._counters["misses"] += 1
+                return None
+
+            await session.execute(
+                update(LLMCacheEntry)
+                .where(LLMCacheEntry.key == key)
+                .values(last_accessed_at=datetime.now(UTC))
+            )
+            await session.commit()
+
+        self._counters["hits"] += 1
+        return response
+
+    async def set(
+        self,
+        key: str,
+        model: str,
+        template: PromptTemplate,
+        input_hash: str,
+        response: str,
+    ) -> None:
+        """Store a response, replacing any previous entry with the same key.
+
+        Args:
+            key: Key built with ``key``.
+            model: Name of the model that answered.
+            template: Template the task instructions were rendered from.
+            input_hash: Hash of the inputs, from ``input_hash``.
+            response: The model's response.
+        """
+        now = datetime.now(UTC)
+        values = {
+            "model": model,
+            "template": template.name,
+            "template_version": template.version,
+            "input_hash": input_hash,
+            "response": response,
+            "size": len(response.encode()),
+            "created_at": now,
+            "last_accessed_at": now,
+        }
+        async with self.session_manager.get_session() as session:
+            await session.execute(
+                insert(LLMCacheEntry)
+                .values(key=key, **values)
+                .on_conflict_do_update(index_elements=["key"], set_=values)
+            )
+            await session.commit()
+
+        self._counters["writes"] += 1
+        self._writes += 1
+        if self.prune_every and self._writes % self.prune_every == 0:
+            await self.prune()
+
+    async def prune(self) -> int:
+        """Evict expired, outdated and least recently used entries.
+
+        Returns:
+            The number of evicted entries.
+        """
+        evicted = 0
+        async with self.session_manager.get_session() as session:
+            current_versions = [
+                and_(
+                    LLMCacheEntry.template == template.name,
+                    LLMCacheEntry.template_version == template.version,
+                )
+                for template in PROMPT_TEMPLATES.values()
+            ]
+            result = await session.execute(
+                delete(LLMCacheEntry).where(not_(or_(*current_versions)))
+            )
+            evicted += result.rowcount
+
+            if self.ttl_days > 0:
+                result = await session.execute(
+                    delete(LLMCacheEntry).where(
+                        LLMCacheEntry.created_at < self._expiry()
+                    )
+                )
+                evicted += result.rowcount
+
+            if self.max_entries > 0:
+                ranked = select(
+                    LLMCacheEntry.key,
+                    func.row_number()
+                    .over(order_by=LLMCacheEntry.last_accessed_at.desc())
+                    .label("rank"),
+                ).subquery()
+                result = await session.execute(
+                    delete(LLMCacheEntry).where(
+                        LLMCacheEntry.key.in_(
+                            select(ranked.c.key).where(ranked.c.rank > self.max_entries)
+                        )
+                    )
+                )
+                evicted += result.rowcount
+
+            if self.max_size_bytes > 0:
+                # Total size of each entry and all more recently used ones
+                ranked = select(
+                    LLMCacheEntry.key,
+                    func.sum(LLMCacheEntry.size)
+                    .over(
+                        order_by=LLMCacheEntry.last_accessed_at.desc(),
+                        rows=(None, 0),
+                    )
+                    .label("total_size"),
+                ).subquery()
+                result = await session.execute(
+                    delete(LLMCacheEntry).where(
+                        LLMCacheEntry.key.in_(
+                            select(ranked.c.key).where(
+                                ranked.c.total_size > self.max_size_bytes
+                            )
+                        )
+                    )
+                )
+                evicted += result.rowcount
+
+            await session.commit()
+
+        self._counters["evicted"] += evicted
+        if evicted:
+            logger.info(f"Evicted {evicted} LLM cache entries")
+        return evicted
+
+    def stats(self) -> dict[str, Any]:
+        """Return the hit, miss, write and eviction counters."""
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            **self._counters,
+            "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+            "ttl_days": self.ttl_days,
+            "max_entries": self.max_entries,
+            "max_size_bytes": self.max_size_bytes,
+        }
+
+    def _expiry(self) -> datetime:
+        return datetime.now(UTC) - timedelta(days=self.ttl_days)
+
+
+@lru_cache
+def get_llm_cache() -> LLMCache:
+    settings = get_settings()
+    cache = LLMCache(
+        get_db_session_manager(),
+        ttl_days=settings.LLM_CACHE_TTL_DAYS,
+        max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+        max_size_bytes=settings.LLM_CACHE_MAX_SIZE_MB * 1024 * 1024,
+        prune_every=settings.LLM_CACHE_PRUNE_EVERY,
+    )
+    get_metrics_registry().register("llm_cache", cache.stats)
+    return cache
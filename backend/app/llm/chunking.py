@@ -0,0 +1,225 @@
+"""
+Heading-aware splitting of Markdown content into overlapping passages.
+
+The embedding model only reads the first few hundred tokens of its input, so
+long pages are split into passages that each fit, and embedded separately.
+Passages never cross a heading and carry the path of headings above them,
+e.g. "Installation > Linux", which is embedded with the passage text so that
+a passage keeps the context of its section. Consecutive passages of a
+section overlap, so a sentence at a boundary is searchable with its
+surroundings.
+"""
+
+import re
+from dataclasses import dataclass
+
+ATX_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+SETEXT_UNDERLINE = re.compile(r"^(=+|-+)\s*$")
+FENCE = re.compile(r"^\s*(```|~~~)")
+# Lines starting a list item, quote or fence, which are not paragraph text
+BLOCK_START = re.compile(r"^\s{0,3}([-*+](\s|$)|\d{1,9}[.)](\s|$)|>|```|~~~)")
+INDENTED_CODE = re.compile(r"^( {4}|\t)")
+
+HEADING_SEPARATOR = " > "
+MAX_HEADING_LENGTH = 1024
+
+
+@dataclass
+class Chunk:
+    """Passage of a document.
+
+    Attributes:
+        heading: Path of the headings above the passage, may be empty.
+        text: Text of the passage.
+    """
+
+    heading: str
+    text: str
+
+    @property
+    def embedding_text(self) -> str:
+        """Text to embed, the passage prefixed with its headings."""
+        return f"{self.heading}\n\n{self.text}" if self.heading else self.text
+
+
+def chunk_markdown(
+    markdown: str,
+    max_chars: int = 1000,
+    overlap_chars: int = 200,
+    max_chunks: int = 64,
+) -> list[Chunk]:
+    """Split Markdown into overlapping passages that do not cross headings.
+
+    Args:
+        markdown: Markdown content of a page.
+        max_chars: Maximum length of a passage, without its headings.
+        overlap_chars: Text repeated from the end of the previous passage of
+            the same section.
+        max_chunks: Maximum number of passages, the rest of the document is
+            dropped.
+
+    Returns:
+        The passages in document order.
+    """
+    chunks: list[Chunk] = []
+    for heading, blocks in _sections(markdown):
+        chunks.extend(
+            Chunk(heading, text) for text in _pack(blocks, max_chars, overlap_chars)
+        )
+        if len(chunks) >= max_chunks:
+            break
+    return chunks[:max_chunks]
+
+
+def _sections(markdown: str) -> list[tuple[str, list[str]]]:
+    """Group the blocks of a document by the headings above them.
+
+    Blocks are paragraphs, lists and code blocks, separated by blank lines;
+    blank lines inside fenced code do not separate blocks.
+    """
+    sections: list[tuple[str, list[str]]] = []
+    headings: list[tuple[int, str]] = []
+    blocks: list[str] = []
+    lines: list[str] = []
+    in_fence = False
+
+    def flush_block() -> None:
+        block = "\n".join(lines).strip()
+        if block:
+            blocks.append(block)
+        lines.clear()
+
+    def start_section(level: int, title: str) -> None:
+        nonlocal blocks
+        if blocks:
+            sections.append((_heading_path(headings), blocks))
+        blocks = []
+        while headings and headings[-1][0] >= level:
+            headings.pop()
+        headings.append((level, title))
+
+    for line in markdown.splitlines():
+        if FENCE.match(line):
+            in_fence = not in_fence
+            lines.append(line)
+            continue
+        if in_fence:
+            lines.append(line)
+            continue
+
+        atx = ATX_HEADING.match(line)
+        setext = SETEXT_UNDERLINE.match(line)
+        if atx:
+            flush_block()
+            start_section(len(atx.group(1)), atx.group(2))
+        elif setext and lines and _is_paragraph(lines):
+            # The underlined paragraph above is the heading
+            title = " ".join(part.strip() for part in lines)
+            lines.clear()
+            start_section(1 if setext.group(1)[0] == "=" else 2, title)
+        elif setext:
+            # A thematic break, not a heading
+            flush_block()
+        elif not line.strip():
+            flush_block()
+        else:
+            lines.append(line)
+
+    flush_block()
+    if blocks:
+        sections.append((_heading_path(headings), blocks))
+    return sections
+
+
+def _is_paragraph(lines: list[str]) -> bool:
+    """Whether the lines are paragraph text, the only block a setext
+    underline turns into a heading."""
+    return not INDENTED_CODE.match(lines[0]) and not any(
+        BLOCK_START.match(line) for line in lines
+    )
+
+
+def _heading_path(headings: list[tuple[int, str]]) -> str:
+    path = HEADING_SEPARATOR.join(title for _, title in headings if title)
+    return path[:MAX_HEADING_LENGTH]
+
+
+def _pack(blocks: list[str], max_chars: int, overlap_chars: int) -> list[str]:
+    """Pack the blocks of a section into overlapping passages."""
+    # Pieces with whether they continue the previous piece, a window of the
+    # same long block
+    pieces: list[tuple[str, bool]] = []
+    for block in blocks:
+        if len(block) <= max_chars:
+            pieces.append((block, False))
+        else:
+            windows = _split(block, max_chars, overlap_chars)
+            pieces.extend((window, index > 0) for index, window in enumerate(windows))
+
+    passages: list[str] = []
+    current: list[str] = []
+    for piece, continues in pieces:
+        size = sum(len(block) + 2 for block in current)
+        if current and (continues or size + len(piece) > max_chars):
+            passages.append("\n\n".join(current))
+            # Windows of a long block already overlap each other; other
+            # blocks repeat the end of the passage that leaves room for them
+            current = (
+                []
+                if continues
+                else _overlap(current, min(overlap_chars, max_chars - len(piece)))
+            )
+        current.append(piece)
+
+    if current:
+        passages.append("\n\n".join(current))
+    return passages
+
+
+def _overlap(blocks: list[str], max_chars: int) -> list[str]:
+    """Return the trailing blocks, or the end of the last block, that fit
+    in ``max_chars``."""
+    overlap: list[str] = []
+    size = 0
+    for block in reversed(blocks):
+        if size + len(block) > max_chars:
+            if not overlap and max_chars > 0:
+                tail = _tail(block, max_chars)
+                overlap = [tail] if tail else []
+            break
+        overlap.insert(0, block)
+        size += len(block) + 2
+    return overlap
+
+
+def _tail(text: str, max_chars: int) -> str:
+    """Return the end of a text, at most ``max_chars`` long, from a word start.
+
+    Empty if not even the last word fits.
+    """
+    if len(text) <= max_chars:
+        return text.strip()
+    tail = text[-max_chars:]
+    if text[-max_chars - 1].isspace():
+        return tail.strip()
+    boundary = re.search(r"\s", tail)
+    return tail[boundary.end() :].strip() if boundary else ""
+
+
+def _split(text: str, max_chars: int, overlap_chars: int) -> list[str]:
+    """Split a long block into overlapping windows at word boundaries."""
+    windows: list[str] = []
+    start = 0
+    while start < len(text):
+        end = min(start + max_chars, len(text))
+        if end < len(text):
+            space = text.rfind(" ", start + max_chars // 2, end)
+            if space != -1:
+                end = space
+        windows.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        next_start = max(end - overlap_chars, start + 1)
+        space = text.find(" ", next_start, end)
+        start = space + 1 if space != -1 else next_start
+    return [window for window in windows if window]
@@ -0,0 +1,284 @@
+"""
+Nearest-centroid collection classifier on content embeddings.
+
+Every collection keeps the sum and count of the embeddings of its bookmarks.
+A new page is assigned to the collection whose centroid is most similar to
+its embedding, without an LLM request, as long as the match is clear: the
+similarity reaches a minimum and beats the runner-up by a margin. Otherwise
+the caller falls back to the LLM.
+
+Centroids are updated incrementally, in the transaction that changes the
+bookmark, when bookmarks are created, deleted or moved between collections
+and when the content of their page changes. ``rebuild`` recomputes them from
+scratch to correct any drift.
+"""
+
+import logging
+import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import DbSessionManager, get_db_session_manager
+from app.metrics.registry import get_metrics_registry
+from app.models import Bookmark, Collection, CollectionCentroid, ContentEmbedding
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIMENSIONS = 384
+
+
+@dataclass
+class CollectionMatch:
+    """Collection chosen by the classifier."""
+
+    collection_id: uuid.UUID
+    name: str
+    similarity: float
+    margin: float
+
+
+class CollectionClassifier:
+    """Assigns pages to collections by the nearest embedding centroid.
+
+    Example:
+        ```python
+        classifier = get_collection_classifier()
+        match = await classifier.classify(embedding)
+        if match is None:
+            topic = await nlp.collection(collection_names)
+        ```
+    """
+
+    def __init__(
+        self,
+        session_manager: DbSessionManager,
+        enabled: bool = True,
+        min_similarity: float = 0.35,
+        min_margin: float = 0.05,
+        min_bookmarks: int = 3,
+    ) -> None:
+        """Initialize the classifier.
+
+        Args:
+            session_manager: Database session manager to read centroids with.
+            enabled: Whether ``classify`` matches at all; centroids are kept
+                up to date regardless.
+            min_similarity: Minimum cosine similarity of the best centroid.
+            min_margin: Minimum lead in similarity over the second best.
+            min_bookmarks: Bookmarks with embeddings a collection needs before
+                its centroid is used.
+        """
+        self.session_manager = session_manager
+        self.enabled = enabled
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.min_bookmarks = min_bookmarks
+        self._counters = {
+            "matched": 0,
+            "fallbacks": 0,
+            "updates": 0,
+            "rebuilds": 0,
+        }
+
+    async def classify(self, embedding: Sequence[float]) -> CollectionMatch | None:
+        """Find the collection of a page by its content embedding.
+
+        Args:
+            embedding: Content embedding of the page.
+
+        Returns:
+            The best matching collection, or None if no centroid matches
+            clearly enough and the LLM should decide.
+        """
+        if not self.enabled or not any(embedding):
+            return None
+
+        distance = CollectionCentroid.embedding_sum.cosine_distance(embedding)
+        async with self.session_manager.get_session() as session:
+            result = await session.execute(
+                select(Collection.id, Collection.name, distance.label("distance"))
+                .join(
+                    CollectionCentroid,
+                    CollectionCentroid.collection_id == Collection.id,
+                )
+                .where(CollectionCentroid.bookmarks_count >= self.min_bookmarks)
+                .order_by("distance")
+                .limit(2)
+            )
+            rows = result.all()
+
+        if not rows:
+            self._counters["fallbacks"] += 1
+            return None
+
+        similarity = 1 - rows[0].distance
+        runner_up = 1 - rows[1].distance if len(rows) > 1 else 0.0
+        margin = similarity - runner_up
+        if similarity < self.min_similarity or margin < self.min_margin:
+            logger.info(
+                f"No clear collection match (similarity {similarity:.3f}, "
+                f"margin {margin:.3f}), falling back to the LLM"
+            )
+            self._counters["fallbacks"] += 1
+            return None
+
+        self._counters["matched"] += 1
+        return CollectionMatch(rows[0].id, rows[0].name, similarity, margin)
+
+    async def add_bookmark(
+        self, session: AsyncSession, url: str, collection_id: uuid.UUID | None
+    ) -> None:
+        """Add the embedding of a bookmark's page to its collection."""
+        if collection_id is None:
+            return
+        embedding = await _url_embedding(session, url)
+        if embedding is not None:
+            await self._apply(session, collection_id, embedding, 1)
+
+    async def remove_bookmark(
+        self, session: AsyncSession, url: str, collection_id: uuid.UUID | None
+    ) -> None:
+        """Remove the embedding of a bookmark's page from its collection."""
+        if collection_id is None:
+            return
+        embedding = await _url_embedding(session, url)
+        if embedding is not None:
+            await self._apply(session, collection_id, [-x for x in embedding], -1)
+
+    async def replace_embedding(
+        self,
+        session: AsyncSession,
+        url: str,
+        old: Sequence[float] | None,
+        new: Sequence[float],
+    ) -> None:
+        """Update the collections of the bookmarks of a page whose content changed.
+
+        Must be called before the new embedding is saved for the URL.
+
+        Args:
+            session: Session of the transaction saving the new embedding.
+            url: URL of the page.
+            old: Previous embedding of the page, if any.
+            new: New embedding of the page.
+        """
+        result = await session.execute(
+            select(Bookmark.collection_id).where(
+                Bookmark.url == url, Bookmark.collection_id.is_not(None)
+            )
+        )
+        if old is None:
+            delta, count = list(new), 1
+        else:
+            delta, count = [n - o for n, o in zip(new, old, strict=True)], 0
+        for collection_id in result.scalars().all():
+            await self._apply(session, collection_id, delta, count)
+
+    async def rebuild(self) -> int:
+        """Recompute all centroids from the bookmarks and their embeddings.
+
+        Returns:
+            The number of collections with a centroid.
+        """
+        latest = _latest_embeddings().subquery()
+        async with self.session_manager.get_session() as session:
+            result = await session.execute(
+                select(
+                    Bookmark.collection_id,
+                    func.sum(latest.c.embedding, type_=Vector(EMBEDDING_DIMENSIONS)),
+                    func.count(),
+                )
+                .join(latest, latest.c.url == Bookmark.url)
+                .where(Bookmark.collection_id.is_not(None))
+                .group_by(Bookmark.collection_id)
+            )
+            centroids = [
+                {
+                    "collection_id": collection_id,
+                    "embedding_sum": embedding_sum,
+                    "bookmarks_count": count,
+                }
+                for collection_id, embedding_sum, count in result.all()
+            ]
+
+            await session.execute(delete(CollectionCentroid))
+            if centroids:
+                await session.execute(insert(CollectionCentroid), centroids)
+            await session.commit()
+
+        self._counters["rebuilds"] += 1
+        return len(centroids)
+
+    def stats(self) -> dict[str, Any]:
+        """Return how many pages were matched locally or sent to the LLM."""
+        decisions = self._counters["matched"] + self._counters["fallbacks"]
+        return {
+            **self._counters,
+            "match_rate": self._counters["matched"] / decisions if decisions else 0.0,
+            "enabled": self.enabled,
+            "min_similarity": self.min_similarity,
+            "min_margin": self.min_margin,
+        }
+
+    async def _apply(
+        self,
+        session: AsyncSession,
+        collection_id: uuid.UUID,
+        delta: Sequence[float],
+        count: int,
+    ) -> None:
+        """Add a delta to the embedding sum and count of a collection."""
+        statement = insert(CollectionCentroid).values(
+            collection_id=collection_id, embedding_sum=delta, bookmarks_count=count
+        )
+        await session.execute(
+            statement.on_conflict_do_update(
+                index_elements=["collection_id"],
+                set_={
+                    "embedding_sum": CollectionCentroid.embedding_sum.op(
+                        "+", return_type=Vector(EMBEDDING_DIMENSIONS)
+                    )(statement.excluded.embedding_sum),
+                    "bookmarks_count": CollectionCentroid.bookmarks_count
+                    + statement.excluded.bookmarks_count,
+                },
+            )
+        )
+        self._counters["updates"] += 1
+
+
+def _latest_embeddings():
+    """Select the most recent embedding of every URL."""
+    return (
+        select(ContentEmbedding.url, ContentEmbedding.embedding)
+        .distinct(ContentEmbedding.url)
+        .order_by(ContentEmbedding.url, ContentEmbedding.updated_at.desc())
+    )
+
+
+async def _url_embedding(session: AsyncSession, url: str) -> list[float] | None:
+    """Load the most recent embedding of a URL, if any."""
+    latest = _latest_embeddings().where(ContentEmbedding.url == url).subquery()
+    embedding = await session.scalar(select(latest.c.embedding))
+    return None if embedding is None else list(embedding)
+
+
+@lru_cache
+def get_collection_classifier() -> CollectionClassifier:
+    settings = get_settings()
+    classifier = CollectionClassifier(
+        get_db_session_manager(),
+        enabled=settings.COLLECTION_CLASSIFIER_ENABLED,
+        min_similarity=settings.COLLECTION_CLASSIFIER_MIN_SIMILARITY,
+        min_margin=settings.COLLECTION_CLASSIFIER_MIN_MARGIN,
+        min_bookmarks=settings.COLLECTION_CLASSIFIER_MIN_BOOKMARKS,
+    )
+    get_metrics_registry().register("collection_classifier", classifier.stats)
+    return classifier
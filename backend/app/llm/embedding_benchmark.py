@@ -0,0 +1,177 @@
+"""
+Parity check and benchmark of the embedding backends.
+
+Embeds the same synthetic texts with each backend, every backend in its own
+process so that memory is measured without the other runtimes loaded, and
+reports load time, memory, batch latency and throughput. Embeddings of the
+ONNX backends are compared to the PyTorch backend by cosine similarity; the
+command fails if any text agrees less than ``--min-cosine``, so it doubles
+as the parity test before switching EMBEDDING_BACKEND.
+
+Usage:
+    uv run --extra onnx python -m app.llm.embedding_benchmark [--texts 512]
+        [--batch-size 32] [--repeats 3] [--min-cosine 0.99]
+        [--backends torch onnx onnx-int8] [--model <hub id or directory>]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+import numpy as np
+
+WORDS = (
+    "distributed systems caching strategies benchmark methodology database "
+    "vector search query latency throughput memory model embedding article "
+    "bookmark collection summary python rust compiler kernel network browser "
+    "recipe travel football election climate music history science "
+    "zażółć gęślą jaźń naïve café 東京 데이터"
+).split()
+
+
+def generate_texts(count: int, seed: int = 0) -> list[str]:
+    """Generate texts from search-query length up to beyond the model limit."""
+    rng = random.Random(seed)
+    lengths = [3, 12, 60, 200, 600]
+    return [
+        " ".join(rng.choices(WORDS, k=lengths[index % len(lengths)])).capitalize() + "."
+        for index in range(count)
+    ]
+
+
+def rss_mb() -> float:
+    """Return the current resident memory of the process in MB."""
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def measure(
+    backend: str,
+    model: str,
+    texts: list[str],
+    batch_size: int,
+    repeats: int,
+    cache_dir: str,
+    threads: int,
+) -> dict[str, Any]:
+    """Load one backend and time it, run in a fresh process."""
+    from app.llm.embeddings import create_embedding_backend
+
+    baseline = rss_mb()
+    started = time.perf_counter()
+    encoder = create_embedding_backend(
+        "onnx" if backend.startswith("onnx") else "torch",
+        model,
+        quantize=backend == "onnx-int8",
+        cache_dir=cache_dir,
+        threads=threads,
+    )
+    encoder.encode(texts[:1])
+    load_seconds = time.perf_counter() - started
+    loaded = rss_mb()
+
+    batches = [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
+    latencies: list[float] = []
+    for _ in range(repeats):
+        embeddings = []
+        for batch in batches:
+            batch_started = time.perf_counter()
+            embeddings.append(encoder.encode(batch))
+            latencies.append(time.perf_counter() - batch_started)
+
+    return {
+        "load_seconds": round(load_seconds, 2),
+        "rss_mb": round(loaded - baseline, 1),
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 - baseline, 1
+        ),
+        "batch_ms": {
+            "p50": round(statistics.median(latencies) * 1000, 1),
+            "p95": round(sorted(latencies)[int(0.95 * (len(latencies) - 1))] * 1000, 1),
+        },
+        "texts_per_second": round(len(texts) * repeats / sum(latencies), 1),
+        "embeddings": np.concatenate(embeddings),
+    }
+
+
+def compare(reference: np.ndarray, embeddings: np.ndarray) -> dict[str, float]:
+    """Cosine similarity of each text's embedding to the reference one."""
+    cosines = (reference * embeddings).sum(axis=1) / (
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(embeddings, axis=1)
+    )
+    return {
+        "min_cosine": round(float(cosines.min()), 5),
+        "mean_cosine": round(float(cosines.mean()), 5),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--min-cosine", type=float, default=0.99)
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=["torch", "onnx", "onnx-int8"],
+        default=["torch", "onnx", "onnx-int8"],
+    )
+    parser.add_argument("--model", help="hub id or directory (default: settings)")
+    args = parser.parse_args()
+
+    # Only the embedding settings are used, the LLM is never called
+    os.environ.setdefault("LLM_PROVIDER", "fake")
+    from app.settings import get_settings
+
+    settings = get_settings()
+    model = args.model or settings.EMBEDDING_MODEL
+    texts = generate_texts(args.texts)
+
+    report: dict[str, Any] = {"model": model, "texts": len(texts), "backends": {}}
+    results = {}
+    for backend in args.backends:
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            results[backend] = executor.submit(
+                measure,
+                backend,
+                model,
+                texts,
+                args.batch_size,
+                args.repeats,
+                settings.EMBEDDING_ONNX_CACHE_DIR,
+                settings.EMBEDDING_ONNX_THREADS,
+            ).result()
+        report["backends"][backend] = {
+            key: value for key, value in results[backend].items() if key != "embeddings"
+        }
+
+    failed = False
+    if "torch" in results:
+        for backend, result in results.items():
+            if backend == "torch":
+                continue
+            parity = compare(results["torch"]["embeddings"], result["embeddings"])
+            parity["passed"] = parity["min_cosine"] >= args.min_cosine
+            failed = failed or not parity["passed"]
+            report["backends"][backend]["parity"] = parity
+
+    print(json.dumps(report, indent=2))
+    if failed:
+        print(f"❌ Embeddings differ from torch below {args.min_cosine} cosine")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
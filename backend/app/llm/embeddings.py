@@ -3,30 +3,246 @@ Content embedding functionality using sentence transformers.
 
 This module provides functionality to create and manage content embeddings
 for semantic search capabilities.
+
+Concurrent embedding requests, from ingestion jobs and search queries alike,
+are collected into batches and encoded together on a dedicated worker thread,
+which is several times faster on CPU than encoding texts one by one and keeps
+the model off the event loop and the default executor. Search queries are
+batched apart from ingestion and encoded first, so a user waits for at most
+the ingestion batch already running, not for every queued one.
+
+The model runs either on PyTorch through sentence-transformers, or as an
+ONNX export through onnxruntime (see ``app.llm.onnx_embeddings``), which
+needs less memory and is faster on CPU-only hosts.
 """
 
 import asyncio
-import hashlib
 import logging
+import time
+from collections import deque
+from collections.abc import Hashable
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Protocol
 
-from sentence_transformers import SentenceTransformer
+import numpy as np
+
+from app.hashing import generate_content_hash
+from app.llm.batching import MicroBatcher
+from app.metrics.registry import get_metrics_registry
+from app.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
+EMBEDDING_DIMENSIONS = 384
+
+
+class EmbeddingBackend(Protocol):
+    """Runtime of the embedding model."""
+
+    name: str
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """Embed a batch of texts, one unit-length row per text."""
+        ...
+
+
+class TorchEmbeddingBackend:
+    """Encodes texts with the PyTorch sentence-transformers model."""
+
+    name = "torch"
+
+    def __init__(self, model: str) -> None:
+        # Imported here, so workers using the ONNX backend never load torch
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model)
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        return self.model.encode(texts, batch_size=len(texts), convert_to_numpy=True)
+
+
+def create_embedding_backend(
+    backend: str,
+    model: str,
+    quantize: bool = True,
+    cache_dir: str = "~/.cache/cuda/onnx",
+    threads: int = 0,
+) -> EmbeddingBackend:
+    """Load the embedding model on the given runtime.
+
+    Args:
+        backend: "torch" or "onnx".
+        model: Hugging Face Hub id or local directory of the model.
+        quantize: Whether the ONNX backend runs the int8 quantized model.
+        cache_dir: Directory the ONNX backend stores the quantized model in.
+        threads: Threads per ONNX inference, zero for the default.
+    """
+    if backend == "onnx":
+        from app.llm.onnx_embeddings import OnnxEmbeddingBackend
+
+        return OnnxEmbeddingBackend(
+            model, quantize=quantize, cache_dir=cache_dir, threads=threads
+        )
+    return TorchEmbeddingBackend(model)
+
+
 # Global model instance for reuse
-_embedding_model = None
+_embedding_model: EmbeddingBackend | None = None
 
 
-def get_embedding_model() -> SentenceTransformer:
-    """Get or create the sentence transformer model."""
+def get_embedding_model() -> EmbeddingBackend:
+    """Get or create the embedding model on the configured backend."""
     global _embedding_model
     if _embedding_model is None:
-        # Using all-MiniLM-L6-v2 which produces 384-dimensional embeddings
-        # This is a good balance between quality and speed
-        _embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
+        settings = get_settings()
+        _embedding_model = create_embedding_backend(
+            settings.EMBEDDING_BACKEND,
+            settings.EMBEDDING_MODEL,
+            quantize=settings.EMBEDDING_ONNX_QUANTIZE,
+            cache_dir=settings.EMBEDDING_ONNX_CACHE_DIR,
+            threads=settings.EMBEDDING_ONNX_THREADS,
+        )
     return _embedding_model
 
 
+class EmbeddingService:
+    """Encodes concurrent embedding requests in batches on one worker thread.
+
+    Example:
+        ```python
+        service = get_embedding_service()
+        embeddings = await asyncio.gather(
+            service.embed("first page"), service.embed("search query", query=True)
+        )
+        ```
+    """
+
+    def __init__(
+        self, backend: str = "torch", max_batch_size: int = 32, max_wait_ms: int = 10
+    ) -> None:
+        """Initialize the service; the model is loaded by the first batch.
+
+        Args:
+            backend: Name of the configured embedding backend, for metrics.
+            max_batch_size: Maximum number of texts encoded together.
+            max_wait_ms: Time the first text of a batch waits for others.
+        """
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="embedding"
+        )
+        self._batcher: MicroBatcher[str, list[float]] = MicroBatcher(
+            self._encode_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms
+        )
+        self.backend = backend
+        self._encoding = False
+        # Batches waiting for the worker thread, search queries first
+        self._waiting: dict[str, deque[asyncio.Future[None]]] = {
+            "query": deque(),
+            "ingestion": deque(),
+        }
+        self._counters = {"failed_batches": 0, "query_batches": 0}
+        self._encode_seconds = 0.0
+
+    async def embed(self, text: str, query: bool = False) -> list[float]:
+        """Create the embedding of a text, batched with concurrent requests.
+
+        Args:
+            text: Non-empty text to embed.
+            query: Whether the text is a search query. Queries are batched
+                with other queries only and encoded before waiting ingestion
+                batches.
+
+        Returns:
+            The embedding vector as a list of floats.
+        """
+        return await self._batcher.submit("query" if query else "ingestion", text)
+
+    def close(self) -> None:
+        """Stop the worker thread once the queued batches are encoded."""
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> dict[str, Any]:
+        """Return the batch size histogram and the time spent encoding."""
+        return {
+            **self._batcher.stats(),
+            **self._counters,
+            "waiting_batches": {
+                key: len(waiting) for key, waiting in self._waiting.items()
+            },
+            "backend": self.backend,
+            "encode_seconds": round(self._encode_seconds, 3),
+        }
+
+    async def _encode_batch(
+        self, key: Hashable, texts: list[str]
+    ) -> list[list[float] | BaseException]:
+        loop = asyncio.get_running_loop()
+        await self._acquire(str(key))
+        try:
+            if key == "query":
+                self._counters["query_batches"] += 1
+            embeddings = await loop.run_in_executor(self._executor, self._encode, texts)
+        except Exception as e:
+            self._counters["failed_batches"] += 1
+            return [e] * len(texts)
+        finally:
+            self._release()
+        return [embedding.tolist() for embedding in embeddings]
+
+    async def _acquire(self, key: str) -> None:
+        """Wait until the worker thread is free for a batch of this key.
+
+        Batches are handed to the thread one at a time, instead of queueing
+        in the executor, so a query batch can overtake waiting ingestion.
+        """
+        if not self._encoding:
+            self._encoding = True
+            return
+        turn = asyncio.get_running_loop().create_future()
+        self._waiting[key].append(turn)
+        try:
+            await turn
+        except asyncio.CancelledError:
+            if turn.done() and not turn.cancelled():
+                # The turn was handed over just before the cancellation
+                self._release()
+            elif turn in self._waiting[key]:
+                self._waiting[key].remove(turn)
+            raise
+
+    def _release(self) -> None:
+        """Hand the worker thread to the next batch, queries first."""
+        for waiting in self._waiting.values():
+            while waiting:
+                turn = waiting.popleft()
+                if not turn.done():
+                    turn.set_result(None)
+                    return
+        self._encoding = False
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        """Encode a batch of texts, run on the worker thread."""
+        started = time.perf_counter()
+        try:
+            model = get_embedding_model()
+            return model.encode(texts)
+        finally:
+            self._encode_seconds += time.perf_counter() - started
+
+
+@lru_cache
+def get_embedding_service() -> EmbeddingService:
+    settings = get_settings()
+    service = EmbeddingService(
+        backend=settings.EMBEDDING_BACKEND,
+        max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+        max_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS,
+    )
+    get_metrics_registry().register("embedding_service", service.stats)
+    return service
+
+
 class EmbeddingLayer:
     """Handle content embedding operations."""
 
@@ -42,38 +258,33 @@ class EmbeddingLayer:
 
     def _generate_content_hash(self) -> str:
         """Generate SHA-256 hash of content for deduplication."""
-        return hashlib.sha256(self.content.encode("utf-8")).hexdigest()
+        return generate_content_hash(self.content)
 
-    async def create_embedding(self) -> list[float]:
+    async def create_embedding(self, query: bool = False) -> list[float]:
         """Create embedding vector for the content.
 
+        Args:
+            query: Whether the content is a search query, encoded ahead of
+                ingestion
+
         Returns:
             List of float values representing the content embedding
         """
         if not self.content.strip():
             # Return zero vector for empty content
-            return [0.0] * 384
+            return [0.0] * EMBEDDING_DIMENSIONS
 
         # Truncate content to reasonable length for embedding
         # Most sentence transformers work best with shorter texts
         truncated_content = self.content[:8192]  # Keep reasonable limit
 
-        loop = asyncio.get_event_loop()
-
         try:
-            model = get_embedding_model()
-            # Run embedding creation in thread pool to avoid blocking
-            embedding = await loop.run_in_executor(
-                None, lambda: model.encode(truncated_content, convert_to_tensor=False)
-            )
-
-            # Convert numpy array to list of floats
-            return embedding.tolist()
+            return await get_embedding_service().embed(truncated_content, query=query)
 
         except Exception as e:
             logger.error(f"Embedding creation failed: {e}")
             # Return zero vector on error
-            return [0.0] * 384
+            return [0.0] * EMBEDDING_DIMENSIONS
 
     def get_content_hash(self) -> str:
         """Get the SHA-256 hash of the content."""
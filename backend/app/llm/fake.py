@@ -0,0 +1,233 @@
+"""
+Deterministic local stand-in for the Gemini API.
+
+Answers are derived from a hash of the request, so the same input always gets
+the same answer, and structured requests get JSON matching their schema,
+including one object per document of batched analyses. Latency, server
+errors and rate limiting (429 with ``Retry-After``) are simulated with a
+seeded generator. Requests go through the shared rate limiter like real ones,
+so retries, the circuit breaker, batching and the job queue can be measured
+under controlled LLM behavior.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+from functools import lru_cache
+from typing import Any
+
+import httpx
+
+from app.llm.rate_limiter import LLMRateLimiter, get_llm_rate_limiter
+from app.metrics.registry import get_metrics_registry
+from app.settings import get_settings
+
+FAKE_LLM_MODEL = "fake-llm"
+FAKE_LLM_URL = "http://fake-llm.local/generateContent"
+
+# Rough average for estimating the tokens of a request, as for Gemini
+CHARS_PER_TOKEN = 4
+
+WORD = re.compile(r"[^\W\d_]{3,}")
+DOCUMENT = re.compile(r"^### Document (\S+)\n", re.MULTILINE)
+
+
+class FakeLLMProvider:
+    """In-process LLM provider with simulated latency and failures.
+
+    Example:
+        ```python
+        provider = FakeLLMProvider(latency_ms=200, rate_limit_rate=0.1)
+        text = await provider.generate("Summarize text", content)
+        ```
+    """
+
+    def __init__(
+        self,
+        latency_ms: int = 500,
+        latency_jitter_ms: int = 100,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after_seconds: float = 1.0,
+        seed: int = 0,
+        rate_limiter: LLMRateLimiter | None = None,
+        model: str = FAKE_LLM_MODEL,
+    ) -> None:
+        """Initialize the provider.
+
+        Args:
+            latency_ms: Mean simulated response time.
+            latency_jitter_ms: Maximum deviation from the mean response time.
+            error_rate: Share of requests failing with a 503.
+            rate_limit_rate: Share of requests failing with a 429.
+            retry_after_seconds: ``Retry-After`` sent with 429 responses.
+            seed: Seed of latencies and failures.
+            rate_limiter: Limiter the requests are sent through, if any.
+            model: Model name reported to the cache.
+        """
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_seconds = retry_after_seconds
+        self.seed = seed
+        self.rate_limiter = rate_limiter
+        self.model = model
+        self._random = random.Random(seed)
+        self._in_flight = 0
+        self._counters = {"requests": 0, "responses": 0, "errors": 0, "rate_limited": 0}
+
+    async def generate(
+        self,
+        task: str,
+        prompt: str,
+        response_schema: dict[str, Any] | None = None,
+    ) -> str:
+        """Generate a deterministic response for a task applied to a prompt.
+
+        Args:
+            task: Instructions for the model.
+            prompt: Text the instructions apply to.
+            response_schema: Optional JSON schema; the response is then JSON
+                matching it.
+
+        Returns:
+            str: Comma separated words of the input, or JSON matching the
+                schema.
+
+        Raises:
+            httpx.HTTPStatusError: For simulated failures that are not
+                retried, or when retries are exhausted.
+        """
+        if self.rate_limiter is None:
+            return await self._respond(task, prompt, response_schema)
+
+        tokens = (len(task) + len(prompt)) // CHARS_PER_TOKEN
+        return await self.rate_limiter.run(
+            lambda: self._respond(task, prompt, response_schema), tokens=tokens
+        )
+
+    async def aclose(self) -> None:
+        """Nothing to release; present for the provider interface."""
+
+    def stats(self) -> dict[str, Any]:
+        """Return the simulated request counters and settings."""
+        return {
+            **self._counters,
+            "in_flight": self._in_flight,
+            "latency_ms": self.latency_ms,
+            "latency_jitter_ms": self.latency_jitter_ms,
+            "error_rate": self.error_rate,
+            "rate_limit_rate": self.rate_limit_rate,
+        }
+
+    async def _respond(
+        self, task: str, prompt: str, response_schema: dict[str, Any] | None
+    ) -> str:
+        """Simulate one request: wait, then fail or answer."""
+        self._counters["requests"] += 1
+        jitter = self._random.uniform(-self.latency_jitter_ms, self.latency_jitter_ms)
+        roll = self._random.random()
+
+        self._in_flight += 1
+        try:
+            await asyncio.sleep(max(0.0, self.latency_ms + jitter) / 1000)
+        finally:
+            self._in_flight -= 1
+
+        if roll < self.rate_limit_rate:
+            self._counters["rate_limited"] += 1
+            raise _status_error(429, {"Retry-After": f"{self.retry_after_seconds:g}"})
+        if roll < self.rate_limit_rate + self.error_rate:
+            self._counters["errors"] += 1
+            raise _status_error(503)
+
+        self._counters["responses"] += 1
+        return _answer(task, prompt, response_schema, self.seed)
+
+
+def _answer(
+    task: str, prompt: str, response_schema: dict[str, Any] | None, seed: int
+) -> str:
+    """Build the deterministic answer of a request."""
+    text = (prompt or task).strip()
+    if response_schema is None:
+        return ", ".join(_words(text, f"{seed}\0{task}", 3))
+
+    if response_schema["type"] == "ARRAY" and DOCUMENT.search(text):
+        # Batched request: one object per "### Document <id>" section
+        parts = DOCUMENT.split(text)[1:]
+        documents = list(zip(parts[::2], parts[1::2], strict=True))
+        items = []
+        for document_id, document in documents:
+            item = _generate(response_schema["items"], document.strip(), seed)
+            item["id"] = document_id
+            items.append(item)
+        return json.dumps(items, ensure_ascii=False)
+
+    return json.dumps(_generate(response_schema, text, seed), ensure_ascii=False)
+
+
+def _generate(schema: dict[str, Any], text: str, seed: int, name: str = "") -> Any:
+    """Generate a value matching a Gemini response schema from the text."""
+    salt = f"{seed}\0{name}"
+    match schema["type"]:
+        case "OBJECT":
+            return {
+                key: _generate(value, text, seed, key)
+                for key, value in schema.get("properties", {}).items()
+            }
+        case "ARRAY":
+            return [
+                _generate(schema["items"], text, seed, f"{name}{index}")
+                for index in range(3)
+            ]
+        case "INTEGER":
+            return _hash(f"{salt}\0{text}") % 100
+        case "NUMBER":
+            return (_hash(f"{salt}\0{text}") % 1000) / 1000
+        case "BOOLEAN":
+            return _hash(f"{salt}\0{text}") % 2 == 0
+        case _:
+            count = {"summary": 30, "title": 6}.get(name, 1)
+            return " ".join(_words(text, salt, count))
+
+
+def _words(text: str, salt: str, count: int) -> list[str]:
+    """Pick words of the text, deterministically for the text and salt."""
+    words = [word.lower() for word in WORD.findall(text)] or ["empty"]
+    start = _hash(f"{salt}\0{text}") % len(words)
+    return [words[(start + offset) % len(words)] for offset in range(count)]
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.sha256(value.encode()).digest()[:8], "big")
+
+
+def _status_error(
+    status_code: int, headers: dict[str, str] | None = None
+) -> httpx.HTTPStatusError:
+    """Build the error a real API response with the status would raise."""
+    request = httpx.Request("POST", FAKE_LLM_URL)
+    response = httpx.Response(status_code, headers=headers, request=request)
+    return httpx.HTTPStatusError(
+        f"Fake LLM responded with {status_code}", request=request, response=response
+    )
+
+
+@lru_cache
+def get_fake_llm_provider() -> FakeLLMProvider:
+    settings = get_settings()
+    provider = FakeLLMProvider(
+        latency_ms=settings.LLM_FAKE_LATENCY_MS,
+        latency_jitter_ms=settings.LLM_FAKE_LATENCY_JITTER_MS,
+        error_rate=settings.LLM_FAKE_ERROR_RATE,
+        rate_limit_rate=settings.LLM_FAKE_RATE_LIMIT_RATE,
+        retry_after_seconds=settings.LLM_FAKE_RETRY_AFTER_SECONDS,
+        seed=settings.LLM_FAKE_SEED,
+        rate_limiter=get_llm_rate_limiter(),
+    )
+    get_metrics_registry().register("llm_fake_provider", provider.stats)
+    return provider
@@ -0,0 +1,148 @@
+"""
+Async Gemini API client on a shared, pooled HTTP/2 connection.
+
+All LLM requests go through one ``httpx.AsyncClient``, so connections are
+reused across jobs instead of paying a TCP and TLS handshake per call, and
+no request blocks the event loop or occupies an executor thread. The client
+is closed by the application lifespan. Requests go through the shared rate
+limiter, which also retries transient failures.
+"""
+
+from functools import lru_cache
+from typing import Any
+
+import httpx
+
+from app.llm.rate_limiter import LLMRateLimiter, get_llm_rate_limiter
+from app.settings import get_settings
+
+GEMINI_MODEL = "gemini-2.0-flash"
+GEMINI_API_URL = f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent"
+
+# Rough average for estimating the tokens of a request before sending it
+CHARS_PER_TOKEN = 4
+
+
+class GeminiClient:
+    """Sends generateContent requests to the Gemini API.
+
+    Example:
+        ```python
+        client = get_gemini_client()
+        text = await client.generate("Summarize text", content)
+        await client.aclose()
+        ```
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        client: httpx.AsyncClient,
+        url: str = GEMINI_API_URL,
+        model: str = GEMINI_MODEL,
+        rate_limiter: LLMRateLimiter | None = None,
+        expected_output_tokens: int = 512,
+    ) -> None:
+        """Initialize the client.
+
+        Args:
+            api_key: Gemini API key.
+            client: Shared HTTP client the requests are sent with.
+            url: generateContent endpoint of the model.
+            model: Name of the model behind ``url``.
+            rate_limiter: Limiter the requests are sent through, if any.
+            expected_output_tokens: Output tokens assumed per request when
+                estimating its token usage.
+        """
+        self.api_key = api_key
+        self.client = client
+        self.url = url
+        self.model = model
+        self.rate_limiter = rate_limiter
+        self.expected_output_tokens = expected_output_tokens
+
+    async def generate(
+        self,
+        task: str,
+        prompt: str,
+        response_schema: dict[str, Any] | None = None,
+    ) -> str:
+        """Generate a response for a task applied to a prompt.
+
+        Args:
+            task: Instructions for the model.
+            prompt: Text the instructions apply to.
+            response_schema: Optional JSON schema; the response is then JSON
+                matching it.
+
+        Returns:
+            str: Text of the first candidate.
+
+        Raises:
+            httpx.HTTPStatusError: If the API responds with an error status
+                that is not transient, or retries are exhausted.
+        """
+        data: dict[str, Any] = {
+            "contents": [{"parts": [{"text": f"{task}: {prompt}"}]}]
+        }
+        if response_schema is not None:
+            # Structured output: the response text is JSON matching the schema
+            data["generationConfig"] = {
+                "responseMimeType": "application/json",
+                "responseSchema": response_schema,
+            }
+
+        if self.rate_limiter is None:
+            body = await self._post(data)
+        else:
+            estimated = (len(task) + len(prompt)) // CHARS_PER_TOKEN
+            estimated += self.expected_output_tokens
+            body = await self.rate_limiter.run(
+                lambda: self._post(data), tokens=estimated
+            )
+            actual = body.get("usageMetadata", {}).get("totalTokenCount")
+            if actual is not None:
+                self.rate_limiter.record_usage(estimated, actual)
+
+        return body["candidates"][0]["content"]["parts"][0]["text"]
+
+    async def _post(self, data: dict[str, Any]) -> dict[str, Any]:
+        # The key goes in a header so it never appears in logged URLs
+        response = await self.client.post(
+            self.url, headers={"x-goog-api-key": self.api_key}, json=data
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        await self.client.aclose()
+
+
+def create_gemini_http_client() -> httpx.AsyncClient:
+    """Create the pooled HTTP/2 client used for Gemini requests."""
+    settings = get_settings()
+    return httpx.AsyncClient(
+        http2=True,
+        headers={"Content-Type": "application/json"},
+        timeout=httpx.Timeout(
+            settings.LLM_HTTP_TIMEOUT_SECONDS,
+            connect=settings.LLM_HTTP_CONNECT_TIMEOUT_SECONDS,
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+
+
+@lru_cache
+def get_gemini_client() -> GeminiClient:
+    settings = get_settings()
+    return GeminiClient(
+        settings.GEMINI_API_KEY,
+        create_gemini_http_client(),
+        rate_limiter=get_llm_rate_limiter(),
+        expected_output_tokens=settings.LLM_EXPECTED_OUTPUT_TOKENS,
+    )
@@ -0,0 +1,148 @@
+"""
+Policy deciding when publisher metadata replaces generated text.
+
+Many pages already carry an editorial title and description in their JSON-LD
+structured data, Open Graph or Twitter Card tags. When these pass the quality
+checks below they are used as the bookmark title and summary, and the
+corresponding LLM round-trips are skipped.
+"""
+
+import html
+import re
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from app.settings import get_settings
+
+# Schema.org types describing the publisher or page furniture, not the page
+NON_PAGE_SCHEMA_TYPES = frozenset(
+    [
+        "Organization",
+        "Corporation",
+        "NewsMediaOrganization",
+        "Person",
+        "WebSite",
+        "BreadcrumbList",
+        "ListItem",
+        "ImageObject",
+        "SiteNavigationElement",
+    ]
+)
+
+# Upper bounds of the bookmark suggestion columns
+MAX_TITLE_LENGTH = 256
+MAX_SUMMARY_LENGTH = 1024
+
+WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class PublisherText:
+    """Title and summary taken from publisher metadata, when usable."""
+
+    title: str | None = None
+    summary: str | None = None
+
+
+def select_publisher_text(
+    metadata: dict[str, Any],
+    min_title_words: int = 2,
+    min_summary_length: int = 80,
+) -> PublisherText:
+    """Pick a publisher title and summary that can replace generated ones.
+
+    Candidates are tried in the order JSON-LD, Open Graph, Twitter Cards. A
+    title must have at least ``min_title_words`` words and differ from the
+    site name; a summary must be at least ``min_summary_length`` characters
+    long and differ from the title. Both must fit the suggestion columns.
+
+    Args:
+        metadata: Metadata in the format returned by ``MetadataAnalyzer``.
+        min_title_words: Minimum number of words of a usable title.
+        min_summary_length: Minimum length of a usable summary.
+
+    Returns:
+        PublisherText: The selected texts; None where nothing qualified.
+    """
+    og = metadata.get("og") or {}
+    twitter = metadata.get("twitter") or {}
+    nodes = [
+        node for node in _schema_nodes(metadata.get("schemas") or []) if _is_page(node)
+    ]
+    site_name = _clean(og.get("og:site_name"))
+
+    title = _first(
+        [
+            *(node.get("headline") for node in nodes),
+            og.get("og:title"),
+            twitter.get("twitter:title"),
+        ],
+        lambda text: (
+            len(text.split()) >= min_title_words
+            and len(text) <= MAX_TITLE_LENGTH
+            and (site_name is None or text.casefold() != site_name.casefold())
+        ),
+    )
+    summary = _first(
+        [
+            *(node.get("description") for node in nodes),
+            og.get("og:description"),
+            twitter.get("twitter:description"),
+        ],
+        lambda text: (
+            min_summary_length <= len(text) <= MAX_SUMMARY_LENGTH
+            and (title is None or text.casefold() != title.casefold())
+        ),
+    )
+    return PublisherText(title=title, summary=summary)
+
+
+def get_publisher_text(metadata: dict[str, Any]) -> PublisherText:
+    """Apply the configured metadata policy to a page's metadata."""
+    settings = get_settings()
+    if not settings.METADATA_POLICY_ENABLED:
+        return PublisherText()
+    return select_publisher_text(
+        metadata,
+        min_title_words=settings.METADATA_MIN_TITLE_WORDS,
+        min_summary_length=settings.METADATA_MIN_SUMMARY_LENGTH,
+    )
+
+
+def _schema_nodes(schemas: Any) -> Iterator[dict[str, Any]]:
+    """Flatten JSON-LD documents, lists and ``@graph`` containers."""
+    if isinstance(schemas, list):
+        for schema in schemas:
+            yield from _schema_nodes(schema)
+    elif isinstance(schemas, dict):
+        yield schemas
+        if "@graph" in schemas:
+            yield from _schema_nodes(schemas["@graph"])
+
+
+def _is_page(node: dict[str, Any]) -> bool:
+    """Check whether a JSON-LD node describes the page itself."""
+    types = node.get("@type")
+    if isinstance(types, str):
+        types = [types]
+    if not isinstance(types, list) or not types:
+        return False
+    return not any(schema_type in NON_PAGE_SCHEMA_TYPES for schema_type in types)
+
+
+def _clean(value: Any) -> str | None:
+    """Unescape and normalize whitespace of a metadata value."""
+    if not isinstance(value, str):
+        return None
+    text = WHITESPACE.sub(" ", html.unescape(value)).strip()
+    return text or None
+
+
+def _first(candidates: list[Any], accept: Callable[[str], bool]) -> str | None:
+    """Return the first cleaned candidate accepted by the predicate."""
+    for candidate in candidates:
+        text = _clean(candidate)
+        if text is not None and accept(text):
+            return text
+    return None
@@ -4,22 +4,18 @@ HuggingFace Transformers implementation for LLM operations.
 Simple implementation using HuggingFace Transformers library.
 """
 
-import asyncio
 import logging
 from typing import Any
 
-from sqlmodel import select
-
-from app.db import get_db_session_manager
-from app.models import Tag
-
 from .llm_models import (
+    get_analysis_model,
     get_collection_model,
     get_sentiment_model,
     get_summarization_model,
     get_tags_model,
     get_title_model,
 )
+from .tag_suggester import get_tag_suggester
 
 logger = logging.getLogger(__name__)
 
@@ -40,12 +36,9 @@ class NLPLayer:
         # Truncate text for performance
         truncated_text = self.text[: self.max_text_length]
 
-        # Run in thread pool to avoid blocking event loop
-        loop = asyncio.get_event_loop()
-
         try:
             pipeline = get_sentiment_model()
-            result = await loop.run_in_executor(None, lambda: pipeline(truncated_text))
+            result = await pipeline(truncated_text)
 
             if result and len(result) > 0:
                 return result
@@ -63,13 +56,8 @@ class NLPLayer:
         # Use longer text limit for summarization
         truncated_text = self.text[:1024]
 
-        loop = asyncio.get_event_loop()
-
         pipeline = get_summarization_model()
-        result = await loop.run_in_executor(
-            None,
-            lambda: pipeline(truncated_text),
-        )
+        result = await pipeline(truncated_text)
 
         return result
 
@@ -80,10 +68,8 @@ class NLPLayer:
 
         truncated_text = self.text[: self.max_text_length]
 
-        loop = asyncio.get_event_loop()
-
         pipeline = get_collection_model(candidate_topics)
-        result = await loop.run_in_executor(None, lambda: pipeline(truncated_text))
+        result = await pipeline(truncated_text)
 
         return result
 
@@ -92,44 +78,52 @@ class NLPLayer:
 
         truncated_text = self.text[:1024]
 
-        loop = asyncio.get_event_loop()
-
         pipeline = get_title_model()
-        result = await loop.run_in_executor(
-            None,
-            lambda: pipeline(truncated_text),
-        )
+        result = await pipeline(truncated_text)
 
         return result
 
-    async def tags(self) -> list[str]:
-        """
-        Suggest tags for the given text using the collection model and all tags from the database.
-        Uses async for session in get_async_session() for DB access. Does NOT use DbSession.
+    async def analyze(
+        self,
+        candidate_topics: list[str] | None = None,
+        candidate_tags: list[str] | None = None,
+    ) -> dict[str, Any]:
+        """Generate title, summary, collection and tags with a single request.
+
+        The model answers with JSON matching a response schema, replacing the
+        four separate requests of ``title``, ``summarize``, ``collection`` and
+        ``tags``. Tags are chosen from ``candidate_tags``, by default the most
+        used tags, or created.
         """
+        if candidate_tags is None:
+            candidate_tags = await get_tag_suggester().popular_tags()
 
-        session_manager = get_db_session_manager()
+        truncated_text = self.text[:1024]
+
+        pipeline = get_analysis_model(candidate_topics, candidate_tags)
+        result = await pipeline(truncated_text)
+
+        result["tags"] = [
+            tag.strip().lower() for tag in result.get("tags", []) if tag.strip()
+        ][:5]
+        return result
+
+    async def tags(self, candidate_tags: list[str] | None = None) -> list[str]:
+        """
+        Suggest tags for the given text, choosing from ``candidate_tags`` (by
+        default the most used tags) or creating new ones.
+        """
 
         def process_tag(tag: str) -> str:
             """Process tag to ensure it is a valid string."""
             return tag.strip().lower() if tag else ""
 
-        async with session_manager.get_session() as session:
-            result = await session.execute(select(Tag.name))
-
-            all_tags = result.scalars().all()
-            truncated_text = self.text[: self.max_text_length]
-            tags_model = get_tags_model(all_tags)
-            # Use default arguments to bind variables in lambda
-            loop = asyncio.get_event_loop()
-            tags_result = await loop.run_in_executor(
-                None,
-                lambda tags_model=tags_model, truncated_text=truncated_text: tags_model(
-                    truncated_text
-                ),
-            )
-            tags_result = [process_tag(tag) for tag in tags_result]
-            print(f"=====================Tags result: {tags_result}")
-            return tags_result
-
-        return []
+        if candidate_tags is None:
+            candidate_tags = await get_tag_suggester().popular_tags()
+
+        truncated_text = self.text[: self.max_text_length]
+        tags_model = get_tags_model(candidate_tags)
+        tags_result = await tags_model(truncated_text)
+        tags_result = [process_tag(tag) for tag in tags_result]
+        print(f"=====================Tags result: {tags_result}")
+        return tags_result
@@ -0,0 +1,170 @@
+"""
+Sentence embeddings with an ONNX export of the model through onnxruntime.
+
+Runs the ONNX export of the sentence-transformers model that is published
+with it, with the same tokenizer, truncation, mean pooling and normalization
+as the PyTorch model, so embeddings are interchangeable with the ones
+already stored. The weights can be quantized to int8 with dynamic
+quantization, which makes CPU inference faster and the model smaller.
+Neither needs torch, which is never imported by this backend.
+
+Requires the optional ``onnx`` dependencies: ``uv sync --extra onnx``.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Maximum sequence length of all-MiniLM-L6-v2, used when the model does not
+# configure one
+DEFAULT_MAX_SEQ_LENGTH = 256
+
+
+class OnnxEmbeddingBackend:
+    """Encodes texts with an ONNX sentence-transformers model.
+
+    Example:
+        ```python
+        backend = OnnxEmbeddingBackend(
+            "sentence-transformers/all-MiniLM-L6-v2", quantize=True
+        )
+        embeddings = backend.encode(["first text", "second text"])
+        ```
+    """
+
+    def __init__(
+        self,
+        model: str,
+        quantize: bool = True,
+        cache_dir: str = "~/.cache/cuda/onnx",
+        threads: int = 0,
+    ) -> None:
+        """Load the tokenizer and the ONNX model, quantizing it if needed.
+
+        Args:
+            model: Hugging Face Hub id or local directory of a
+                sentence-transformers model with an ``onnx/model.onnx`` export.
+            quantize: Whether to run the int8 dynamically quantized model.
+            cache_dir: Directory the quantized model is stored in.
+            threads: Threads per inference, zero for the onnxruntime default.
+        """
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise RuntimeError(
+                "The onnx embedding backend needs the onnx extra: uv sync --extra onnx"
+            ) from e
+
+        model_dir = _model_dir(model)
+        model_path = model_dir / "onnx" / "model.onnx"
+        if quantize:
+            model_path = _quantized_model(model_path, Path(cache_dir).expanduser())
+        self.name = "onnx-int8" if quantize else "onnx"
+
+        self.tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=_max_seq_length(model_dir))
+        self.tokenizer.enable_padding(
+            pad_id=self.tokenizer.token_to_id("[PAD]") or 0, pad_token="[PAD]"
+        )
+
+        options = onnxruntime.SessionOptions()
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            str(model_path), options, providers=["CPUExecutionProvider"]
+        )
+        self._inputs = {model_input.name for model_input in self.session.get_inputs()}
+        outputs = [output.name for output in self.session.get_outputs()]
+        self._output = (
+            "last_hidden_state" if "last_hidden_state" in outputs else outputs[0]
+        )
+        logger.info(f"Loaded ONNX embedding model {model_path}")
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """Embed a batch of texts.
+
+        Args:
+            texts: Texts to embed.
+
+        Returns:
+            Array of unit-length embeddings, one row per text.
+        """
+        encodings = self.tokenizer.encode_batch(texts)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        features = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": attention_mask,
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        (token_embeddings,) = self.session.run(
+            [self._output],
+            {name: value for name, value in features.items() if name in self._inputs},
+        )
+
+        # Mean of the token embeddings without padding, then L2 normalization,
+        # as the Pooling and Normalize modules of the sentence-transformers model
+        mask = attention_mask[..., np.newaxis].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(
+            mask.sum(axis=1), 1e-9, None
+        )
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return pooled / np.clip(norms, 1e-12, None)
+
+
+def _model_dir(model: str) -> Path:
+    """Return the local directory of a model, downloading it if needed."""
+    if Path(model).is_dir():
+        return Path(model)
+
+    from huggingface_hub import snapshot_download
+
+    return Path(
+        snapshot_download(
+            model,
+            allow_patterns=[
+                "onnx/model.onnx",
+                "tokenizer.json",
+                "sentence_bert_config.json",
+            ],
+        )
+    )
+
+
+def _max_seq_length(model_dir: Path) -> int:
+    """Read the maximum sequence length of the sentence-transformers model."""
+    config_path = model_dir / "sentence_bert_config.json"
+    if not config_path.exists():
+        return DEFAULT_MAX_SEQ_LENGTH
+    config = json.loads(config_path.read_text())
+    return config.get("max_seq_length", DEFAULT_MAX_SEQ_LENGTH)
+
+
+def _quantized_model(model_path: Path, cache_dir: Path) -> Path:
+    """Return the int8 quantized model, quantizing it on first use.
+
+    The file is named after the digest of the original model, so an updated
+    model is quantized again.
+    """
+    with model_path.open("rb") as f:
+        digest = hashlib.file_digest(f, "sha256").hexdigest()[:16]
+    quantized_path = cache_dir / f"model-{digest}-qint8.onnx"
+    if quantized_path.exists():
+        return quantized_path
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    logger.info(f"Quantizing {model_path} to int8")
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Written under a temporary name, so concurrent workers never load a
+    # partially written model
+    partial_path = quantized_path.with_name(f"{quantized_path.name}.{os.getpid()}")
+    quantize_dynamic(model_path, partial_path, weight_type=QuantType.QInt8)
+    partial_path.replace(quantized_path)
+    return quantized_path
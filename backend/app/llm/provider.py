@@ -0,0 +1,55 @@
+"""
+Interface of the LLM backends and selection of the configured one.
+
+The model functions in ``llm_models`` only depend on ``LLMProvider``, so the
+Gemini API can be replaced by the deterministic local stand-in in ``fake``
+to load test the pipeline without the live service.
+"""
+
+from functools import lru_cache
+from typing import Any, Protocol
+
+from app.llm.fake import get_fake_llm_provider
+from app.llm.gemini import get_gemini_client
+from app.settings import get_settings
+
+
+class LLMProvider(Protocol):
+    """Backend answering LLM requests.
+
+    Implementations send requests through the shared rate limiter and raise
+    ``httpx.HTTPStatusError`` for error responses, so retries and the circuit
+    breaker behave the same for every provider.
+    """
+
+    model: str
+
+    async def generate(
+        self,
+        task: str,
+        prompt: str,
+        response_schema: dict[str, Any] | None = None,
+    ) -> str:
+        """Generate a response for a task applied to a prompt.
+
+        Args:
+            task: Instructions for the model.
+            prompt: Text the instructions apply to.
+            response_schema: Optional JSON schema; the response is then JSON
+                matching it.
+
+        Returns:
+            str: The response text.
+        """
+        ...
+
+    async def aclose(self) -> None:
+        """Release the resources of the provider."""
+        ...
+
+
+@lru_cache
+def get_llm_provider() -> LLMProvider:
+    if get_settings().LLM_PROVIDER == "fake":
+        return get_fake_llm_provider()
+    return get_gemini_client()
@@ -0,0 +1,499 @@
+"""
+Client-side rate limiting, retries and circuit breaking for LLM calls.
+
+All LLM requests share two token buckets, one for requests per minute and one
+for tokens per minute, so bursts of bookmark imports stay within the API
+quota. Rate limited (429), overloaded (5xx) and failed connections are retried
+with jittered exponential backoff that honors ``Retry-After``. After several
+consecutive failures the circuit breaker opens: new calls and new jobs pause
+until the cool-down has passed instead of failing, then a single probe
+request decides whether it closes again. Calls that were failing start over
+with a fresh retry budget, but a call that waited for backoffs and the
+breaker longer than its limit fails, so an API that stays down fails the
+jobs using it.
+
+Time requests spend waiting for the limiter, the breaker or a backoff is
+counted on the stall clocks of the callers they were sent for, so a caller
+can leave its own waits out of its timeout.
+"""
+
+import asyncio
+import email.utils
+import logging
+import random
+import re
+import time
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from functools import lru_cache, wraps
+from typing import Any, ParamSpec, TypeVar
+
+import httpx
+
+from app.metrics.registry import get_metrics_registry
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+P = ParamSpec("P")
+
+RETRYABLE_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+# Retry delay in the body of Gemini errors, e.g. "retryDelay": "13s"
+RETRY_DELAY = re.compile(r'"retryDelay"\s*:\s*"(\d+(?:\.\d+)?)s"')
+
+
+class StallClock:
+    """Time during which requests of one caller waited for the limiter.
+
+    Waits count on the clocks current in the context a request is sent from,
+    so a caller measures its own waits, not those of unrelated requests.
+
+    Example:
+        ```python
+        clock = StallClock()
+        result = await wait_for_active(
+            clock.track(nlp.analyze)(topics), timeout=60, pause_clock=clock.seconds
+        )
+        ```
+    """
+
+    def __init__(self) -> None:
+        self._waiters = 0
+        self._since = 0.0
+        self._total = 0.0
+
+    @property
+    def waiting(self) -> bool:
+        """Whether a request currently waits."""
+        return self._waiters > 0
+
+    def seconds(self) -> float:
+        """Total time during which at least one request waited."""
+        total = self._total
+        if self._waiters:
+            total += time.monotonic() - self._since
+        return total
+
+    @contextmanager
+    def measure(self) -> Iterator[None]:
+        """Count the enclosed wait."""
+        if self._waiters == 0:
+            self._since = time.monotonic()
+        self._waiters += 1
+        try:
+            yield
+        finally:
+            self._waiters -= 1
+            if self._waiters == 0:
+                self._total += time.monotonic() - self._since
+
+    def track(self, func: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+        """Wrap a coroutine function so the waits of its requests count here."""
+
+        @wraps(func)
+        async def tracked(*args: P.args, **kwargs: P.kwargs) -> T:
+            with use_stall_clocks((*current_stall_clocks(), self)):
+                return await func(*args, **kwargs)
+
+        return tracked
+
+
+_stall_clocks: ContextVar[tuple[StallClock, ...]] = ContextVar(
+    "llm_stall_clocks", default=()
+)
+
+
+def current_stall_clocks() -> tuple[StallClock, ...]:
+    """Clocks the waits of requests sent from the current context count on."""
+    return _stall_clocks.get()
+
+
+@contextmanager
+def use_stall_clocks(clocks: Iterable[StallClock]) -> Iterator[None]:
+    """Count the waits of requests sent in the enclosed block on ``clocks``.
+
+    Used where one request is sent on behalf of several callers, e.g. a batch.
+    """
+    token = _stall_clocks.set(tuple(dict.fromkeys(clocks)))
+    try:
+        yield
+    finally:
+        _stall_clocks.reset(token)
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate.
+
+    Waiters are served in FIFO order. A rate of zero disables the bucket.
+    """
+
+    def __init__(self, per_minute: int, capacity: int | None = None) -> None:
+        """Initialize a full bucket.
+
+        Args:
+            per_minute: Tokens added per minute.
+            capacity: Maximum number of tokens, defaults to ``per_minute``.
+        """
+        self.per_minute = per_minute
+        self.capacity = capacity or per_minute
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waiting = 0
+
+    @property
+    def available(self) -> float:
+        """Tokens currently available; negative after an underestimate."""
+        self._refill()
+        return self._tokens
+
+    async def acquire(self, amount: float = 1) -> None:
+        """Wait until ``amount`` tokens are available and take them."""
+        if self.per_minute <= 0:
+            return
+        amount = min(amount, self.capacity)
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    self._refill()
+                    if self._tokens >= amount:
+                        self._tokens -= amount
+                        return
+                    missing = amount - self._tokens
+                    await asyncio.sleep(missing * 60 / self.per_minute)
+        finally:
+            self.waiting -= 1
+
+    def adjust(self, amount: float) -> None:
+        """Take (positive) or return (negative) tokens after the fact."""
+        if self.per_minute <= 0:
+            return
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens - amount)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.per_minute / 60)
+
+
+class LLMRateLimiter:
+    """Shared limiter, retry policy and circuit breaker for LLM requests.
+
+    Example:
+        ```python
+        limiter = get_llm_rate_limiter()
+        response = await limiter.run(lambda: client.post(url, json=data), tokens=800)
+        limiter.record_usage(estimated=800, actual=650)
+        ```
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 15,
+        tokens_per_minute: int = 1_000_000,
+        max_retries: int = 5,
+        backoff_base_seconds: float = 1.0,
+        backoff_max_seconds: float = 60.0,
+        breaker_threshold: int = 5,
+        breaker_cooldown_seconds: float = 60.0,
+        max_retry_wait_seconds: float = 600.0,
+    ) -> None:
+        """Initialize the limiter.
+
+        Args:
+            requests_per_minute: Requests allowed per minute, zero for no limit.
+            tokens_per_minute: Tokens allowed per minute, zero for no limit.
+            max_retries: Retries of a call failing with a server or connection
+                error, counted afresh after the breaker paused the call. Rate
+                limited calls are retried until the retry wait limit.
+            backoff_base_seconds: Base of the exponential backoff.
+            backoff_max_seconds: Upper bound of a single backoff delay.
+            breaker_threshold: Consecutive failures that open the breaker.
+            breaker_cooldown_seconds: Time the breaker stays open.
+            max_retry_wait_seconds: Time a call may wait for retry backoffs,
+                including those of rate limited attempts, and for the breaker
+                before its last error is raised; zero for no limit.
+        """
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown_seconds = breaker_cooldown_seconds
+        self.max_retry_wait_seconds = max_retry_wait_seconds
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+        self._probing = False
+        self._probe_done = asyncio.Event()
+        self._paused = 0
+        self._stall_clock = StallClock()
+        self._counters = {
+            "calls": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "failures": 0,
+            "breaker_opened": 0,
+        }
+
+    @property
+    def breaker_state(self) -> str:
+        """State of the breaker: open, half_open after a cool-down, or closed."""
+        if time.monotonic() < self._open_until:
+            return "open"
+        if self._consecutive_failures >= self.breaker_threshold > 0:
+            return "half_open"
+        return "closed"
+
+    @property
+    def saturated(self) -> bool:
+        """Whether requests currently wait for the limiter or the breaker."""
+        return self.breaker_state != "closed" or self._stall_clock.waiting
+
+    async def wait_while_open(self) -> bool:
+        """Pause while the circuit breaker is open.
+
+        Returns:
+            Whether the breaker was open.
+        """
+        paused = False
+        self._paused += 1
+        try:
+            while (remaining := self._open_until - time.monotonic()) > 0:
+                paused = True
+                await asyncio.sleep(remaining)
+        finally:
+            self._paused -= 1
+        return paused
+
+    async def wait_for_capacity(self) -> None:
+        """Wait until the breaker is closed and a request could be sent now.
+
+        Nothing is reserved; the wait only keeps work that is about to send
+        requests from starting while the limiter is saturated.
+        """
+        await self.wait_while_open()
+        while self.requests.per_minute > 0 and self.requests.available < 1:
+            await asyncio.sleep(60 / self.requests.per_minute)
+            await self.wait_while_open()
+
+    def stalled_seconds(self) -> float:
+        """Total time during which at least one request waited for the
+        buckets, the breaker or a retry backoff."""
+        return self._stall_clock.seconds()
+
+    async def run(self, func: Callable[[], Awaitable[T]], tokens: int = 0) -> T:
+        """Run an LLM request within the limits, retrying transient failures.
+
+        Args:
+            func: Function sending the request; it must raise
+                ``httpx.HTTPStatusError`` for error responses.
+            tokens: Estimated number of tokens the request uses.
+
+        Returns:
+            The result of ``func``.
+
+        Raises:
+            Exception: The last error if it is not transient, the retries are
+                exhausted or the call waited too long for backoffs and the
+                breaker.
+        """
+        self._counters["calls"] += 1
+        attempt = 0
+        retries = 0
+        # Time spent waiting for the breaker and retry backoffs
+        retry_wait = 0.0
+        while True:
+            started = time.monotonic()
+            with self._stalled():
+                paused, probe = await self._pass_breaker()
+            retry_wait += time.monotonic() - started
+            # The breaker decides about failures once it has opened, so a
+            # call paused by it gets a fresh retry budget
+            if paused:
+                attempt = 0
+            try:
+                with self._stalled():
+                    await self.requests.acquire(1)
+                    await self.tokens.acquire(tokens)
+                result = await func()
+            except Exception as e:
+                error = e
+                if self._is_retryable(error):
+                    self._record_failure()
+            else:
+                self._consecutive_failures = 0
+                return result
+            finally:
+                # Calls waiting for the probe see the breaker closed or open
+                if probe:
+                    self._end_probe()
+
+            if not self._is_retryable(error):
+                self._counters["failures"] += 1
+                raise error
+            rate_limited = (
+                isinstance(error, httpx.HTTPStatusError)
+                and error.response.status_code == 429
+            )
+            if rate_limited:
+                self._counters["rate_limited"] += 1
+            else:
+                attempt += 1
+            retries += 1
+            delay = self._retry_delay(error, retries)
+            # An open breaker pauses the call instead of failing it, up to
+            # the limit of the total wait
+            out_of_retries = attempt > self.max_retries and self.breaker_state != "open"
+            out_of_time = 0 < self.max_retry_wait_seconds <= retry_wait + delay
+            if out_of_retries or out_of_time:
+                self._counters["failures"] += 1
+                raise error
+
+            self._counters["retries"] += 1
+            reason = (
+                f"HTTP {error.response.status_code}"
+                if isinstance(error, httpx.HTTPStatusError)
+                else type(error).__name__
+            )
+            logger.warning(f"LLM request failed ({reason}), retrying in {delay:.1f}s")
+            started = time.monotonic()
+            with self._stalled():
+                await asyncio.sleep(delay)
+            retry_wait += time.monotonic() - started
+
+    def record_usage(self, estimated: int, actual: int) -> None:
+        """Correct the token bucket with the usage reported by the API."""
+        self.tokens.adjust(actual - estimated)
+
+    def stats(self) -> dict[str, Any]:
+        """Return the live state of the buckets and the circuit breaker."""
+        return {
+            "requests_per_minute": self.requests.per_minute,
+            "requests_available": round(self.requests.available, 2),
+            "requests_waiting": self.requests.waiting,
+            "tokens_per_minute": self.tokens.per_minute,
+            "tokens_available": round(self.tokens.available),
+            "tokens_waiting": self.tokens.waiting,
+            "breaker_state": self.breaker_state,
+            "breaker_open_seconds": max(0.0, self._open_until - time.monotonic()),
+            "consecutive_failures": self._consecutive_failures,
+            "paused": self._paused,
+            "stalled_seconds": round(self.stalled_seconds(), 3),
+            **self._counters,
+        }
+
+    @contextmanager
+    def _stalled(self) -> Iterator[None]:
+        """Count the enclosed wait on the limiter's and the callers' clocks."""
+        with ExitStack() as stack:
+            for clock in (self._stall_clock, *current_stall_clocks()):
+                stack.enter_context(clock.measure())
+            yield
+
+    async def _pass_breaker(self) -> tuple[bool, bool]:
+        """Wait until the breaker lets a request through.
+
+        Once the cool-down has passed, a single request probes the API while
+        the others wait for its outcome.
+
+        Returns:
+            Whether the call was paused, and whether it is the probe.
+        """
+        paused = False
+        while True:
+            if await self.wait_while_open():
+                paused = True
+            if self.breaker_state != "half_open":
+                return paused, False
+            if not self._probing:
+                self._probing = True
+                return paused, True
+            paused = True
+            self._paused += 1
+            try:
+                await self._probe_done.wait()
+            finally:
+                self._paused -= 1
+
+    def _end_probe(self) -> None:
+        """Wake the calls waiting for the outcome of the probe."""
+        self._probing = False
+        self._probe_done.set()
+        self._probe_done = asyncio.Event()
+
+    def _record_failure(self) -> None:
+        """Count a transient failure and open the breaker at the threshold."""
+        self._consecutive_failures += 1
+        if (
+            0 < self.breaker_threshold <= self._consecutive_failures
+            and self.breaker_state != "open"
+        ):
+            self._open_until = time.monotonic() + self.breaker_cooldown_seconds
+            self._counters["breaker_opened"] += 1
+            logger.warning(
+                f"LLM circuit breaker open for {self.breaker_cooldown_seconds}s "
+                f"after {self._consecutive_failures} consecutive failures"
+            )
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in RETRYABLE_STATUS_CODES
+        return isinstance(error, httpx.TransportError)
+
+    def _retry_delay(self, error: Exception, retries: int) -> float:
+        """Delay before the next attempt: the server's hint or full jitter."""
+        if isinstance(error, httpx.HTTPStatusError):
+            retry_after = _parse_retry_after(error.response)
+            if retry_after is not None:
+                return min(retry_after, self.backoff_max_seconds) + random.uniform(
+                    0, self.backoff_base_seconds
+                )
+        ceiling = min(
+            self.backoff_max_seconds, self.backoff_base_seconds * 2 ** (retries - 1)
+        )
+        return random.uniform(0, ceiling)
+
+
+def _parse_retry_after(response: httpx.Response) -> float | None:
+    """Read the retry delay from the Retry-After header or a Gemini error."""
+    header = response.headers.get("Retry-After")
+    if header:
+        try:
+            return max(0.0, float(header))
+        except ValueError:
+            try:
+                date = email.utils.parsedate_to_datetime(header)
+                return max(0.0, (date - datetime.now(UTC)).total_seconds())
+            except (TypeError, ValueError):
+                pass
+    try:
+        match = RETRY_DELAY.search(response.text)
+    except Exception:
+        return None
+    return float(match.group(1)) if match else None
+
+
+@lru_cache
+def get_llm_rate_limiter() -> LLMRateLimiter:
+    settings = get_settings()
+    limiter = LLMRateLimiter(
+        requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+        max_retries=settings.LLM_MAX_RETRIES,
+        backoff_base_seconds=settings.LLM_BACKOFF_BASE_SECONDS,
+        backoff_max_seconds=settings.LLM_BACKOFF_MAX_SECONDS,
+        breaker_threshold=settings.LLM_CIRCUIT_BREAKER_THRESHOLD,
+        breaker_cooldown_seconds=settings.LLM_CIRCUIT_BREAKER_COOLDOWN_SECONDS,
+        max_retry_wait_seconds=settings.LLM_MAX_RETRY_WAIT_SECONDS,
+    )
+    get_metrics_registry().register("llm_rate_limiter", limiter.stats)
+    return limiter
@@ -0,0 +1,229 @@
+"""
+Tag suggestions voted by the nearest tagged bookmarks.
+
+The k pages most similar to a new page by content embedding vote for the tags
+of their bookmarks, each vote weighted by the page's cosine similarity. The
+best voted tags replace the whole tag vocabulary in the LLM prompt, so the
+prompt stays bounded as the tag table grows. When the vote is clear enough
+the voted tags are used directly and the LLM is not asked at all.
+
+Without neighbours, e.g. before anything is tagged, the most used tags are
+the candidates.
+"""
+
+import logging
+from collections import defaultdict
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import DbSessionManager, get_db_session_manager
+from app.metrics.registry import get_metrics_registry
+from app.models import Bookmark, ContentEmbedding, Tag, TagBookmarkAssociation
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of tags of a bookmark, as asked from the LLM
+MAX_TAGS = 5
+
+
+@dataclass
+class TagSuggestion:
+    """Tags voted by the neighbours of a page.
+
+    Attributes:
+        candidates: Tags to offer the LLM, best voted first.
+        scores: Share of the neighbours' similarity that voted for each tag.
+        tags: Tags clear enough to use without the LLM.
+        confident: Whether ``tags`` can be used instead of asking the LLM.
+    """
+
+    candidates: list[str] = field(default_factory=list)
+    scores: dict[str, float] = field(default_factory=dict)
+    tags: list[str] = field(default_factory=list)
+    confident: bool = False
+
+
+class TagSuggester:
+    """Suggests tags from the tags of the most similar bookmarks.
+
+    Example:
+        ```python
+        suggestion = await get_tag_suggester().suggest(embedding, exclude_url=url)
+        if suggestion.confident:
+            tags = suggestion.tags
+        else:
+            tags = await nlp.tags(suggestion.candidates)
+        ```
+    """
+
+    def __init__(
+        self,
+        session_manager: DbSessionManager,
+        neighbours: int = 10,
+        max_candidates: int = 20,
+        min_similarity: float = 0.5,
+        min_neighbours: int = 3,
+        confident_score: float = 0.6,
+        min_confident_tags: int = 2,
+        skip_llm: bool = True,
+    ) -> None:
+        """Initialize the suggester.
+
+        Args:
+            session_manager: Database session manager to query with.
+            neighbours: Number of nearest tagged pages that vote.
+            max_candidates: Maximum number of tags offered to the LLM.
+            min_similarity: Neighbours less similar than this do not vote.
+            min_neighbours: Voting neighbours needed for a confident vote.
+            confident_score: Score a tag needs to be used without the LLM.
+            min_confident_tags: Tags reaching ``confident_score`` needed for
+                a confident vote.
+            skip_llm: Whether confident votes replace the LLM at all.
+        """
+        self.session_manager = session_manager
+        self.neighbours = neighbours
+        self.max_candidates = max_candidates
+        self.min_similarity = min_similarity
+        self.min_neighbours = min_neighbours
+        self.confident_score = confident_score
+        self.min_confident_tags = min_confident_tags
+        self.skip_llm = skip_llm
+        self._counters = {"suggestions": 0, "confident": 0, "cold_starts": 0}
+
+    async def suggest(
+        self, embedding: Sequence[float] | None, exclude_url: str | None = None
+    ) -> TagSuggestion:
+        """Vote on the tags of the nearest tagged pages.
+
+        Args:
+            embedding: Content embedding of the page, if available.
+            exclude_url: URL of the page itself, which does not vote.
+
+        Returns:
+            TagSuggestion: Candidates for the LLM and, if the vote is
+                confident, the tags to use instead.
+        """
+        self._counters["suggestions"] += 1
+        async with self.session_manager.get_session() as session:
+            neighbours: list[tuple[str, float]] = []
+            if embedding is not None and any(embedding):
+                distance = ContentEmbedding.embedding.cosine_distance(embedding)
+                tagged_urls = select(Bookmark.url).join(
+                    TagBookmarkAssociation,
+                    TagBookmarkAssociation.bookmark_id == Bookmark.id,
+                )
+                query = (
+                    select(ContentEmbedding.url, (1 - distance).label("similarity"))
+                    .where(ContentEmbedding.url.in_(tagged_urls))
+                    .order_by(distance)
+                    .limit(self.neighbours)
+                )
+                if exclude_url is not None:
+                    query = query.where(ContentEmbedding.url != exclude_url)
+                result = await session.execute(query)
+                neighbours = [
+                    (url, similarity)
+                    for url, similarity in result.all()
+                    if similarity >= self.min_similarity
+                ]
+
+            scores: dict[str, float] = {}
+            if neighbours:
+                similarities = dict(neighbours)
+                result = await session.execute(
+                    select(Bookmark.url, TagBookmarkAssociation.tag_name)
+                    .join(
+                        TagBookmarkAssociation,
+                        TagBookmarkAssociation.bookmark_id == Bookmark.id,
+                    )
+                    .where(Bookmark.url.in_(similarities))
+                    .distinct()
+                )
+                votes: dict[str, float] = defaultdict(float)
+                for url, tag_name in result.all():
+                    votes[tag_name] += similarities[url]
+                total = sum(similarities.values())
+                scores = {tag: vote / total for tag, vote in votes.items()}
+            else:
+                self._counters["cold_starts"] += 1
+
+            candidates = sorted(scores, key=lambda tag: (-scores[tag], tag))
+            candidates = candidates[: self.max_candidates]
+            if len(candidates) < self.max_candidates:
+                candidates += await self._popular_tags(session, exclude=candidates)
+
+        tags = [tag for tag in candidates if scores.get(tag, 0) >= self.confident_score]
+        confident = (
+            self.skip_llm
+            and len(neighbours) >= self.min_neighbours
+            and len(tags) >= self.min_confident_tags
+        )
+        if confident:
+            self._counters["confident"] += 1
+        return TagSuggestion(
+            candidates=candidates,
+            scores=scores,
+            tags=tags[:MAX_TAGS],
+            confident=confident,
+        )
+
+    async def popular_tags(self) -> list[str]:
+        """Return the most used tags, the candidates without neighbours."""
+        async with self.session_manager.get_session() as session:
+            return await self._popular_tags(session)
+
+    def stats(self) -> dict[str, Any]:
+        """Return how often the LLM could be skipped."""
+        suggestions = self._counters["suggestions"]
+        return {
+            **self._counters,
+            "confident_rate": (
+                self._counters["confident"] / suggestions if suggestions else 0.0
+            ),
+            "neighbours": self.neighbours,
+            "max_candidates": self.max_candidates,
+        }
+
+    async def _popular_tags(
+        self, session: AsyncSession, exclude: Sequence[str] = ()
+    ) -> list[str]:
+        limit = self.max_candidates - len(exclude)
+        if limit <= 0:
+            return []
+        usage = func.count(TagBookmarkAssociation.bookmark_id)
+        query = (
+            select(Tag.name)
+            .outerjoin(
+                TagBookmarkAssociation, TagBookmarkAssociation.tag_name == Tag.name
+            )
+            .group_by(Tag.name)
+            .order_by(usage.desc(), Tag.name)
+            .limit(limit)
+        )
+        if exclude:
+            query = query.where(Tag.name.not_in(exclude))
+        result = await session.execute(query)
+        return list(result.scalars().all())
+
+
+@lru_cache
+def get_tag_suggester() -> TagSuggester:
+    settings = get_settings()
+    suggester = TagSuggester(
+        get_db_session_manager(),
+        neighbours=settings.TAG_SUGGESTER_NEIGHBOURS,
+        max_candidates=settings.TAG_SUGGESTER_MAX_CANDIDATES,
+        min_similarity=settings.TAG_SUGGESTER_MIN_SIMILARITY,
+        min_neighbours=settings.TAG_SUGGESTER_MIN_NEIGHBOURS,
+        confident_score=settings.TAG_SUGGESTER_CONFIDENT_SCORE,
+        min_confident_tags=settings.TAG_SUGGESTER_MIN_CONFIDENT_TAGS,
+        skip_llm=settings.TAG_SUGGESTER_SKIP_LLM,
+    )
+    get_metrics_registry().register("tag_suggester", suggester.stats)
+    return suggester
@@ -0,0 +1,227 @@
+"""
+Shared vocabulary of generated topics.
+
+Topics the LLM creates for pages are stored in the database with their usage
+count and the embedding of their name, so all workers share them and they
+survive restarts. Every worker keeps a bounded, least recently used view of
+the most frequent topics, reloaded periodically to pick up topics created by
+other workers. Prompts only get the topics most similar to the document
+instead of every topic ever seen.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db import DbSessionManager, get_db_session_manager
+from app.llm.embeddings import EmbeddingLayer
+from app.metrics.registry import get_metrics_registry
+from app.models import Topic
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+MAX_TOPIC_LENGTH = 256
+
+
+@dataclass
+class CachedTopic:
+    """Topic in the in-memory view, with its normalized name embedding."""
+
+    usage_count: int
+    embedding: np.ndarray | None
+
+
+class TopicVocabulary:
+    """Database-backed topic vocabulary with a bounded in-memory view.
+
+    Example:
+        ```python
+        vocabulary = get_topic_vocabulary()
+        topics = await vocabulary.relevant(embedding)
+        topic = await classify(text, candidates=topics)
+        await vocabulary.record(topic)
+        ```
+    """
+
+    def __init__(
+        self,
+        session_manager: DbSessionManager,
+        max_cached: int = 1000,
+        refresh_seconds: float = 300.0,
+        top_k: int = 20,
+    ) -> None:
+        """Initialize an empty view, loaded on first use.
+
+        Args:
+            session_manager: Database session manager to store topics with.
+            max_cached: Maximum number of topics kept in memory.
+            refresh_seconds: Age after which the view is reloaded from the
+                database.
+            top_k: Number of topics returned by ``relevant``.
+        """
+        self.session_manager = session_manager
+        self.max_cached = max_cached
+        self.refresh_seconds = refresh_seconds
+        self.top_k = top_k
+        self._topics: OrderedDict[str, CachedTopic] = OrderedDict()
+        self._loaded_at = float("-inf")
+        self._refresh_lock = asyncio.Lock()
+        self._counters = {"recorded": 0, "new": 0, "refreshes": 0, "evicted": 0}
+
+    async def relevant(
+        self, embedding: Sequence[float] | None = None, k: int | None = None
+    ) -> list[str]:
+        """Return the topics most similar to a document.
+
+        Args:
+            embedding: Content embedding of the document. Without it the most
+                frequent topics are returned.
+            k: Number of topics, defaults to ``top_k``.
+
+        Returns:
+            Up to ``k`` topic names, most relevant first.
+        """
+        await self._refresh_if_stale()
+        k = self.top_k if k is None else k
+        if k <= 0 or not self._topics:
+            return []
+
+        names = list(self._topics)
+        counts = np.array([topic.usage_count for topic in self._topics.values()])
+        query = _normalize(embedding)
+        if query is None:
+            order = np.argsort(-counts, kind="stable")
+        else:
+            # Topics without an embedding rank below all others
+            scores = np.array(
+                [
+                    -2.0 if topic.embedding is None else float(topic.embedding @ query)
+                    for topic in self._topics.values()
+                ]
+            )
+            order = np.lexsort((-counts, -scores))
+
+        selected = [names[index] for index in order[:k]]
+        for name in selected:
+            self._topics.move_to_end(name)
+        return selected
+
+    async def record(self, name: str) -> None:
+        """Count a use of a topic, adding it to the vocabulary if it is new."""
+        name = name.strip()[:MAX_TOPIC_LENGTH]
+        if not name:
+            return
+
+        cached = self._topics.get(name)
+        embedding = cached.embedding if cached else None
+        if embedding is None:
+            embedding = _normalize(await EmbeddingLayer(name).create_embedding())
+
+        now = datetime.now(UTC)
+        statement = insert(Topic).values(
+            name=name,
+            usage_count=1,
+            embedding=None if embedding is None else embedding.tolist(),
+            last_used_at=now,
+        )
+        async with self.session_manager.get_session() as session:
+            result = await session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["name"],
+                    set_={
+                        "usage_count": Topic.usage_count + 1,
+                        "last_used_at": now,
+                        "embedding": func.coalesce(
+                            Topic.embedding, statement.excluded.embedding
+                        ),
+                    },
+                ).returning(Topic.usage_count)
+            )
+            usage_count = result.scalar_one()
+            await session.commit()
+
+        self._counters["recorded"] += 1
+        if usage_count == 1:
+            self._counters["new"] += 1
+        self._topics[name] = CachedTopic(usage_count, embedding)
+        self._topics.move_to_end(name)
+        self._evict()
+
+    async def refresh(self) -> None:
+        """Reload the view with the most frequent topics of all workers."""
+        async with self.session_manager.get_session() as session:
+            result = await session.execute(
+                select(Topic.name, Topic.usage_count, Topic.embedding)
+                .order_by(Topic.usage_count.desc(), Topic.last_used_at.desc())
+                .limit(self.max_cached)
+            )
+            rows = result.all()
+
+        # Least recently used first, as the view evicts from the front
+        self._topics = OrderedDict(
+            (name, CachedTopic(usage_count, _normalize(embedding)))
+            for name, usage_count, embedding in reversed(rows)
+        )
+        self._loaded_at = time.monotonic()
+        self._counters["refreshes"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Return the size of the view and the vocabulary counters."""
+        return {
+            **self._counters,
+            "cached": len(self._topics),
+            "max_cached": self.max_cached,
+            "view_age_seconds": round(time.monotonic() - self._loaded_at, 1)
+            if self._topics
+            else None,
+        }
+
+    async def _refresh_if_stale(self) -> None:
+        if time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return
+        async with self._refresh_lock:
+            if time.monotonic() - self._loaded_at < self.refresh_seconds:
+                return
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep serving the stale view, and retry on the next call
+                logger.error(f"Topic vocabulary refresh failed: {e}")
+
+    def _evict(self) -> None:
+        while len(self._topics) > self.max_cached:
+            self._topics.popitem(last=False)
+            self._counters["evicted"] += 1
+
+
+def _normalize(embedding: Sequence[float] | None) -> np.ndarray | None:
+    """Scale an embedding to unit length, None for a missing or zero vector."""
+    if embedding is None:
+        return None
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else None
+
+
+@lru_cache
+def get_topic_vocabulary() -> TopicVocabulary:
+    settings = get_settings()
+    vocabulary = TopicVocabulary(
+        get_db_session_manager(),
+        max_cached=settings.TOPIC_VOCABULARY_MAX_CACHED,
+        refresh_seconds=settings.TOPIC_VOCABULARY_REFRESH_SECONDS,
+        top_k=settings.TOPIC_VOCABULARY_TOP_K,
+    )
+    get_metrics_registry().register("topic_vocabulary", vocabulary.stats)
+    return vocabulary
@@ -3,7 +3,15 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 from app.core.jobs import cleanup_orphaned_jobs
+from app.llm.cache import get_llm_cache
+from app.llm.collection_classifier import get_collection_classifier
+from app.llm.embeddings import get_embedding_service
+from app.llm.provider import get_llm_provider
 from app.routes import api_router
+from app.scrapper.browser_pool import get_browser_pool
+from app.scrapper.http_fetcher import get_http_client
+from app.scrapper.snapshots import get_snapshot_store
+from app.search.query_cache import get_query_embedding_cache
 from app.settings import get_settings
 
 
@@ -12,10 +20,49 @@ async def lifespan(_app: FastAPI):
     print("🚀 Starting FastAPI application...")
     await cleanup_orphaned_jobs()
 
+    try:
+        evicted = await get_snapshot_store().prune()
+        print(f"🧹 Evicted {evicted} expired HTML snapshots")
+    except Exception as e:
+        print(f"❌ Error evicting HTML snapshots: {e}")
+
+    try:
+        evicted = await get_llm_cache().prune()
+        print(f"🧹 Evicted {evicted} expired LLM cache entries")
+    except Exception as e:
+        print(f"❌ Error evicting LLM cache entries: {e}")
+
+    try:
+        evicted = await get_query_embedding_cache().prune()
+        print(f"🧹 Evicted {evicted} expired shared query embeddings")
+    except Exception as e:
+        print(f"❌ Error evicting shared query embeddings: {e}")
+
+    try:
+        centroids = await get_collection_classifier().rebuild()
+        print(f"🧭 Rebuilt {centroids} collection centroids")
+    except Exception as e:
+        print(f"❌ Error rebuilding collection centroids: {e}")
+
+    browser_pool = get_browser_pool()
+    try:
+        await browser_pool.start()
+        print(f"🌐 Browser pool ready with {browser_pool.size} browsers")
+    except Exception as e:
+        print(f"❌ Error starting browser pool, browsers will start lazily: {e}")
+
+    # Pooled connections to the LLM API, closed on shutdown
+    llm_provider = get_llm_provider()
+    print(f"🤖 LLM provider: {llm_provider.model}")
+
     yield
 
     # Shutdown
     print("🔄 Shutting down FastAPI application...")
+    await browser_pool.close()
+    await get_http_client().aclose()
+    await llm_provider.aclose()
+    get_embedding_service().close()
 
 
 settings = get_settings()
@@ -0,0 +1,37 @@
+"""
+Registry of live runtime metrics.
+
+Long-lived components such as the scrape scheduler register a snapshot
+function under a name; the metrics endpoint calls all of them on request.
+"""
+
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any
+
+MetricsProvider = Callable[[], dict[str, Any]]
+
+
+class MetricsRegistry:
+    """Collects named metric snapshot providers."""
+
+    def __init__(self) -> None:
+        self._providers: dict[str, MetricsProvider] = {}
+
+    def register(self, name: str, provider: MetricsProvider) -> None:
+        """Register a provider, replacing any previous one with the same name.
+
+        Args:
+            name: Key under which the snapshot is reported.
+            provider: Function returning a JSON-serializable snapshot.
+        """
+        self._providers[name] = provider
+
+    def snapshot(self) -> dict[str, Any]:
+        """Collect the current snapshot of every registered provider."""
+        return {name: provider() for name, provider in self._providers.items()}
+
+
+@lru_cache
+def get_metrics_registry() -> MetricsRegistry:
+    return MetricsRegistry()
@@ -0,0 +1,13 @@
+from typing import Any
+
+from fastapi import APIRouter
+
+from app.metrics.registry import get_metrics_registry
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/", response_model=dict[str, Any])
+async def read_metrics() -> dict[str, Any]:
+    """Get live metrics of the scraping and analysis components."""
+    return get_metrics_registry().snapshot()
@@ -2,4 +2,5 @@ from .ai import *  # noqa: F403
 from .base import *  # noqa: F403
 from .core import *  # noqa: F403
 from .job import *  # noqa: F403
+from .snapshot import *  # noqa: F403
 from .tag import *  # noqa: F403
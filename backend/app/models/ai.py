@@ -1,13 +1,51 @@
-__all__ = ["BookmarkAISuggestion", "ContentEmbedding"]
+__all__ = [
+    "BookmarkAISuggestion",
+    "CollectionCentroid",
+    "ContentChunk",
+    "ContentEmbedding",
+    "LLMCacheEntry",
+    "QueryEmbeddingCacheEntry",
+    "Topic",
+]
 
 import uuid
+from datetime import datetime
 
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import ARRAY, ForeignKey, String, text
+from sqlalchemy import (
+    ARRAY,
+    Computed,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base, CreatedUpdatedAtMixin, IdMixin
-from app.models.core import Bookmark
+from app.models.core import Bookmark, Collection
+
+# Build parameters of the HNSW indexes on embeddings: connections per node
+# and the candidate list size while building. Changing them takes effect
+# only when the index is rebuilt; see ``app.search.benchmark`` for tuning.
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 64
+
+
+def _hnsw_index(name: str, column: str = "embedding") -> Index:
+    """Approximate nearest neighbour index for cosine distance search."""
+    return Index(
+        name,
+        column,
+        postgresql_using="hnsw",
+        postgresql_with={"m": HNSW_M, "ef_construction": HNSW_EF_CONSTRUCTION},
+        postgresql_ops={column: "vector_cosine_ops"},
+    )
 
 
 class BookmarkAISuggestion(Base):
@@ -36,11 +74,136 @@ class ContentEmbedding(Base, IdMixin, CreatedUpdatedAtMixin):
     """Database model for storing content embeddings for semantic search."""
 
     __tablename__ = "content_embedding"
+    __table_args__ = (
+        _hnsw_index("ix_content_embedding_embedding_hnsw"),
+        Index(
+            "ix_content_embedding_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+    )
 
-    url: Mapped[str] = mapped_column(String(1024), nullable=False, index=True)
+    url: Mapped[str] = mapped_column(
+        String(1024), nullable=False, index=True, unique=True
+    )
     content_hash: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
     content_preview: Mapped[str] = mapped_column(String(500))
     embedding: Mapped[list[float]] = mapped_column(
         Vector(384),
         nullable=False,
     )
+    # Full-text search document of the preview, generated by the database
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(content_preview, '')), 'C')",
+            persisted=True,
+        ),
+        deferred=True,
+        init=False,
+        repr=False,
+    )
+
+
+class ContentChunk(Base, IdMixin):
+    """Passage of a page's content with its own embedding.
+
+    Long pages are split into overlapping passages so that all of their
+    content is searchable, not only the part that fits the model's input.
+    """
+
+    __tablename__ = "content_chunk"
+    __table_args__ = (
+        UniqueConstraint("content_embedding_id", "position"),
+        _hnsw_index("ix_content_chunk_embedding_hnsw"),
+    )
+
+    content_embedding_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("content_embedding.id", ondelete="CASCADE"), nullable=False
+    )
+    position: Mapped[int] = mapped_column(Integer, nullable=False)
+    heading: Mapped[str] = mapped_column(String(1024), nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    embedding: Mapped[list[float]] = mapped_column(Vector(384), nullable=False)
+
+
+class CollectionCentroid(Base):
+    """Sum and count of the content embeddings of a collection's bookmarks.
+
+    The sum points in the direction of the centroid, so it can be compared
+    by cosine distance directly and updated by adding and subtracting the
+    embeddings of bookmarks moving in and out of the collection.
+    """
+
+    __tablename__ = "collection_centroid"
+
+    collection_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("collection.id", ondelete="CASCADE"), primary_key=True
+    )
+    collection: Mapped[Collection] = relationship(init=False, uselist=False)
+
+    embedding_sum: Mapped[list[float]] = mapped_column(Vector(384), nullable=False)
+    bookmarks_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class LLMCacheEntry(Base):
+    """Cached LLM response for a model, prompt template version and input."""
+
+    __tablename__ = "llm_cache_entry"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    model: Mapped[str] = mapped_column(String(128), nullable=False)
+    template: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    template_version: Mapped[int] = mapped_column(Integer, nullable=False)
+    input_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    response: Mapped[str] = mapped_column(Text, nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=text("(now() AT TIME ZONE 'UTC')"),
+        index=True,
+        init=False,
+    )
+    last_accessed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=text("(now() AT TIME ZONE 'UTC')"),
+        index=True,
+        init=False,
+    )
+
+
+class QueryEmbeddingCacheEntry(Base):
+    """Cached embedding of a normalized search query, shared by all workers."""
+
+    __tablename__ = "query_embedding_cache_entry"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    model: Mapped[str] = mapped_column(String(256), nullable=False)
+    embedding: Mapped[list[float]] = mapped_column(Vector(384), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=text("(now() AT TIME ZONE 'UTC')"),
+        index=True,
+        init=False,
+    )
+
+
+class Topic(Base):
+    """Topic generated for a page, shared by all workers.
+
+    The embedding of the name ranks topics by similarity to a document.
+    """
+
+    __tablename__ = "topic"
+
+    name: Mapped[str] = mapped_column(String(256), primary_key=True)
+    usage_count: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    embedding: Mapped[list[float] | None] = mapped_column(
+        Vector(384), nullable=True, default=None
+    )
+    last_used_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=text("(now() AT TIME ZONE 'UTC')"),
+        index=True,
+        init=False,
+    )
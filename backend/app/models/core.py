@@ -7,7 +7,8 @@ import typing
 import uuid
 from dataclasses import field
 
-from sqlalchemy import ForeignKey, String, func, select
+from sqlalchemy import Computed, ForeignKey, Index, String, func, select
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, column_property, mapped_column, relationship
 
 from app.models.base import Base, IdMixin
@@ -36,6 +37,9 @@ class Bookmark(Base, IdMixin):
     """Bookmark model for storing URLs"""
 
     __tablename__ = "bookmark"
+    __table_args__ = (
+        Index("ix_bookmark_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     url: Mapped[str] = mapped_column(String(1024), nullable=False, index=True)
     title: Mapped[str | None] = mapped_column(
@@ -44,13 +48,36 @@ class Bookmark(Base, IdMixin):
     description: Mapped[str | None] = mapped_column(
         String(1024), nullable=True, default=None
     )
+    # Full-text search document, generated by the database
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', url), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+        init=False,
+        repr=False,
+    )
 
     collection_id: Mapped[uuid.UUID | None] = mapped_column(
-        ForeignKey("collection.id", ondelete="SET NULL"), nullable=True, default=None
+        ForeignKey("collection.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+        default=None,
     )
     collection: Mapped["Collection | None"] = relationship(
         back_populates="bookmarks", uselist=False, init=False
     )
+    # Current embedding of the bookmark's URL, shared by all bookmarks of it
+    content_embedding_id: Mapped[uuid.UUID | None] = mapped_column(
+        ForeignKey("content_embedding.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+        default=None,
+    )
 
     ai_suggestion: Mapped["BookmarkAISuggestion | None"] = relationship(
         back_populates="bookmark",
@@ -0,0 +1,53 @@
+__all__ = ["HtmlSnapshot", "PageSnapshot"]
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer, LargeBinary, String, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base, IdMixin
+
+
+class HtmlSnapshot(Base):
+    """Content-addressed, zstd-compressed raw HTML document."""
+
+    __tablename__ = "html_snapshot"
+
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    compressed_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=text("(now() AT TIME ZONE 'UTC')"),
+        init=False,
+    )
+    last_accessed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=text("(now() AT TIME ZONE 'UTC')"),
+        index=True,
+        init=False,
+    )
+
+
+class PageSnapshot(Base, IdMixin):
+    """Latest raw HTML snapshot fetched for a URL."""
+
+    __tablename__ = "page_snapshot"
+
+    url: Mapped[str] = mapped_column(String(1024), nullable=False, unique=True)
+    html_hash: Mapped[str] = mapped_column(
+        ForeignKey("html_snapshot.content_hash", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    fetched_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    etag: Mapped[str | None] = mapped_column(String(512), nullable=True, default=None)
+    last_modified: Mapped[str | None] = mapped_column(
+        String(64), nullable=True, default=None
+    )
+    content_hash: Mapped[str | None] = mapped_column(
+        String(64), nullable=True, default=None
+    )
@@ -7,7 +7,8 @@ from sqlalchemy import delete, select, update
 from sqlalchemy.orm import selectinload
 
 from app.db import DbSessionDep
-from app.models.core import Bookmark
+from app.llm.collection_classifier import get_collection_classifier
+from app.models import Bookmark, ContentEmbedding
 
 
 class BookmarkRepository:
@@ -51,8 +52,10 @@ class BookmarkRepository:
             title=title,
             description=description,
             collection_id=collection_id,
+            content_embedding_id=await self._content_embedding_id(url),
         )
         self.session.add(bookmark)
+        await get_collection_classifier().add_bookmark(self.session, url, collection_id)
         await self.session.commit()
         await self.session.refresh(
             bookmark, ["collection", "ai_suggestion", "tags", "id"]
@@ -61,10 +64,17 @@ class BookmarkRepository:
 
     async def delete(self, bookmark_id: uuid.UUID) -> int:
         result = await self.session.execute(
-            delete(Bookmark).where(Bookmark.id == bookmark_id)
+            delete(Bookmark)
+            .where(Bookmark.id == bookmark_id)
+            .returning(Bookmark.url, Bookmark.collection_id)
         )
+        deleted = result.all()
+        for deleted_url, deleted_collection_id in deleted:
+            await get_collection_classifier().remove_bookmark(
+                self.session, deleted_url, deleted_collection_id
+            )
         await self.session.commit()
-        return result.rowcount
+        return len(deleted)
 
     async def update(
         self,
@@ -75,6 +85,12 @@ class BookmarkRepository:
         description: str | None,
         collection_id: uuid.UUID | None,
     ):
+        previous = await self.session.execute(
+            select(Bookmark.url, Bookmark.collection_id).where(
+                Bookmark.id == bookmark_id
+            )
+        )
+        previous = previous.one_or_none()
         result = await self.session.execute(
             update(Bookmark)
             .where(Bookmark.id == bookmark_id)
@@ -83,10 +99,25 @@ class BookmarkRepository:
                 title=title,
                 description=description,
                 collection_id=collection_id,
+                content_embedding_id=await self._content_embedding_id(url),
             )
         )
+        # Move the page's embedding between collection centroids
+        if previous is not None and tuple(previous) != (url, collection_id):
+            classifier = get_collection_classifier()
+            await classifier.remove_bookmark(self.session, *previous)
+            await classifier.add_bookmark(self.session, url, collection_id)
         await self.session.commit()
         return result.rowcount
 
+    async def _content_embedding_id(self, url: str) -> uuid.UUID | None:
+        """Find the embedding of a URL, if it was embedded already."""
+        return await self.session.scalar(
+            select(ContentEmbedding.id)
+            .where(ContentEmbedding.url == url)
+            .order_by(ContentEmbedding.updated_at.desc())
+            .limit(1)
+        )
+
 
 BookmarkRepositoryDep = Annotated[BookmarkRepository, Depends(BookmarkRepository)]
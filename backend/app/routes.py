@@ -1,9 +1,11 @@
 from fastapi import APIRouter
 
 from app.core.router import router as core_router
+from app.metrics.router import router as metrics_router
 from app.search.router import router as search_router
 
 api_router = APIRouter()
 
 api_router.include_router(core_router)
 api_router.include_router(search_router)
+api_router.include_router(metrics_router)
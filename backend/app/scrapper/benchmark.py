@@ -0,0 +1,104 @@
+"""
+CPU benchmark of the HTML extraction pipeline.
+
+Compares the previous pipeline (``html.parser``, decompose, serialize the tree
+back to HTML, re-parse it for Markdown, five metadata scans) with the single
+parse and single walk of ``PageExtractor`` on a synthetic document.
+
+Usage:
+    uv run python -m app.scrapper.benchmark [--sections 2000] [--runs 5]
+"""
+
+import argparse
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+from bs4 import BeautifulSoup
+from html_to_markdown import convert_to_markdown
+
+from app.scrapper.metadata_analyzer import MetadataAnalyzer
+from app.scrapper.page_extractor import REMOVED_TAGS, PageExtractor, parse_html
+
+
+def generate_document(sections: int) -> str:
+    """Generate a large, script-heavy HTML document with rich metadata."""
+    schema = json.dumps({"@type": "Article", "headline": "Benchmark article"})
+    head = [
+        "<title>Benchmark article</title>",
+        '<meta name="description" content="A synthetic benchmark page">',
+        '<meta name="keywords" content="benchmark, html, parsing">',
+        '<meta property="og:title" content="Benchmark article">',
+        '<meta property="og:description" content="A synthetic benchmark page">',
+        '<meta name="twitter:card" content="summary">',
+        f'<script type="application/ld+json">{schema}</script>',
+        '<link rel="stylesheet" href="/style.css">',
+        "<style>body { font-family: sans-serif; }</style>",
+    ]
+    body = []
+    for i in range(sections):
+        body.append(
+            f"<section><h2>Section {i}</h2>"
+            f"<p>Paragraph {i} with <a href='/page/{i}'>a link</a> and "
+            f"<strong>some emphasis</strong> in the running text.</p>"
+            f"<ul><li>First item {i}</li><li>Second item {i}</li></ul>"
+            f"<img src='/image/{i}.png' alt='Image {i}'>"
+            f"<button>Share</button>"
+            f"<svg viewBox='0 0 10 10'><path d='M0 0L10 10'/></svg>"
+            f"<script>window.analytics && window.analytics.track({i});</script>"
+            f"</section>"
+        )
+    return (
+        f"<!DOCTYPE html><html><head>{''.join(head)}</head>"
+        f"<body><main>{''.join(body)}</main></body></html>"
+    )
+
+
+def legacy_pipeline(html: str) -> tuple[str, dict[str, Any]]:
+    """Parse, clean and convert the document the way it was done before."""
+    metadata = MetadataAnalyzer(BeautifulSoup(html, "html.parser")).extract()
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(list(REMOVED_TAGS)):
+        tag.decompose()
+    return convert_to_markdown(str(soup)), metadata
+
+
+def single_pass_pipeline(html: str, parser: str) -> tuple[str, dict[str, Any]]:
+    """Parse once and extract content and metadata in a single walk."""
+    page = PageExtractor(parse_html(html, parser)).extract()
+    return page.markdown, page.metadata
+
+
+def measure(func: Callable[[], Any], runs: int) -> float:
+    """Return the best CPU time of ``runs`` calls in milliseconds."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.process_time()
+        func()
+        best = min(best, time.process_time() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    html = generate_document(args.sections)
+    print(f"Document size: {len(html) / 1024:.0f} KiB, best of {args.runs} runs")
+
+    baseline = measure(lambda: legacy_pipeline(html), args.runs)
+    print(f"legacy (html.parser, re-parse):  {baseline:8.1f} ms CPU")
+
+    for backend in ("html.parser", "lxml"):
+        elapsed = measure(lambda b=backend: single_pass_pipeline(html, b), args.runs)
+        print(
+            f"single pass ({backend + ')':12}    {elapsed:8.1f} ms CPU"
+            f"  ({baseline / elapsed:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Pool of long-lived headless Chromium browsers for the scrapper.
+
+Launching Chromium costs hundreds of milliseconds and a lot of memory, so the
+pool keeps a fixed number of warm browsers and hands out a fresh, isolated
+browser context per page. Browsers are recycled after serving a configurable
+number of pages or once their processes grow past a memory limit.
+
+Requests for resource types and domains on the blocklists (images, fonts,
+media, analytics) are aborted, since the content extractor drops them anyway.
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from playwright.async_api import Browser, Page, Playwright, Route, async_playwright
+
+# Import playwright_stealth for stealth mode
+from playwright_stealth import stealth_async
+
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+
+
+@dataclass
+class PooledBrowser:
+    """A pool slot holding a browser and its usage statistics."""
+
+    browser: Browser | None = None
+    pages_served: int = 0
+
+
+class BrowserPool:
+    """Keeps N warm Chromium browsers and hands out isolated pages.
+
+    Each checked out page lives in its own browser context, so cookies and
+    storage never leak between scraped URLs. A browser serves one page at a
+    time, which makes the pool size the upper bound of concurrent renders.
+
+    Example:
+        ```python
+        pool = BrowserPool(size=2)
+        await pool.start()
+        async with pool.page() as page:
+            await page.goto("https://example.com")
+        await pool.close()
+        ```
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_pages_per_browser: int = 50,
+        max_memory_mb: int = 1024,
+        blocked_resource_types: list[str] | None = None,
+        blocked_domains: list[str] | None = None,
+    ) -> None:
+        """Initialize the pool without launching any browser yet.
+
+        Args:
+            size: Number of browsers kept warm.
+            max_pages_per_browser: Pages served before a browser is recycled.
+                Zero disables the limit.
+            max_memory_mb: Resident memory of all browser processes after which
+                the browser is recycled. Zero disables the limit.
+            blocked_resource_types: Playwright resource types that are never
+                downloaded, e.g. "image" or "font".
+            blocked_domains: Domains, including their subdomains, that
+                requests are never sent to.
+        """
+        self.size = size
+        self.max_pages_per_browser = max_pages_per_browser
+        self.max_memory_mb = max_memory_mb
+        self.blocked_resource_types = frozenset(blocked_resource_types or ())
+        self.blocked_domains = tuple(
+            domain.lower().lstrip(".") for domain in blocked_domains or ()
+        )
+        self._playwright: Playwright | None = None
+        self._slots: asyncio.Queue[PooledBrowser] = asyncio.Queue()
+        self._lock = asyncio.Lock()
+        self._started = False
+
+    @property
+    def started(self) -> bool:
+        """Whether the pool is running and accepting requests."""
+        return self._started
+
+    async def start(self) -> None:
+        """Start Playwright and launch the warm browsers.
+
+        Calling this method on a running pool is a no-op. A browser that fails
+        to launch leaves its slot empty; it is launched again on first use.
+        """
+        async with self._lock:
+            if self._started:
+                return
+
+            self._playwright = await async_playwright().start()
+            slots = [PooledBrowser() for _ in range(self.size)]
+            await asyncio.gather(*(self._launch(slot) for slot in slots))
+            for slot in slots:
+                self._slots.put_nowait(slot)
+            self._started = True
+            logger.info(f"Browser pool started with {self.size} browsers")
+
+    async def close(self) -> None:
+        """Close all idle browsers and stop Playwright.
+
+        Browsers that are checked out while the pool closes are closed as soon
+        as they are returned.
+        """
+        async with self._lock:
+            if not self._started:
+                return
+
+            self._started = False
+            while not self._slots.empty():
+                await self._close_browser(self._slots.get_nowait())
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+            logger.info("Browser pool closed")
+
+    @contextlib.asynccontextmanager
+    async def page(self) -> AsyncGenerator[Page, None]:
+        """Check out a fresh page in a new, isolated browser context.
+
+        The pool is started lazily if it was not started explicitly. The
+        context is closed and the browser returned to the pool on exit.
+
+        Yields:
+            Page: A stealth-patched page ready for navigation.
+        """
+        await self.start()
+        slot = await self._slots.get()
+        try:
+            if slot.browser is None or not slot.browser.is_connected():
+                await self._close_browser(slot)
+                await self._launch(slot, raise_on_error=True)
+
+            context = await slot.browser.new_context(
+                user_agent=USER_AGENT,
+                locale="en-US",
+                viewport={"width": 1920, "height": 1080},
+                java_script_enabled=True,
+                bypass_csp=True,
+            )
+            try:
+                if self.blocked_resource_types or self.blocked_domains:
+                    await context.route("**/*", self._route)
+                page = await context.new_page()
+                await stealth_async(page)  # Apply stealth mode
+                yield page
+            finally:
+                slot.pages_served += 1
+                with contextlib.suppress(Exception):
+                    await context.close()
+        finally:
+            await self._release(slot)
+
+    async def _route(self, route: Route) -> None:
+        """Abort requests for blocked resource types and domains."""
+        request = route.request
+        if request.resource_type in self.blocked_resource_types or self._is_blocked(
+            request.url
+        ):
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    def _is_blocked(self, url: str) -> bool:
+        """Check whether a URL belongs to a blocked domain or its subdomain."""
+        if not self.blocked_domains:
+            return False
+        host = (urlsplit(url).hostname or "").lower()
+        return any(
+            host == domain or host.endswith(f".{domain}")
+            for domain in self.blocked_domains
+        )
+
+    async def _release(self, slot: PooledBrowser) -> None:
+        """Return a slot to the pool, recycling its browser when needed."""
+        if not self._started:
+            await self._close_browser(slot)
+            return
+
+        if await self._should_recycle(slot):
+            logger.info(f"Recycling browser after {slot.pages_served} pages")
+            await self._close_browser(slot)
+            await self._launch(slot)
+
+        self._slots.put_nowait(slot)
+
+    async def _should_recycle(self, slot: PooledBrowser) -> bool:
+        """Check the page count and memory limits of a slot's browser."""
+        if slot.browser is None:
+            return False
+        if 0 < self.max_pages_per_browser <= slot.pages_served:
+            return True
+        if self.max_memory_mb > 0:
+            rss_mb = await self._browser_rss_mb(slot.browser)
+            if rss_mb is not None and rss_mb > self.max_memory_mb:
+                return True
+        return False
+
+    async def _launch(self, slot: PooledBrowser, raise_on_error: bool = False) -> None:
+        """Launch a new browser into the given slot."""
+        if self._playwright is None:
+            raise RuntimeError("Browser pool is not started")
+        slot.pages_served = 0
+        try:
+            slot.browser = await self._playwright.chromium.launch(headless=True)
+        except Exception as e:
+            slot.browser = None
+            logger.error(f"Failed to launch browser: {e}")
+            if raise_on_error:
+                raise
+
+    @staticmethod
+    async def _close_browser(slot: PooledBrowser) -> None:
+        """Close the browser of a slot, ignoring already dead browsers."""
+        if slot.browser is not None:
+            with contextlib.suppress(Exception):
+                await slot.browser.close()
+        slot.browser = None
+
+    @staticmethod
+    async def _browser_rss_mb(browser: Browser) -> float | None:
+        """Sum the resident memory of all processes of a browser.
+
+        Process ids come from the Chrome DevTools Protocol and memory usage is
+        read from ``/proc``, so the measurement is only available on Linux.
+
+        Returns:
+            Resident memory in megabytes, or None if it cannot be measured.
+        """
+        try:
+            session = await browser.new_browser_cdp_session()
+            try:
+                info = await session.send("SystemInfo.getProcessInfo")
+            finally:
+                await session.detach()
+        except Exception:
+            return None
+
+        rss_kb = 0
+        for process in info.get("processInfo", []):
+            status = Path(f"/proc/{process['id']}/status")
+            try:
+                for line in status.read_text().splitlines():
+                    if line.startswith("VmRSS:"):
+                        rss_kb += int(line.split()[1])
+                        break
+            except (OSError, ValueError):
+                continue
+
+        return rss_kb / 1024 if rss_kb else None
+
+
+@lru_cache
+def get_browser_pool() -> BrowserPool:
+    settings = get_settings()
+    return BrowserPool(
+        size=settings.BROWSER_POOL_SIZE,
+        max_pages_per_browser=settings.BROWSER_MAX_PAGES_PER_BROWSER,
+        max_memory_mb=settings.BROWSER_MAX_MEMORY_MB,
+        blocked_resource_types=settings.BROWSER_BLOCKED_RESOURCE_TYPES,
+        blocked_domains=settings.BROWSER_BLOCKED_DOMAINS,
+    )
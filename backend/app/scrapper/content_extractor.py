@@ -1,8 +1,8 @@
-from typing import Any
-
 from bs4 import BeautifulSoup
 from html_to_markdown import convert_to_markdown
 
+from app.scrapper.page_extractor import REMOVED_TAGS
+
 
 class ContentExtractor:
     """Extracts and structures content from HTML documents.
@@ -41,13 +41,10 @@ class ContentExtractor:
         """
 
         # Remove unwanted elements that don't contribute to content
-        for tag in self.soup(
-            ["script", "style", "svg", "picture", "button", "img", "link"]
-        ):
+        for tag in self.soup(list(REMOVED_TAGS)):
             tag.decompose()
 
-        # Convert the cleaned HTML to Markdown
-        html = str(self.soup)
-        markdown = convert_to_markdown(html)
+        # Convert the cleaned tree to Markdown without re-parsing it
+        markdown = convert_to_markdown(self.soup)
 
         return markdown
@@ -0,0 +1,217 @@
+"""
+Fast-path HTTP fetching for the scrapper.
+
+Most bookmarked pages are static and a single GET returns all of their
+content, so the scrapper tries a pooled ``httpx`` client first and only falls
+back to a headless browser when the response looks script-rendered. The
+tier that worked is remembered per domain.
+
+Responses are streamed: the status and content type are checked before the
+body is read, so PDFs and videos are never downloaded, and at most a fixed
+number of bytes of a page is read.
+"""
+
+import re
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from enum import StrEnum, unique
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+import httpx
+from bs4 import BeautifulSoup
+
+from app.scrapper.browser_pool import USER_AGENT
+from app.settings import get_settings
+
+# Ids of the mount points used by common single page application frameworks
+SPA_ROOT_IDS = re.compile(r"^(root|app|__next|__nuxt|svelte|ember-app|main-app)$")
+
+
+@unique
+class FetchTier(StrEnum):
+    """Enumeration of the ways a page can be fetched."""
+
+    HTTP = "http"
+    BROWSER = "browser"
+
+
+@dataclass
+class HttpResponse:
+    """Relevant parts of a fast-path HTTP response."""
+
+    url: str
+    status_code: int
+    headers: dict[str, str]
+    html: str
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Create the pooled HTTP client used for fast-path fetching."""
+    settings = get_settings()
+    return httpx.AsyncClient(
+        headers={
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.9",
+        },
+        follow_redirects=True,
+        timeout=settings.SCRAPPER_HTTP_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=settings.SCRAPPER_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SCRAPPER_HTTP_MAX_CONNECTIONS,
+        ),
+    )
+
+
+@lru_cache
+def get_http_client() -> httpx.AsyncClient:
+    return create_http_client()
+
+
+async def fetch_html(
+    client: httpx.AsyncClient,
+    url: str,
+    headers: dict[str, str] | None = None,
+    max_bytes: int | None = None,
+) -> HttpResponse | None:
+    """Fetch a page with a plain GET request.
+
+    Args:
+        client: Pooled HTTP client to send the request with.
+        url: The URL to fetch.
+        headers: Extra request headers, e.g. conditional request validators.
+        max_bytes: Maximum number of body bytes read; longer pages are cut
+            off. Defaults to SCRAPPER_HTTP_MAX_BYTES.
+
+    Returns:
+        The response if it is a successful HTML document or a 304 Not
+        Modified answer to a conditional request, None otherwise.
+    """
+    if max_bytes is None:
+        max_bytes = get_settings().SCRAPPER_HTTP_MAX_BYTES
+    try:
+        async with client.stream("GET", url, headers=headers) as response:
+            if response.status_code == httpx.codes.NOT_MODIFIED:
+                return HttpResponse(
+                    url=str(response.url),
+                    status_code=response.status_code,
+                    headers=dict(response.headers),
+                    html="",
+                )
+
+            # Decided on the headers alone, before any of the body is read
+            content_type = response.headers.get("content-type", "")
+            if response.status_code >= 400 or "html" not in content_type.lower():
+                return None
+
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) >= max_bytes:
+                    del body[max_bytes:]
+                    break
+            html = body.decode(response.encoding or "utf-8", errors="replace")
+    except httpx.HTTPError:
+        return None
+
+    return HttpResponse(
+        url=str(response.url),
+        status_code=response.status_code,
+        headers=dict(response.headers),
+        html=html,
+    )
+
+
+def looks_script_rendered(soup: BeautifulSoup, min_text_length: int) -> bool:
+    """Guess whether a statically fetched page needs JavaScript to render.
+
+    A page is considered script-rendered when it has no body, when it has an
+    empty single page application mount point, or when it contains less
+    visible text than a complete page would.
+
+    Args:
+        soup: The parsed, unrendered HTML document.
+        min_text_length: Minimum amount of visible text a complete page has.
+
+    Returns:
+        True if the page should be rendered in a headless browser.
+    """
+    body = soup.body
+    if body is None:
+        return True
+
+    for root in body.find_all(id=SPA_ROOT_IDS):
+        if not root.get_text(strip=True):
+            return True
+
+    text = body.get_text(separator=" ", strip=True)
+    return len(text) < min_text_length
+
+
+@dataclass
+class _DomainStats:
+    outcomes: deque[FetchTier] = field(default_factory=lambda: deque(maxlen=10))
+    browser_fetches: int = 0
+
+
+class DomainTierMemory:
+    """Remembers per domain which fetch tier produced usable content.
+
+    Domains whose recent fast-path fetches mostly had to be escalated go
+    straight to the browser. Every ``reprobe_every`` browser fetches the fast
+    path is tried again, so a site that stops needing JavaScript is noticed.
+    """
+
+    def __init__(
+        self,
+        max_domains: int = 10_000,
+        min_samples: int = 3,
+        browser_ratio: float = 0.8,
+        reprobe_every: int = 20,
+    ) -> None:
+        self.max_domains = max_domains
+        self.min_samples = min_samples
+        self.browser_ratio = browser_ratio
+        self.reprobe_every = reprobe_every
+        self._domains: OrderedDict[str, _DomainStats] = OrderedDict()
+
+    def preferred_tier(self, url: str) -> FetchTier:
+        """Return the tier that should be tried first for the URL's domain."""
+        stats = self._domains.get(_domain(url))
+        if stats is None or len(stats.outcomes) < self.min_samples:
+            return FetchTier.HTTP
+
+        escalations = stats.outcomes.count(FetchTier.BROWSER)
+        if escalations / len(stats.outcomes) < self.browser_ratio:
+            return FetchTier.HTTP
+        if stats.browser_fetches and stats.browser_fetches % self.reprobe_every == 0:
+            return FetchTier.HTTP
+        return FetchTier.BROWSER
+
+    def record(self, url: str, tier: FetchTier, probed: bool) -> None:
+        """Record which tier produced the content for a URL.
+
+        Args:
+            url: The fetched URL.
+            tier: The tier that produced usable content.
+            probed: Whether the fast path was tried for this fetch.
+        """
+        domain = _domain(url)
+        stats = self._domains.pop(domain, None) or _DomainStats()
+        self._domains[domain] = stats
+        if probed:
+            stats.outcomes.append(tier)
+        if tier == FetchTier.BROWSER:
+            stats.browser_fetches += 1
+        while len(self._domains) > self.max_domains:
+            self._domains.popitem(last=False)
+
+
+def _domain(url: str) -> str:
+    return urlsplit(url).hostname or ""
+
+
+@lru_cache
+def get_domain_tier_memory() -> DomainTierMemory:
+    return DomainTierMemory()
@@ -1,8 +1,9 @@
-import json
 from typing import Any
 
 from bs4 import BeautifulSoup
 
+from app.scrapper.page_extractor import collect_metadata, empty_metadata
+
 
 class MetadataAnalyzer:
     """Extracts metadata and structured data from HTML documents.
@@ -57,47 +58,10 @@ class MetadataAnalyzer:
             4. Parses JSON-LD script tags for Schema.org structured data
             5. Handles malformed JSON gracefully with error recovery
         """
-        meta: dict[str, Any] = {}
-
-        # Extract basic SEO meta tags
-        meta["title"] = self.soup.title.string if self.soup.title else None
-
-        # Extract meta description with safe attribute access
-        description_tag = self.soup.find("meta", attrs={"name": "description"})
-        meta["description"] = (
-            description_tag.get("content") if description_tag else None
-        )
-
-        # Extract meta keywords with safe attribute access
-        keywords_tag = self.soup.find("meta", attrs={"name": "keywords"})
-        meta["keywords"] = keywords_tag.get("content") if keywords_tag else None
-
-        # Extract Open Graph protocol data
-        meta["og"] = {
-            tag.get("property"): tag.get("content")
-            for tag in self.soup.find_all("meta", property=True)
-            if tag.get("property", "").startswith("og:")
-        }
-
-        # Extract Twitter Cards metadata
-        meta["twitter"] = {
-            tag.get("name"): tag.get("content")
-            for tag in self.soup.find_all("meta", attrs={"name": True})
-            if tag.get("name", "").startswith("twitter:")
-        }
-
-        # Extract Schema.org JSON-LD structured data
-        schemas: list[dict[str, Any]] = []
-        for script in self.soup.find_all("script", type="application/ld+json"):
-            try:
-                if script.string:
-                    # Parse JSON-LD content and add to schemas list
-                    schema_data = json.loads(script.string)
-                    schemas.append(schema_data)
-            except (json.JSONDecodeError, TypeError):
-                # Skip malformed JSON-LD data and continue processing
-                continue
+        meta = empty_metadata()
 
-        meta["schemas"] = schemas
+        # Collect SEO, Open Graph, Twitter and JSON-LD data in a single scan
+        for tag in self.soup.find_all(["title", "meta", "script"]):
+            collect_metadata(tag, meta)
 
         return meta
@@ -0,0 +1,132 @@
+"""
+Single-pass extraction of content and metadata from HTML documents.
+
+The document is parsed once with a configurable parser backend (``lxml`` by
+default). A single walk over the tree collects the metadata and the elements
+to drop, and the cleaned tree is converted to Markdown directly, without
+serializing it back to HTML and parsing it again.
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any
+
+from bs4 import BeautifulSoup, Tag
+from html_to_markdown import convert_to_markdown
+
+from app.settings import get_settings
+
+# Elements that don't contribute to the main content
+REMOVED_TAGS = frozenset(["script", "style", "svg", "picture", "button", "img", "link"])
+
+
+def parse_html(html: str, parser: str | None = None) -> BeautifulSoup:
+    """Parse an HTML document with the configured parser backend.
+
+    Args:
+        html: The raw HTML document.
+        parser: BeautifulSoup parser to use, e.g. "lxml" or "html.parser".
+            Defaults to the ``SCRAPPER_HTML_PARSER`` setting.
+
+    Returns:
+        BeautifulSoup: The parsed document.
+    """
+    return BeautifulSoup(html, parser or get_settings().SCRAPPER_HTML_PARSER)
+
+
+@dataclass
+class ExtractedPage:
+    """Markdown content and metadata extracted from one document."""
+
+    markdown: str
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+
+def empty_metadata() -> dict[str, Any]:
+    """Create the metadata structure returned by the extractors."""
+    return {
+        "title": None,
+        "description": None,
+        "keywords": None,
+        "og": {},
+        "twitter": {},
+        "schemas": [],
+    }
+
+
+def collect_metadata(tag: Tag, meta: dict[str, Any]) -> None:
+    """Add the metadata carried by a single element to ``meta``.
+
+    Args:
+        tag: Any element of the document; elements without metadata are
+            ignored.
+        meta: Metadata structure created by ``empty_metadata``.
+    """
+    if tag.name == "meta":
+        name = tag.get("name")
+        prop = tag.get("property")
+        content = tag.get("content")
+        if name == "description" and meta["description"] is None:
+            meta["description"] = content
+        elif name == "keywords" and meta["keywords"] is None:
+            meta["keywords"] = content
+        elif name and name.startswith("twitter:"):
+            meta["twitter"][name] = content
+        if prop and prop.startswith("og:"):
+            meta["og"][prop] = content
+    elif tag.name == "title":
+        if meta["title"] is None and tag.string:
+            # A plain str does not keep the whole tree alive
+            meta["title"] = str(tag.string)
+    elif tag.name == "script" and tag.get("type") == "application/ld+json":
+        try:
+            if tag.string:
+                meta["schemas"].append(json.loads(tag.string))
+        except (json.JSONDecodeError, TypeError):
+            # Skip malformed JSON-LD data and continue processing
+            pass
+
+
+class PageExtractor:
+    """Extracts Markdown content and metadata in a single tree walk.
+
+    The extraction is destructive: unwanted elements are removed from the
+    given document.
+
+    Example:
+        ```python
+        page = PageExtractor(parse_html(html)).extract()
+        print(page.markdown)
+        print(page.metadata["og"])
+        ```
+    """
+
+    def __init__(self, soup: BeautifulSoup) -> None:
+        """Initialize the extractor with a parsed document.
+
+        Args:
+            soup (BeautifulSoup): Parsed HTML document, e.g. from ``parse_html``.
+        """
+        self.soup = soup
+
+    def extract(self) -> ExtractedPage:
+        """Extract the clean main content as Markdown together with metadata.
+
+        Returns:
+            ExtractedPage: The Markdown content and the metadata in the format
+                returned by ``MetadataAnalyzer.extract``.
+        """
+        meta = empty_metadata()
+        removed: list[Tag] = []
+
+        for tag in self.soup.find_all(True):
+            collect_metadata(tag, meta)
+            if tag.name in REMOVED_TAGS:
+                removed.append(tag)
+
+        for tag in removed:
+            # Nested elements are gone together with their removed parent
+            if not tag.decomposed:
+                tag.decompose()
+
+        return ExtractedPage(markdown=convert_to_markdown(self.soup), metadata=meta)
@@ -0,0 +1,211 @@
+"""
+Politeness scheduler for scraping.
+
+Every fetch waits for a slot from the scheduler, which enforces a global
+concurrency cap, a per-host concurrency limit and a minimum delay between
+fetches to the same host. Hosts with waiting fetches are served round-robin,
+so a bulk import from one site cannot starve everything else.
+"""
+
+import asyncio
+import contextlib
+from collections import deque
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+from urllib.parse import urlsplit
+
+from app.metrics.registry import get_metrics_registry
+from app.settings import get_settings
+
+# Idle hosts beyond this number are forgotten together with their statistics
+MAX_TRACKED_HOSTS = 10_000
+
+
+@dataclass
+class _Waiter:
+    future: asyncio.Future[None]
+    enqueued_at: float
+
+
+@dataclass
+class _HostState:
+    waiters: deque[_Waiter] = field(default_factory=deque)
+    active: int = 0
+    next_start: float = 0.0
+    started: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+
+class ScrapeScheduler:
+    """Grants fetch slots fairly across hosts.
+
+    Example:
+        ```python
+        scheduler = ScrapeScheduler(max_concurrency=8)
+        async with scheduler.slot(url):
+            await scrapper.fetch()
+        ```
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        per_host_concurrency: int = 2,
+        per_host_delay_seconds: float = 1.0,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            max_concurrency: Maximum number of fetches running at once.
+            per_host_concurrency: Maximum number of fetches per host at once.
+            per_host_delay_seconds: Minimum time between two fetch starts for
+                the same host.
+        """
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_delay_seconds = per_host_delay_seconds
+        self._hosts: dict[str, _HostState] = {}
+        self._ring: deque[str] = deque()
+        self._active = 0
+        self._wakeup: asyncio.TimerHandle | None = None
+
+    @contextlib.asynccontextmanager
+    async def slot(self, url: str) -> AsyncGenerator[None, None]:
+        """Wait for a fetch slot for the URL's host and hold it while inside.
+
+        Args:
+            url: The URL about to be fetched.
+        """
+        loop = asyncio.get_running_loop()
+        host = urlsplit(url).hostname or ""
+        state = self._hosts.setdefault(host, _HostState())
+        waiter = _Waiter(future=loop.create_future(), enqueued_at=loop.time())
+        state.waiters.append(waiter)
+        if host not in self._ring:
+            self._ring.append(host)
+        self._dispatch()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # The slot was granted just before the cancellation
+                self._release(host)
+            else:
+                waiter.future.cancel()
+                self._dispatch()
+            raise
+
+        try:
+            yield
+        finally:
+            self._release(host)
+
+    def stats(self) -> dict[str, Any]:
+        """Return queue depth and wait times, overall and per host."""
+        now = asyncio.get_event_loop().time()
+        hosts = {}
+        for host, state in self._hosts.items():
+            queued = [w for w in state.waiters if not w.future.done()]
+            hosts[host] = {
+                "queued": len(queued),
+                "active": state.active,
+                "started": state.started,
+                "avg_wait_seconds": state.total_wait / state.started
+                if state.started
+                else 0.0,
+                "max_wait_seconds": state.max_wait,
+                "oldest_waiting_seconds": now - queued[0].enqueued_at
+                if queued
+                else 0.0,
+            }
+        return {
+            "active": self._active,
+            "queued": sum(host["queued"] for host in hosts.values()),
+            "max_concurrency": self.max_concurrency,
+            "per_host_concurrency": self.per_host_concurrency,
+            "per_host_delay_seconds": self.per_host_delay_seconds,
+            "hosts": hosts,
+        }
+
+    def _dispatch(self) -> None:
+        """Grant free slots to waiting hosts in round-robin order."""
+        loop = asyncio.get_running_loop()
+        earliest_start: float | None = None
+
+        granted = True
+        while granted and self._ring and self._active < self.max_concurrency:
+            granted = False
+            now = loop.time()
+            for _ in range(len(self._ring)):
+                if self._active >= self.max_concurrency:
+                    break
+                host = self._ring.popleft()
+                state = self._hosts[host]
+                while state.waiters and state.waiters[0].future.done():
+                    state.waiters.popleft()
+                if not state.waiters:
+                    continue
+
+                if state.active >= self.per_host_concurrency:
+                    pass
+                elif now < state.next_start:
+                    if earliest_start is None or state.next_start < earliest_start:
+                        earliest_start = state.next_start
+                else:
+                    waiter = state.waiters.popleft()
+                    wait = now - waiter.enqueued_at
+                    state.active += 1
+                    state.started += 1
+                    state.total_wait += wait
+                    state.max_wait = max(state.max_wait, wait)
+                    state.next_start = now + self.per_host_delay_seconds
+                    self._active += 1
+                    waiter.future.set_result(None)
+                    granted = True
+
+                if state.waiters:
+                    self._ring.append(host)
+
+        if earliest_start is not None:
+            self._schedule_wakeup(loop, earliest_start)
+
+    def _schedule_wakeup(self, loop: asyncio.AbstractEventLoop, when: float) -> None:
+        """Dispatch again once the earliest delayed host may start a fetch."""
+        if self._wakeup is not None and not self._wakeup.cancelled():
+            if self._wakeup.when() <= when:
+                return
+            self._wakeup.cancel()
+        self._wakeup = loop.call_at(when, self._on_wakeup)
+
+    def _on_wakeup(self) -> None:
+        self._wakeup = None
+        self._dispatch()
+
+    def _release(self, host: str) -> None:
+        """Free a slot held for the host and hand it to the next waiter."""
+        state = self._hosts[host]
+        state.active -= 1
+        self._active -= 1
+        if (
+            len(self._hosts) > MAX_TRACKED_HOSTS
+            and not state.active
+            and not state.waiters
+        ):
+            del self._hosts[host]
+        self._dispatch()
+
+
+@lru_cache
+def get_scrape_scheduler() -> ScrapeScheduler:
+    settings = get_settings()
+    scheduler = ScrapeScheduler(
+        max_concurrency=settings.SCRAPPER_MAX_CONCURRENCY,
+        per_host_concurrency=settings.SCRAPPER_PER_HOST_CONCURRENCY,
+        per_host_delay_seconds=settings.SCRAPPER_PER_HOST_DELAY_SECONDS,
+    )
+    get_metrics_registry().register("scrape_scheduler", scheduler.stats)
+    return scheduler
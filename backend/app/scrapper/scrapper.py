@@ -1,22 +1,54 @@
 from bs4 import BeautifulSoup
-from playwright.async_api import async_playwright
-
-# Import playwright_stealth for stealth mode
-from playwright_stealth import stealth_async
-
-# Add imports for new modules
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import Page
+
+from app.scrapper.browser_pool import BrowserPool, get_browser_pool
+from app.scrapper.http_fetcher import (
+    FetchTier,
+    fetch_html,
+    get_domain_tier_memory,
+    get_http_client,
+    looks_script_rendered,
+)
+from app.scrapper.page_extractor import parse_html
+from app.settings import get_settings
+
+# Resolves once no DOM mutation happened for quietMs, or after timeoutMs
+DOM_SETTLED_SCRIPT = """
+([quietMs, timeoutMs]) => new Promise((resolve) => {
+    const done = () => {
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(deadline);
+        resolve();
+    };
+    const observer = new MutationObserver(() => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(done, quietMs);
+    });
+    let quietTimer = setTimeout(done, quietMs);
+    const deadline = setTimeout(done, timeoutMs);
+    observer.observe(document, { childList: true, subtree: true, characterData: true });
+})
+"""
 
 
 class Scrapper:
     """An asynchronous web scrapper with AI-powered content analysis.
 
-    This class provides comprehensive web scraping capabilities using Playwright
-    for JavaScript-rendered pages and BeautifulSoup for HTML parsing. It includes
-    stealth features to avoid bot detection and supports full content analysis.
+    This class provides comprehensive web scraping capabilities using a fast
+    HTTP client for static pages, Playwright for JavaScript-rendered pages and
+    BeautifulSoup for HTML parsing. It includes stealth features to avoid bot
+    detection and supports full content analysis.
 
     Attributes:
         url (str): The target URL to scrape.
         soup (Optional[BeautifulSoup]): Parsed HTML content after fetching.
+        html (Optional[str]): Raw HTML content after fetching.
+        tier (Optional[FetchTier]): The tier that fetched the content.
+        etag (Optional[str]): ETag validator of the fetched response.
+        last_modified (Optional[str]): Last-Modified validator of the response.
+        not_modified (bool): Whether a conditional fetch found no changes.
 
     Example:
         ```python
@@ -27,50 +59,157 @@ class Scrapper:
         ```
     """
 
-    def __init__(self, url: str) -> None:
+    def __init__(
+        self,
+        url: str,
+        browser_pool: BrowserPool | None = None,
+        fetch_mode: str | None = None,
+    ) -> None:
         """Initialize the scrapper with a target URL.
 
         Args:
             url (str): The URL to scrape. Must be a valid HTTP/HTTPS URL.
+            browser_pool (Optional[BrowserPool]): Pool to render pages with.
+                Defaults to the application-wide pool.
+            fetch_mode (Optional[str]): One of "tiered", "http" or "browser".
+                Defaults to the ``SCRAPPER_FETCH_MODE`` setting.
         """
         self.url = url
+        self.browser_pool = browser_pool or get_browser_pool()
+        self.fetch_mode = fetch_mode or get_settings().SCRAPPER_FETCH_MODE
         self.soup: BeautifulSoup | None = None
+        self.html: str | None = None
+        self.tier: FetchTier | None = None
+        self.etag: str | None = None
+        self.last_modified: str | None = None
+        self.not_modified = False
+
+    async def fetch(
+        self, etag: str | None = None, last_modified: str | None = None
+    ) -> BeautifulSoup | None:
+        """Fetch and parse web content, rendering it in a browser only if needed.
 
-    async def fetch(self) -> BeautifulSoup:
-        """Fetch and parse web content using Playwright with stealth mode.
+        In the default tiered mode the page is first requested with a pooled
+        HTTP client. The browser tier is used when the response is not a
+        successful HTML document or looks script-rendered, or when the domain
+        is known to need JavaScript.
 
-        This method launches a headless Chromium browser with stealth settings,
-        navigates to the target URL, waits for the page to fully load, and
-        parses the rendered HTML with BeautifulSoup.
+        When validators of a previous fetch are given, the HTTP request is
+        made conditional, even for domains that normally skip the fast path.
+
+        Args:
+            etag (Optional[str]): ETag of the previously fetched version.
+            last_modified (Optional[str]): Last-Modified of that version.
 
         Returns:
-            BeautifulSoup: Parsed HTML content ready for analysis.
+            Optional[BeautifulSoup]: Parsed HTML content ready for analysis,
+                or None if the server reported the page as not modified.
 
         Raises:
+            ValueError: If the page cannot be fetched in HTTP-only mode.
             Exception: If the page fails to load or parsing fails.
 
         Note:
-            The method automatically applies stealth mode to avoid bot detection
-            and waits for network idle state to ensure dynamic content is loaded.
+            The tier that produced the content is remembered per domain and
+            stored in the ``tier`` attribute. Response validators are stored
+            in the ``etag`` and ``last_modified`` attributes.
         """
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-                locale="en-US",
-                viewport={"width": 1920, "height": 1080},
-                java_script_enabled=True,
-                bypass_csp=True,
+        mode = self.fetch_mode
+        tier_memory = get_domain_tier_memory()
+        conditional_headers = {}
+        if etag:
+            conditional_headers["If-None-Match"] = etag
+        if last_modified:
+            conditional_headers["If-Modified-Since"] = last_modified
+
+        probed = mode == "http" or (
+            mode == "tiered"
+            and (
+                bool(conditional_headers)
+                or tier_memory.preferred_tier(self.url) == FetchTier.HTTP
             )
-            page = await context.new_page()
-            await stealth_async(page)  # Apply stealth mode
-            await page.goto(self.url)
-            await page.wait_for_load_state("networkidle")
-            html = await page.content()
-            self.soup = BeautifulSoup(html, "html.parser")
-            await browser.close()
+        )
+
+        if probed:
+            response = await fetch_html(
+                get_http_client(), self.url, headers=conditional_headers
+            )
+            if response is not None and response.status_code == 304:
+                self.not_modified = True
+                self.tier = FetchTier.HTTP
+                self._set_validators(response.headers)
+                self.etag = self.etag or etag
+                self.last_modified = self.last_modified or last_modified
+                return None
+            if response is not None:
+                soup = parse_html(response.html)
+                if mode == "http" or not looks_script_rendered(
+                    soup, get_settings().SCRAPPER_MIN_TEXT_LENGTH
+                ):
+                    tier_memory.record(self.url, FetchTier.HTTP, probed=True)
+                    self.tier = FetchTier.HTTP
+                    self.html = response.html
+                    self.soup = soup
+                    self._set_validators(response.headers)
+                    return self.soup
+            if mode == "http":
+                raise ValueError(f"Failed to fetch {self.url} over HTTP")
+
+        self.html = await self._fetch_with_browser()
+        self.soup = parse_html(self.html)
+        tier_memory.record(self.url, FetchTier.BROWSER, probed=probed)
+        self.tier = FetchTier.BROWSER
         return self.soup
 
+    def _set_validators(self, headers: dict[str, str]) -> None:
+        """Store the cache validators of a response."""
+        headers = {key.lower(): value for key, value in headers.items()}
+        self.etag = headers.get("etag")
+        self.last_modified = headers.get("last-modified")
+
+    async def _fetch_with_browser(self) -> str:
+        """Render the page in a pooled headless browser with stealth mode.
+
+        Returns:
+            str: HTML of the rendered page.
+
+        Note:
+            Instead of waiting for network idle, which pages streaming
+            analytics beacons never reach, navigation only waits for the DOM
+            to be parsed and then for it to settle for a bounded time.
+        """
+        settings = get_settings()
+        async with self.browser_pool.page() as page:
+            response = await page.goto(
+                self.url,
+                wait_until="domcontentloaded",
+                timeout=settings.BROWSER_NAVIGATION_TIMEOUT_SECONDS * 1000,
+            )
+            await self._wait_for_dom_settled(
+                page,
+                quiet_ms=settings.BROWSER_DOM_SETTLE_QUIET_MS,
+                timeout_ms=settings.BROWSER_DOM_SETTLE_TIMEOUT_MS,
+            )
+            if response is not None:
+                self._set_validators(await response.all_headers())
+            return await page.content()
+
+    @staticmethod
+    async def _wait_for_dom_settled(page: Page, quiet_ms: int, timeout_ms: int) -> None:
+        """Wait until the DOM stops changing or the timeout elapses.
+
+        Args:
+            page: The page to observe.
+            quiet_ms: How long the DOM must stay unchanged to count as settled.
+            timeout_ms: Upper bound of the whole wait.
+        """
+        try:
+            await page.evaluate(DOM_SETTLED_SCRIPT, [quiet_ms, timeout_ms])
+        except PlaywrightError:
+            # Client-side redirects destroy the execution context; the page
+            # content is taken as it is at that point
+            pass
+
     async def get_title(self) -> str | None:
         """Extract the page title.
 
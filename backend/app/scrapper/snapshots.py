@@ -0,0 +1,271 @@
+"""
+Content-addressed store of raw HTML snapshots.
+
+Every fetched document is zstd-compressed and stored once per SHA-256 hash,
+so bookmarks of the same page share a single copy. Each URL points to its
+latest snapshot, which lets the analysis pipeline replay a page without
+hitting the network. Snapshots not accessed within the retention period, or
+least recently accessed beyond the total size limit, are evicted.
+"""
+
+import asyncio
+import logging
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+
+import zstandard
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db import DbSessionManager, get_db_session_manager
+from app.hashing import generate_content_hash
+from app.models import HtmlSnapshot, PageSnapshot
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotStore:
+    """Stores and loads compressed HTML snapshots by URL.
+
+    Example:
+        ```python
+        store = get_snapshot_store()
+        await store.save("https://example.com", html)
+        html = await store.load("https://example.com")
+        ```
+    """
+
+    def __init__(
+        self,
+        session_manager: DbSessionManager,
+        compression_level: int = 10,
+        retention_days: int = 90,
+        max_total_mb: int = 2048,
+        prune_every: int = 100,
+    ) -> None:
+        """Initialize the store.
+
+        Args:
+            session_manager: Database session manager to store snapshots with.
+            compression_level: zstd compression level.
+            retention_days: Days after the last access a snapshot is kept.
+            max_total_mb: Upper bound of the compressed size of all snapshots.
+            prune_every: Number of saves between two eviction runs.
+        """
+        self.session_manager = session_manager
+        self.compression_level = compression_level
+        self.retention_days = retention_days
+        self.max_total_mb = max_total_mb
+        self.prune_every = prune_every
+        self._saves = 0
+
+    async def save(
+        self,
+        url: str,
+        html: str,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> str:
+        """Store a fetched document and point the URL at it.
+
+        Args:
+            url: The URL the document was fetched from.
+            html: The raw HTML document.
+            etag: ETag validator of the response, if any.
+            last_modified: Last-Modified validator of the response, if any.
+
+        Returns:
+            The SHA-256 hash the document is stored under.
+        """
+        content_hash = generate_content_hash(html)
+        now = datetime.now(UTC)
+
+        async with self.session_manager.get_session() as session:
+            exists = await session.scalar(
+                select(HtmlSnapshot.content_hash).where(
+                    HtmlSnapshot.content_hash == content_hash
+                )
+            )
+            if exists:
+                await session.execute(
+                    update(HtmlSnapshot)
+                    .where(HtmlSnapshot.content_hash == content_hash)
+                    .values(last_accessed_at=now)
+                )
+            else:
+                raw = html.encode("utf-8")
+                data = await self._compress(raw)
+                await session.execute(
+                    insert(HtmlSnapshot)
+                    .values(
+                        content_hash=content_hash,
+                        data=data,
+                        size=len(raw),
+                        compressed_size=len(data),
+                    )
+                    .on_conflict_do_nothing(index_elements=["content_hash"])
+                )
+
+            await session.execute(
+                insert(PageSnapshot)
+                .values(
+                    url=url,
+                    html_hash=content_hash,
+                    fetched_at=now,
+                    etag=etag,
+                    last_modified=last_modified,
+                )
+                .on_conflict_do_update(
+                    index_elements=["url"],
+                    set_={
+                        "html_hash": content_hash,
+                        "fetched_at": now,
+                        "etag": etag,
+                        "last_modified": last_modified,
+                    },
+                )
+            )
+            await session.commit()
+
+        self._saves += 1
+        if self.prune_every and self._saves % self.prune_every == 0:
+            await self.prune()
+
+        return content_hash
+
+    async def get_page(self, url: str) -> PageSnapshot | None:
+        """Get the snapshot record of a URL, including its validators.
+
+        Args:
+            url: The URL to look up.
+
+        Returns:
+            The snapshot record, or None if the URL was never stored.
+        """
+        async with self.session_manager.get_session() as session:
+            result = await session.execute(
+                select(PageSnapshot).where(PageSnapshot.url == url)
+            )
+            return result.scalar_one_or_none()
+
+    async def set_content_hash(self, url: str, content_hash: str) -> None:
+        """Record the hash of the content extracted from a URL's snapshot.
+
+        Args:
+            url: The URL of the snapshot.
+            content_hash: SHA-256 hash of the extracted content.
+        """
+        async with self.session_manager.get_session() as session:
+            await session.execute(
+                update(PageSnapshot)
+                .where(PageSnapshot.url == url)
+                .values(content_hash=content_hash)
+            )
+            await session.commit()
+
+    async def load(self, url: str) -> str | None:
+        """Load the latest snapshot of a URL.
+
+        Args:
+            url: The URL to load the snapshot for.
+
+        Returns:
+            The raw HTML document, or None if the URL has no snapshot.
+        """
+        async with self.session_manager.get_session() as session:
+            result = await session.execute(
+                select(HtmlSnapshot.content_hash, HtmlSnapshot.data)
+                .join(PageSnapshot, PageSnapshot.html_hash == HtmlSnapshot.content_hash)
+                .where(PageSnapshot.url == url)
+            )
+            row = result.first()
+            if row is None:
+                return None
+
+            await session.execute(
+                update(HtmlSnapshot)
+                .where(HtmlSnapshot.content_hash == row.content_hash)
+                .values(last_accessed_at=datetime.now(UTC))
+            )
+            await session.commit()
+
+        raw = await self._decompress(row.data)
+        return raw.decode("utf-8")
+
+    async def prune(self) -> int:
+        """Evict expired snapshots and enforce the total size limit.
+
+        Snapshots not accessed within the retention period are removed first;
+        then the least recently accessed ones until the compressed size of the
+        remaining snapshots fits the limit. URLs pointing to an evicted
+        snapshot are removed with it.
+
+        Returns:
+            The number of evicted snapshots.
+        """
+        evicted = 0
+        async with self.session_manager.get_session() as session:
+            if self.retention_days > 0:
+                threshold = datetime.now(UTC) - timedelta(days=self.retention_days)
+                result = await session.execute(
+                    delete(HtmlSnapshot).where(
+                        HtmlSnapshot.last_accessed_at < threshold
+                    )
+                )
+                evicted += result.rowcount
+
+            if self.max_total_mb > 0:
+                running_size = (
+                    select(
+                        HtmlSnapshot.content_hash,
+                        func.sum(HtmlSnapshot.compressed_size)
+                        .over(order_by=HtmlSnapshot.last_accessed_at.desc())
+                        .label("running_size"),
+                    )
+                ).subquery()
+                result = await session.execute(
+                    delete(HtmlSnapshot).where(
+                        HtmlSnapshot.content_hash.in_(
+                            select(running_size.c.content_hash).where(
+                                running_size.c.running_size
+                                > self.max_total_mb * 1024 * 1024
+                            )
+                        )
+                    )
+                )
+                evicted += result.rowcount
+
+            await session.commit()
+
+        if evicted:
+            logger.info(f"Evicted {evicted} HTML snapshots")
+        return evicted
+
+    async def _compress(self, raw: bytes) -> bytes:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None,
+            lambda: zstandard.ZstdCompressor(level=self.compression_level).compress(
+                raw
+            ),
+        )
+
+    @staticmethod
+    async def _decompress(data: bytes) -> bytes:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None, lambda: zstandard.ZstdDecompressor().decompress(data)
+        )
+
+
+@lru_cache
+def get_snapshot_store() -> SnapshotStore:
+    settings = get_settings()
+    return SnapshotStore(
+        get_db_session_manager(),
+        compression_level=settings.SNAPSHOT_COMPRESSION_LEVEL,
+        retention_days=settings.SNAPSHOT_RETENTION_DAYS,
+        max_total_mb=settings.SNAPSHOT_MAX_TOTAL_MB,
+        prune_every=settings.SNAPSHOT_PRUNE_EVERY,
+    )
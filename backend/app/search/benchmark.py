@@ -0,0 +1,219 @@
+"""
+Recall and latency benchmark of the HNSW index behind semantic search.
+
+Loads synthetic, clustered 384-dimensional embeddings into a temporary table
+for each corpus size, builds the HNSW index with every combination of ``m``
+and ``ef_construction``, and runs the nearest neighbour query of
+``SemanticSearch`` for a set of queries at every ``hnsw.ef_search``. Recall
+is measured against the exact neighbours computed with numpy, and latency
+against an exact sequential scan of the same table, so the numbers show what
+the index parameters and SEARCH_HNSW_EF_SEARCH cost and gain. The database
+must be reachable and have the vector extension; nothing outside the
+temporary table is touched.
+
+Usage:
+    uv run python -m app.search.benchmark [--sizes 1000 10000 100000]
+        [--queries 100] [--k 10] [--m 16] [--ef-construction 64]
+        [--ef-search 40 100 200 400]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import Any
+
+import numpy as np
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Column, Index, Integer, MetaData, Table, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.llm.embeddings import EMBEDDING_DIMENSIONS
+from app.search.semantic import set_ef_search
+
+INSERT_BATCH_SIZE = 1000
+
+metadata = MetaData()
+corpus = Table(
+    "ann_benchmark_corpus",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("embedding", Vector(EMBEDDING_DIMENSIONS), nullable=False),
+    prefixes=["TEMPORARY"],
+)
+
+
+def generate_embeddings(
+    count: int, clusters: int, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+    """Generate unit vectors around random topic centres, like page embeddings.
+
+    Returns:
+        The embeddings and the topic centres they were drawn around.
+    """
+    centres = rng.standard_normal((clusters, EMBEDDING_DIMENSIONS))
+    centres /= np.linalg.norm(centres, axis=1, keepdims=True)
+    embeddings = centres[rng.integers(clusters, size=count)] + 0.08 * (
+        rng.standard_normal((count, EMBEDDING_DIMENSIONS))
+    )
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings.astype(np.float32), centres
+
+
+def exact_neighbours(embeddings: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Return the ids of the ``k`` nearest rows of every query by cosine."""
+    similarities = queries @ embeddings.T
+    nearest = np.argpartition(-similarities, k, axis=1)[:, :k]
+    return nearest + 1
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def load(connection: AsyncConnection, embeddings: np.ndarray) -> None:
+    """Recreate the temporary table with the embeddings, without an index."""
+    await connection.run_sync(metadata.drop_all)
+    await connection.run_sync(metadata.create_all)
+    for start in range(0, len(embeddings), INSERT_BATCH_SIZE):
+        batch = embeddings[start : start + INSERT_BATCH_SIZE]
+        await connection.execute(
+            corpus.insert(),
+            [
+                {"id": start + offset + 1, "embedding": embedding}
+                for offset, embedding in enumerate(batch)
+            ],
+        )
+    await connection.execute(text(f"ANALYZE {corpus.name}"))
+
+
+async def run_queries(
+    connection: AsyncConnection, queries: np.ndarray, k: int
+) -> tuple[list[float], list[set[int]]]:
+    """Run the search query for every query vector and time it."""
+    latencies: list[float] = []
+    results: list[set[int]] = []
+    for query in queries:
+        distance = corpus.c.embedding.cosine_distance(query).label("distance")
+        started = time.perf_counter()
+        result = await connection.execute(
+            select(corpus.c.id, distance).order_by(distance).limit(k)
+        )
+        ids = {row.id for row in result.all()}
+        latencies.append(time.perf_counter() - started)
+        results.append(ids)
+    return latencies, results
+
+
+def summarize(
+    latencies: list[float], results: list[set[int]], truth: np.ndarray
+) -> dict[str, float]:
+    recall = statistics.mean(
+        len(found & set(expected.tolist())) / len(expected)
+        for found, expected in zip(results, truth, strict=True)
+    )
+    return {
+        "recall": round(recall, 4),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+    }
+
+
+async def benchmark_size(
+    connection: AsyncConnection,
+    size: int,
+    args: argparse.Namespace,
+    rng: np.random.Generator,
+) -> dict[str, Any]:
+    """Measure the exact scan and every index configuration on one corpus."""
+    embeddings, centres = generate_embeddings(size, max(8, size // 500), rng)
+    # Queries near the topics, but not copies of stored embeddings
+    queries = centres[rng.integers(len(centres), size=args.queries)] + 0.1 * (
+        rng.standard_normal((args.queries, EMBEDDING_DIMENSIONS))
+    )
+    queries = (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(
+        np.float32
+    )
+    truth = exact_neighbours(embeddings, queries, args.k)
+
+    started = time.perf_counter()
+    await load(connection, embeddings)
+    report: dict[str, Any] = {
+        "load_seconds": round(time.perf_counter() - started, 2),
+        "indexes": [],
+    }
+
+    await connection.execute(text("SET enable_indexscan = off"))
+    report["exact"] = summarize(*await run_queries(connection, queries, args.k), truth)
+    await connection.execute(text("SET enable_indexscan = on"))
+
+    for m in args.m:
+        for ef_construction in args.ef_construction:
+            index = Index(
+                "ann_benchmark_corpus_hnsw",
+                corpus.c.embedding,
+                postgresql_using="hnsw",
+                postgresql_with={"m": m, "ef_construction": ef_construction},
+                postgresql_ops={"embedding": "vector_cosine_ops"},
+            )
+            started = time.perf_counter()
+            await connection.run_sync(index.create)
+            build_seconds = time.perf_counter() - started
+            searches = {}
+            for ef_search in args.ef_search:
+                await set_ef_search(connection, max(ef_search, args.k))
+                searches[ef_search] = summarize(
+                    *await run_queries(connection, queries, args.k), truth
+                )
+            await connection.run_sync(index.drop)
+            report["indexes"].append(
+                {
+                    "m": m,
+                    "ef_construction": ef_construction,
+                    "build_seconds": round(build_seconds, 2),
+                    "ef_search": searches,
+                }
+            )
+    await connection.run_sync(metadata.drop_all)
+    return report
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    from app.settings import get_settings
+
+    engine = create_async_engine(str(get_settings().SQLALCHEMY_DATABASE_URI))
+    rng = np.random.default_rng(args.seed)
+    report: dict[str, Any] = {"k": args.k, "queries": args.queries, "sizes": {}}
+    try:
+        async with engine.connect() as connection:
+            for size in args.sizes:
+                report["sizes"][size] = await benchmark_size(
+                    connection, size, args, rng
+                )
+                await connection.commit()
+    finally:
+        await engine.dispose()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--m", type=int, nargs="+", default=[16])
+    parser.add_argument("--ef-construction", type=int, nargs="+", default=[64])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[40, 100, 200, 400])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Only the database settings are used, the LLM is never called
+    os.environ.setdefault("LLM_PROVIDER", "fake")
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+Cache of search query embeddings.
+
+Encoding the query is the dominant cost of a search request on CPU-only
+hosts, and popular queries are typed over and over. Every worker keeps the
+embeddings of recent queries in a bounded, least recently used cache whose
+entries expire after a TTL. Optionally, embeddings are also stored in
+Postgres, so a query encoded by one worker is a hit for all others.
+
+Queries are normalized before lookup: Unicode NFKC, whitespace collapsed and
+case folded, as the model is uncased and embeds these variants identically.
+Keys include the embedding model, so switching models never returns stale
+vectors. Concurrent lookups of the same query share one encoding.
+"""
+
+import asyncio
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db import DbSessionManager, get_db_session_manager
+from app.hashing import generate_content_hash
+from app.llm.embeddings import EmbeddingLayer
+from app.metrics.registry import get_metrics_registry
+from app.models import QueryEmbeddingCacheEntry
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so that trivially different spellings share a key."""
+    query = unicodedata.normalize("NFKC", query)
+    return _WHITESPACE.sub(" ", query).strip().casefold()
+
+
+class QueryEmbeddingCache:
+    """Caches query embeddings in memory and, optionally, in the database.
+
+    Example:
+        ```python
+        embedding = await get_query_embedding_cache().embed(query)
+        ```
+    """
+
+    def __init__(
+        self,
+        model: str,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 3600.0,
+        session_manager: DbSessionManager | None = None,
+        shared_ttl_days: int = 7,
+        shared_max_entries: int = 100_000,
+        prune_every: int = 500,
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            model: Name of the embedding model, part of every key.
+            max_entries: Maximum number of embeddings kept in memory.
+            ttl_seconds: Seconds an embedding stays in memory.
+            session_manager: Database session manager of the shared tier,
+                None to cache in memory only.
+            shared_ttl_days: Days after which a shared entry expires. Zero
+                disables expiry.
+            shared_max_entries: Maximum number of shared entries. Zero
+                disables the limit.
+            prune_every: Number of shared writes between two eviction runs.
+        """
+        self.model = model
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.session_manager = session_manager
+        self.shared_ttl_days = shared_ttl_days
+        self.shared_max_entries = shared_max_entries
+        self.prune_every = prune_every
+        self._entries: OrderedDict[str, tuple[list[float], float]] = OrderedDict()
+        self._pending: dict[str, asyncio.Future[list[float]]] = {}
+        self._shared_writes = 0
+        self._counters = {
+            "hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "expired": 0,
+            "evicted": 0,
+            "shared_errors": 0,
+        }
+        self._encode_seconds = 0.0
+
+    def key(self, query: str) -> str:
+        """Build the cache key of a query for the configured model."""
+        return generate_content_hash(f"{self.model}\0{normalize_query(query)}")
+
+    async def embed(self, query: str) -> list[float]:
+        """Return the embedding of a query, encoding it only on a miss.
+
+        Args:
+            query: Search query as typed by the user.
+
+        Returns:
+            The embedding vector, or a zero vector if encoding failed.
+        """
+        key = self.key(query)
+        embedding = self._get_local(key)
+        if embedding is not None:
+            self._counters["hits"] += 1
+            return embedding
+
+        task = self._pending.get(key)
+        if task is None:
+            # Run as its own task, so a cancelled request does not cancel the
+            # encoding other requests for the same query are waiting for
+            task = asyncio.ensure_future(self._load(key, query))
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        else:
+            self._counters["coalesced"] += 1
+        return await asyncio.shield(task)
+
+    async def prune(self) -> int:
+        """Evict expired and, beyond the limit, the oldest shared entries.
+
+        Returns:
+            The number of evicted entries.
+        """
+        if self.session_manager is None:
+            return 0
+        evicted = 0
+        async with self.session_manager.get_session() as session:
+            if self.shared_ttl_days > 0:
+                result = await session.execute(
+                    delete(QueryEmbeddingCacheEntry).where(
+                        QueryEmbeddingCacheEntry.created_at < self._shared_expiry()
+                    )
+                )
+                evicted += result.rowcount
+
+            if self.shared_max_entries > 0:
+                ranked = select(
+                    QueryEmbeddingCacheEntry.key,
+                    func.row_number()
+                    .over(order_by=QueryEmbeddingCacheEntry.created_at.desc())
+                    .label("rank"),
+                ).subquery()
+                result = await session.execute(
+                    delete(QueryEmbeddingCacheEntry).where(
+                        QueryEmbeddingCacheEntry.key.in_(
+                            select(ranked.c.key).where(
+                                ranked.c.rank > self.shared_max_entries
+                            )
+                        )
+                    )
+                )
+                evicted += result.rowcount
+
+            await session.commit()
+
+        if evicted:
+            logger.info(f"Evicted {evicted} shared query embeddings")
+        return evicted
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit rates of both tiers and the time spent encoding misses."""
+        # Lookups that waited for a concurrent encoding of the same query
+        # did not encode either, so they count as hits
+        hits = (
+            self._counters["hits"]
+            + self._counters["shared_hits"]
+            + self._counters["coalesced"]
+        )
+        lookups = hits + self._counters["misses"]
+        return {
+            **self._counters,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "local_hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "shared": self.session_manager is not None,
+            "encode_seconds": round(self._encode_seconds, 3),
+        }
+
+    async def _load(self, key: str, query: str) -> list[float]:
+        """Look the query up in the shared tier, or encode it."""
+        embedding = await self._get_shared(key)
+        if embedding is not None:
+            self._counters["shared_hits"] += 1
+            self._put_local(key, embedding)
+            return embedding
+
+        self._counters["misses"] += 1
+        started = time.perf_counter()
+        embedding = await EmbeddingLayer(query).create_embedding(query=True)
+        self._encode_seconds += time.perf_counter() - started
+        # A zero vector means encoding failed, which is not worth keeping
+        if any(embedding):
+            self._put_local(key, embedding)
+            await self._set_shared(key, embedding)
+        return embedding
+
+    def _get_local(self, key: str) -> list[float] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        embedding, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self._counters["expired"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return embedding
+
+    def _put_local(self, key: str, embedding: list[float]) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (embedding, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evicted"] += 1
+
+    async def _get_shared(self, key: str) -> list[float] | None:
+        if self.session_manager is None:
+            return None
+        try:
+            async with self.session_manager.get_session() as session:
+                query = select(QueryEmbeddingCacheEntry.embedding).where(
+                    QueryEmbeddingCacheEntry.key == key
+                )
+                if self.shared_ttl_days > 0:
+                    query = query.where(
+                        QueryEmbeddingCacheEntry.created_at >= self._shared_expiry()
+                    )
+                embedding = await session.scalar(query)
+        except Exception as e:
+            # The shared tier is an optimization, searching goes on without it
+            self._counters["shared_errors"] += 1
+            logger.warning(f"Shared query embedding lookup failed: {e}")
+            return None
+        return None if embedding is None else [float(value) for value in embedding]
+
+    async def _set_shared(self, key: str, embedding: list[float]) -> None:
+        if self.session_manager is None:
+            return
+        values = {"embedding": embedding, "created_at": datetime.now(UTC)}
+        try:
+            async with self.session_manager.get_session() as session:
+                await session.execute(
+                    insert(QueryEmbeddingCacheEntry)
+                    .values(key=key, model=self.model, **values)
+                    .on_conflict_do_update(index_elements=["key"], set_=values)
+                )
+                await session.commit()
+
+            self._shared_writes += 1
+            if self.prune_every and self._shared_writes % self.prune_every == 0:
+                await self.prune()
+        except Exception as e:
+            self._counters["shared_errors"] += 1
+            logger.warning(f"Shared query embedding write failed: {e}")
+
+    def _shared_expiry(self) -> datetime:
+        return datetime.now(UTC) - timedelta(days=self.shared_ttl_days)
+
+
+@lru_cache
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    settings = get_settings()
+    cache = QueryEmbeddingCache(
+        settings.EMBEDDING_MODEL,
+        max_entries=settings.SEARCH_QUERY_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.SEARCH_QUERY_CACHE_TTL_SECONDS,
+        session_manager=(
+            get_db_session_manager() if settings.SEARCH_QUERY_CACHE_SHARED else None
+        ),
+        shared_ttl_days=settings.SEARCH_QUERY_CACHE_SHARED_TTL_DAYS,
+        shared_max_entries=settings.SEARCH_QUERY_CACHE_SHARED_MAX_ENTRIES,
+        prune_every=settings.SEARCH_QUERY_CACHE_PRUNE_EVERY,
+    )
+    get_metrics_registry().register("query_embedding_cache", cache.stats)
+    return cache
@@ -1,7 +1,9 @@
-from fastapi import APIRouter
+import uuid
+
+from fastapi import APIRouter, Query
 
 from app.schemas.base import BaseSchema
-from app.search.semantic import SemanticSearchDep
+from app.search.semantic import SearchFilters, SearchMode, SemanticSearchDep
 
 router = APIRouter(prefix="/search", tags=["search"])
 
@@ -10,10 +12,26 @@ class SearchPublic(BaseSchema):
     """Public model for search results."""
 
     results: list[str]
+    mode: SearchMode
+    timings_ms: dict[str, float]
 
 
 @router.get("/search", response_model=SearchPublic)
-async def search(query: str, semantic_search: SemanticSearchDep) -> SearchPublic:
-    result = await semantic_search.search(query)
-
-    return SearchPublic(results=result)
+async def search(
+    query: str,
+    semantic_search: SemanticSearchDep,
+    mode: SearchMode | None = None,
+    collection_id: uuid.UUID | None = Query(default=None, alias="collectionId"),
+    tags: list[str] = Query(default=[]),
+) -> SearchPublic:
+    """Search bookmarked pages, optionally within a collection and tags.
+
+    Results have all of the given tags.
+    """
+    result = await semantic_search.search(
+        query, mode=mode, filters=SearchFilters(collection_id=collection_id, tags=tags)
+    )
+
+    return SearchPublic(
+        results=result.results, mode=result.mode, timings_ms=result.timings_ms
+    )
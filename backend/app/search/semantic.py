@@ -3,16 +3,223 @@ Semantic search functionality using vector embeddings.
 
 This module provides semantic search capabilities to find relevant content
 based on vector similarity using pgvector.
+
+Pages are matched by their passages, so a hit deep inside a long article
+counts, and every page is scored by its best matching passages. Pages
+embedded before passages existed are matched by their page embedding.
+
+Both lookups are nearest neighbour queries served by the HNSW indexes on
+the embeddings, with ``hnsw.ef_search`` set per query.
+
+Vector similarity misses exact keywords such as error codes, product names
+and URLs, so a lexical leg runs full-text search over the bookmarks' titles,
+URLs and descriptions and the pages' content previews. The hybrid mode runs
+both legs concurrently and fuses them by reciprocal rank.
+
+Searches can be scoped to a collection and to tags. Scoped searches are
+filtered inside the database rather than after the top results: when few
+pages match the filter, their passages are compared exactly; otherwise the
+HNSW scan continues iteratively until enough rows pass the filter.
 """
 
-from typing import Annotated
+import asyncio
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import Awaitable, Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import Annotated, Literal, TypeVar
 
 from fastapi import Depends
-from sqlalchemy import select
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    distinct,
+    exists,
+    func,
+    literal_column,
+    select,
+    text,
+    union_all,
+)
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.db import DbSessionDep, get_db_session_manager
+from app.models import (
+    Bookmark,
+    ContentChunk,
+    ContentEmbedding,
+    TagBookmarkAssociation,
+)
+from app.search.query_cache import get_query_embedding_cache
+from app.settings import get_settings
+
+# Largest hnsw.ef_search accepted by pgvector
+MAX_EF_SEARCH = 1000
+
+# First pgvector version with iterative index scans; older versions reject
+# the unknown hnsw.iterative_scan setting
+ITERATIVE_SCAN_VERSION = (0, 8)
+
+_iterative_scan_supported: bool | None = None
+
+# Text search configuration of the generated search_vector columns: no
+# stemming or stop words, so error codes, product names and URLs match
+# exactly, in any language
+TEXT_SEARCH_CONFIG = literal_column("'simple'::regconfig")
+
+SearchMode = Literal["vector", "lexical", "hybrid"]
+
+T = TypeVar("T")
+
+
+def aggregate_hits(
+    hits: Iterable[tuple[str, float]],
+    mode: Literal["max", "top_k_sum"] = "max",
+    top_k: int = 3,
+) -> list[tuple[str, float]]:
+    """Score documents by the similarity of their matching passages.
+
+    Args:
+        hits: URL and cosine similarity of every matching passage.
+        mode: "max" scores a document by its best passage, "top_k_sum" by
+            the sum of its ``top_k`` best passages, which favours documents
+            that match in several places.
+        top_k: Number of passages summed in the "top_k_sum" mode.
+
+    Returns:
+        URL and score of every document, best first.
+    """
+    similarities: dict[str, list[float]] = defaultdict(list)
+    for url, similarity in hits:
+        similarities[url].append(similarity)
+
+    count = 1 if mode == "max" else top_k
+    scores = {
+        url: sum(sorted(values, reverse=True)[:count])
+        for url, values in similarities.items()
+    }
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+def reciprocal_rank_fusion(
+    rankings: Iterable[Sequence[str]], k: int = 60
+) -> list[tuple[str, float]]:
+    """Fuse rankings by the sum of reciprocal ranks of every document.
+
+    Only ranks matter, so the scores of the rankings, cosine similarity and
+    text rank, need not be comparable.
+
+    Args:
+        rankings: URLs of each ranking, best first.
+        k: Smoothing constant; higher values give lower ranks more weight.
+
+    Returns:
+        URL and fused score of every document, best first.
+    """
+    scores: dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, url in enumerate(ranking, start=1):
+            scores[url] += 1 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+async def set_ef_search(
+    session: AsyncSession | AsyncConnection, ef_search: int
+) -> None:
+    """Set the HNSW candidate list size for the rest of the transaction."""
+    ef_search = min(ef_search, MAX_EF_SEARCH)
+    await session.execute(
+        select(func.set_config("hnsw.ef_search", str(ef_search), True))
+    )
+
+
+async def supports_iterative_scan(session: AsyncSession) -> bool:
+    """Whether the installed pgvector supports iterative index scans.
+
+    The version is looked up once per process.
+    """
+    global _iterative_scan_supported
+    if _iterative_scan_supported is None:
+        version = await session.scalar(
+            text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+        )
+        _iterative_scan_supported = _parse_version(version) >= ITERATIVE_SCAN_VERSION
+    return _iterative_scan_supported
+
+
+def _parse_version(version: str | None) -> tuple[int, ...]:
+    parts = []
+    for part in (version or "").split("."):
+        if not part.isdigit():
+            break
+        parts.append(int(part))
+    return tuple(parts)
+
+
+async def set_iterative_scan(session: AsyncSession, max_scan_tuples: int) -> None:
+    """Let HNSW scans of this transaction continue until enough rows pass
+    the filters, visiting at most ``max_scan_tuples`` rows."""
+    await session.execute(
+        select(
+            func.set_config("hnsw.iterative_scan", "relaxed_order", True),
+            func.set_config("hnsw.max_scan_tuples", str(max_scan_tuples), True),
+        )
+    )
+
+
+@dataclass
+class SearchFilters:
+    """Scope of a search.
+
+    Attributes:
+        collection_id: Only pages bookmarked in this collection.
+        tags: Only pages bookmarked with all of these tags.
+    """
 
-from app.db import DbSessionDep
-from app.llm.embeddings import EmbeddingLayer
-from app.models import ContentEmbedding
+    collection_id: uuid.UUID | None = None
+    tags: list[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return self.collection_id is not None or bool(self.tags)
+
+    def bookmark_conditions(self) -> list[ColumnElement[bool]]:
+        """Conditions on ``Bookmark`` rows in the scope."""
+        conditions: list[ColumnElement[bool]] = []
+        if self.collection_id is not None:
+            conditions.append(Bookmark.collection_id == self.collection_id)
+        if self.tags:
+            tags = set(self.tags)
+            tagged = (
+                select(TagBookmarkAssociation.bookmark_id)
+                .where(TagBookmarkAssociation.tag_name.in_(tags))
+                .group_by(TagBookmarkAssociation.bookmark_id)
+                .having(func.count() == len(tags))
+            )
+            conditions.append(Bookmark.id.in_(tagged))
+        return conditions
+
+    def content_embedding_ids(self) -> Select[tuple[uuid.UUID | None]]:
+        """Ids of the content embeddings of the pages in the scope."""
+        return select(Bookmark.content_embedding_id).where(
+            Bookmark.content_embedding_id.is_not(None), *self.bookmark_conditions()
+        )
+
+
+@dataclass
+class SearchResult:
+    """Ranked results of a search and how they were found.
+
+    Attributes:
+        results: URLs of the matching pages, best first.
+        mode: Search mode that ran.
+        timings_ms: Wall time of each leg ("vector", "lexical") and of the
+            whole search ("total"), in milliseconds.
+    """
+
+    results: list[str]
+    mode: SearchMode
+    timings_ms: dict[str, float] = field(default_factory=dict)
 
 
 class SemanticSearch:
@@ -27,43 +234,239 @@ class SemanticSearch:
         self.session = session
 
     async def search(
-        self, query: str, limit: int = 10, similarity_threshold: float = 0.8
-    ):
-        """Search for semantically similar content.
+        self,
+        query: str,
+        limit: int = 10,
+        similarity_threshold: float = 0.8,
+        mode: SearchMode | None = None,
+        filters: SearchFilters | None = None,
+    ) -> SearchResult:
+        """Search for content matching the query.
 
         Args:
             limit: Maximum number of results to return
-            similarity_threshold: Minimum cosine similarity threshold (0-1)
+            similarity_threshold: Maximum cosine distance of vector matches
+            mode: "vector" for similarity of embeddings, "lexical" for full
+                text search, "hybrid" for both fused by reciprocal rank;
+                defaults to SEARCH_DEFAULT_MODE
+            filters: Collection and tags the results are restricted to
 
         Returns:
-            List of dictionaries containing search results with similarity scores
+            SearchResult: URLs of the best matches with the mode and timings
         """
+        settings = get_settings()
+        mode = mode or settings.SEARCH_DEFAULT_MODE
+        filters = filters or SearchFilters()
         if not query.strip():
+            return SearchResult(results=[], mode=mode)
+
+        timings_ms: dict[str, float] = {}
+        started = time.perf_counter()
+        if mode == "vector":
+            ranked = await self._timed(
+                "vector",
+                timings_ms,
+                self._vector_search(
+                    self.session, query, limit, similarity_threshold, filters
+                ),
+            )
+            results = [url for url, _ in ranked]
+        elif mode == "lexical":
+            ranked = await self._timed(
+                "lexical",
+                timings_ms,
+                self._lexical_search(self.session, query, limit, filters),
+            )
+            results = [url for url, _ in ranked]
+        else:
+            # Both legs at once, the lexical one on its own connection as a
+            # session runs one statement at a time
+            candidates = max(limit, settings.SEARCH_HYBRID_CANDIDATES)
+            async with get_db_session_manager().get_session() as lexical_session:
+                vector_ranked, lexical_ranked = await asyncio.gather(
+                    self._timed(
+                        "vector",
+                        timings_ms,
+                        self._vector_search(
+                            self.session,
+                            query,
+                            candidates,
+                            similarity_threshold,
+                            filters,
+                        ),
+                    ),
+                    self._timed(
+                        "lexical",
+                        timings_ms,
+                        self._lexical_search(
+                            lexical_session, query, candidates, filters
+                        ),
+                    ),
+                )
+            fused = reciprocal_rank_fusion(
+                [
+                    [url for url, _ in vector_ranked],
+                    [url for url, _ in lexical_ranked],
+                ],
+                k=settings.SEARCH_RRF_K,
+            )
+            results = [url for url, _ in fused[:limit]]
+        timings_ms["total"] = round((time.perf_counter() - started) * 1000, 2)
+
+        return SearchResult(results=results, mode=mode, timings_ms=timings_ms)
+
+    async def _vector_search(
+        self,
+        session: AsyncSession,
+        query: str,
+        limit: int,
+        similarity_threshold: float,
+        filters: SearchFilters,
+    ) -> list[tuple[str, float]]:
+        """Rank pages by the cosine similarity of their passages."""
+        # Embedding of the search query, encoded only if not cached
+        query_embedding = await get_query_embedding_cache().embed(query)
+        if not any(query_embedding):
             return []
+        settings = get_settings()
+        # The candidates follow ef_search, as an index scan returns no more
+        candidates = min(
+            max(settings.SEARCH_HNSW_EF_SEARCH, limit * settings.SEARCH_CHUNK_TOP_K),
+            MAX_EF_SEARCH,
+        )
 
-        # Create embedding for the search query
-        embedding_layer = EmbeddingLayer(query)
-        query_embedding = await embedding_layer.create_embedding()
+        chunks = select(ContentChunk.content_embedding_id, ContentChunk.embedding)
+        pages = select(
+            ContentEmbedding.id, ContentEmbedding.url, ContentEmbedding.embedding
+        )
+        exact = False
+        if filters:
+            scope = filters.content_embedding_ids()
+            chunks = chunks.where(ContentChunk.content_embedding_id.in_(scope))
+            pages = pages.where(ContentEmbedding.id.in_(scope))
+            scope_pages = await session.scalar(
+                select(func.count(distinct(scope.subquery().c.content_embedding_id)))
+            )
+            if not scope_pages:
+                return []
+            # Few pages are cheaper to compare exactly than to find by
+            # scanning the index past every page outside the scope. Without
+            # iterative scans the index would return too few rows in the
+            # scope, so older pgvector versions always compare exactly
+            exact = (
+                scope_pages <= settings.SEARCH_EXACT_FILTER_MAX_PAGES
+                or not await supports_iterative_scan(session)
+            )
+        if not exact:
+            await set_ef_search(session, candidates)
+            if filters:
+                await set_iterative_scan(session, settings.SEARCH_HNSW_MAX_SCAN_TUPLES)
 
-        search_sql_query = (
-            select(
-                ContentEmbedding,
-                ContentEmbedding.embedding.cosine_distance(query_embedding).label(
-                    "distance"
-                ),
+        # A materialized CTE cannot use the HNSW index, so the scope is
+        # compared exactly; a subquery is inlined into the index scan
+        if exact:
+            chunk_source = chunks.cte("scoped_chunks").prefix_with("MATERIALIZED")
+            page_source = pages.cte("scoped_pages").prefix_with("MATERIALIZED")
+        else:
+            chunk_source = chunks.subquery("chunks")
+            page_source = pages.subquery("pages")
+
+        # Nearest passages first, then the pages they belong to, so the
+        # nearest neighbour search runs on the passages alone. The distance
+        # is computed once, ordered by its label, and the threshold applies
+        # to the candidates only, so the ORDER BY ... LIMIT can use the index
+        chunk_distance = chunk_source.c.embedding.cosine_distance(
+            query_embedding
+        ).label("distance")
+        nearest_chunks = (
+            select(chunk_source.c.content_embedding_id, chunk_distance)
+            .order_by(chunk_distance)
+            .limit(candidates)
+            .subquery()
+        )
+        chunk_hits = await session.execute(
+            select(ContentEmbedding.url, nearest_chunks.c.distance)
+            .join(
+                nearest_chunks,
+                nearest_chunks.c.content_embedding_id == ContentEmbedding.id,
             )
-            .filter(
-                ContentEmbedding.embedding.cosine_distance(query_embedding)
-                < similarity_threshold
+            .where(nearest_chunks.c.distance < similarity_threshold)
+        )
+
+        # Pages without passages are matched by their page embedding
+        page_distance = page_source.c.embedding.cosine_distance(query_embedding).label(
+            "distance"
+        )
+        nearest_pages = (
+            select(page_source.c.id, page_source.c.url, page_distance)
+            .order_by(page_distance)
+            .limit(candidates)
+            .subquery()
+        )
+        page_hits = await session.execute(
+            select(nearest_pages.c.url, nearest_pages.c.distance)
+            .where(
+                ~exists().where(
+                    ContentChunk.content_embedding_id == nearest_pages.c.id
+                ),
+                nearest_pages.c.distance < similarity_threshold,
             )
-            .order_by("distance")
+            .order_by(nearest_pages.c.distance)
             .limit(limit)
         )
 
-        result = await self.session.execute(search_sql_query)
-        result = result.scalars().all()
+        ranked = aggregate_hits(
+            (
+                (url, 1 - distance)
+                for url, distance in [*chunk_hits.all(), *page_hits.all()]
+            ),
+            mode=settings.SEARCH_CHUNK_AGGREGATION,
+            top_k=settings.SEARCH_CHUNK_TOP_K,
+        )
+        return ranked[:limit]
+
+    async def _lexical_search(
+        self, session: AsyncSession, query: str, limit: int, filters: SearchFilters
+    ) -> list[tuple[str, float]]:
+        """Rank pages by full-text match of bookmarks and content previews.
+
+        The query is parsed like a web search: quoted phrases, ``or`` and
+        ``-`` for exclusion. Matches of a bookmark's title, URL and
+        description and of the page's content preview add up.
+        """
+        ts_query = func.websearch_to_tsquery(TEXT_SEARCH_CONFIG, query)
+        bookmark_matches = select(
+            Bookmark.url.label("url"),
+            func.ts_rank_cd(Bookmark.search_vector, ts_query).label("rank"),
+        ).where(Bookmark.search_vector.op("@@")(ts_query))
+        page_matches = select(
+            ContentEmbedding.url.label("url"),
+            func.ts_rank_cd(ContentEmbedding.search_vector, ts_query).label("rank"),
+        ).where(ContentEmbedding.search_vector.op("@@")(ts_query))
+        if filters:
+            bookmark_matches = bookmark_matches.where(*filters.bookmark_conditions())
+            page_matches = page_matches.where(
+                ContentEmbedding.id.in_(filters.content_embedding_ids())
+            )
+        matches = union_all(bookmark_matches, page_matches).subquery()
+        rank = func.sum(matches.c.rank).label("rank")
+        result = await session.execute(
+            select(matches.c.url, rank)
+            .group_by(matches.c.url)
+            .order_by(rank.desc(), matches.c.url)
+            .limit(limit)
+        )
+        return [(url, float(rank)) for url, rank in result.all()]
 
-        return [row.url for row in result]
+    @staticmethod
+    async def _timed(
+        leg: str, timings_ms: dict[str, float], awaitable: Awaitable[T]
+    ) -> T:
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            timings_ms[leg] = round((time.perf_counter() - started) * 1000, 2)
 
 
 SemanticSearchDep = Annotated[SemanticSearch, Depends(SemanticSearch)]
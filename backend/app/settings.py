@@ -1,6 +1,7 @@
 from functools import lru_cache
+from typing import Literal
 
-from pydantic import Field, PostgresDsn, computed_field
+from pydantic import Field, PostgresDsn, computed_field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -13,7 +14,190 @@ class Settings(BaseSettings):
     POSTGRES_USER: str = "postgres"
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "postgres"
-    GEMINI_API_KEY: str = Field(..., init=False)
+    # Only required with the Gemini provider
+    GEMINI_API_KEY: str | None = Field(None, init=False)
+
+    # Headless browser pool used by the scrapper
+    BROWSER_POOL_SIZE: int = 2
+    BROWSER_MAX_PAGES_PER_BROWSER: int = 50
+    BROWSER_MAX_MEMORY_MB: int = 1024
+    BROWSER_BLOCKED_RESOURCE_TYPES: list[str] = ["image", "media", "font"]
+    BROWSER_BLOCKED_DOMAINS: list[str] = [
+        "google-analytics.com",
+        "googletagmanager.com",
+        "doubleclick.net",
+        "googlesyndication.com",
+        "facebook.net",
+        "hotjar.com",
+        "segment.io",
+        "segment.com",
+        "mixpanel.com",
+        "scorecardresearch.com",
+        "quantserve.com",
+        "newrelic.com",
+        "nr-data.net",
+        "clarity.ms",
+    ]
+    BROWSER_NAVIGATION_TIMEOUT_SECONDS: float = 30.0
+    BROWSER_DOM_SETTLE_QUIET_MS: int = 500
+    BROWSER_DOM_SETTLE_TIMEOUT_MS: int = 5000
+
+    # Tiered fetching: plain HTTP first, headless browser only when needed
+    SCRAPPER_FETCH_MODE: Literal["tiered", "http", "browser"] = "tiered"
+    SCRAPPER_HTTP_TIMEOUT_SECONDS: float = 15.0
+    SCRAPPER_HTTP_MAX_CONNECTIONS: int = 100
+    # Bytes of a page read on the fast path; longer pages are cut off
+    SCRAPPER_HTTP_MAX_BYTES: int = 5 * 1024 * 1024
+    SCRAPPER_MIN_TEXT_LENGTH: int = 200
+    # BeautifulSoup parser backend, e.g. "lxml" or "html.parser"
+    SCRAPPER_HTML_PARSER: str = "lxml"
+
+    # Scrape scheduling: global cap plus per-host politeness
+    SCRAPPER_MAX_CONCURRENCY: int = 8
+    SCRAPPER_PER_HOST_CONCURRENCY: int = 2
+    SCRAPPER_PER_HOST_DELAY_SECONDS: float = 1.0
+
+    # Raw HTML snapshots kept for replaying the analysis without re-scraping
+    SNAPSHOT_ENABLED: bool = True
+    SNAPSHOT_COMPRESSION_LEVEL: int = 10
+    SNAPSHOT_RETENTION_DAYS: int = 90
+    SNAPSHOT_MAX_TOTAL_MB: int = 2048
+    SNAPSHOT_PRUNE_EVERY: int = 100
+
+    # Publisher metadata used instead of generated titles and summaries
+    METADATA_POLICY_ENABLED: bool = True
+    METADATA_MIN_TITLE_WORDS: int = 2
+    METADATA_MIN_SUMMARY_LENGTH: int = 80
+
+    # LLM backend: the Gemini API, or a deterministic local stand-in with
+    # simulated latency, server errors and rate limiting for load tests
+    LLM_PROVIDER: Literal["gemini", "fake"] = "gemini"
+    LLM_FAKE_LATENCY_MS: int = 500
+    LLM_FAKE_LATENCY_JITTER_MS: int = 100
+    LLM_FAKE_ERROR_RATE: float = 0.0
+    LLM_FAKE_RATE_LIMIT_RATE: float = 0.0
+    LLM_FAKE_RETRY_AFTER_SECONDS: float = 1.0
+    LLM_FAKE_SEED: int = 0
+
+    # Pooled HTTP/2 client used for Gemini requests
+    LLM_HTTP_TIMEOUT_SECONDS: float = 60.0
+    LLM_HTTP_CONNECT_TIMEOUT_SECONDS: float = 10.0
+    LLM_HTTP_MAX_CONNECTIONS: int = 20
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+
+    # Client-side limits of LLM requests, retries and circuit breaker
+    LLM_REQUESTS_PER_MINUTE: int = 15
+    LLM_TOKENS_PER_MINUTE: int = 1_000_000
+    LLM_EXPECTED_OUTPUT_TOKENS: int = 512
+    LLM_MAX_RETRIES: int = 5
+    LLM_BACKOFF_BASE_SECONDS: float = 1.0
+    LLM_BACKOFF_MAX_SECONDS: float = 60.0
+    LLM_CIRCUIT_BREAKER_THRESHOLD: int = 5
+    LLM_CIRCUIT_BREAKER_COOLDOWN_SECONDS: float = 60.0
+    # Time one request may wait for retries and the breaker before it fails
+    LLM_MAX_RETRY_WAIT_SECONDS: float = 600.0
+
+    # Persistent cache of LLM responses
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL_DAYS: int = 30
+    LLM_CACHE_MAX_ENTRIES: int = 100_000
+    LLM_CACHE_MAX_SIZE_MB: int = 256
+    LLM_CACHE_PRUNE_EVERY: int = 500
+
+    # Combined analyses of concurrent jobs sent as one multi-document request;
+    # a batch size of 1 disables batching
+    LLM_BATCH_MAX_SIZE: int = 8
+    LLM_BATCH_MAX_WAIT_MS: int = 200
+
+    # "combined" asks for title, summary, collection and tags in one request,
+    # "separate" sends one request per field
+    LLM_ANALYSIS_MODE: Literal["combined", "separate"] = "combined"
+
+    # Nearest-centroid collection classifier on content embeddings; the LLM
+    # only picks the collection when the best match is not clear enough
+    COLLECTION_CLASSIFIER_ENABLED: bool = True
+    COLLECTION_CLASSIFIER_MIN_SIMILARITY: float = 0.35
+    COLLECTION_CLASSIFIER_MIN_MARGIN: float = 0.05
+    COLLECTION_CLASSIFIER_MIN_BOOKMARKS: int = 3
+
+    # Tags voted by the nearest tagged bookmarks: only the best candidates go
+    # into the LLM prompt, and a confident vote replaces the LLM
+    TAG_SUGGESTER_NEIGHBOURS: int = 10
+    TAG_SUGGESTER_MAX_CANDIDATES: int = 20
+    TAG_SUGGESTER_MIN_SIMILARITY: float = 0.5
+    TAG_SUGGESTER_MIN_NEIGHBOURS: int = 3
+    TAG_SUGGESTER_CONFIDENT_SCORE: float = 0.6
+    TAG_SUGGESTER_MIN_CONFIDENT_TAGS: int = 2
+    TAG_SUGGESTER_SKIP_LLM: bool = True
+
+    # Generated topics shared through the database; every worker keeps a
+    # bounded view of the most frequent ones, reloaded periodically, and
+    # prompts get the topics closest to the page
+    TOPIC_VOCABULARY_MAX_CACHED: int = 1000
+    TOPIC_VOCABULARY_REFRESH_SECONDS: float = 300.0
+    TOPIC_VOCABULARY_TOP_K: int = 20
+
+    # Embedding model, producing 384-dimensional embeddings, run on PyTorch or
+    # as its ONNX export with onnxruntime (the "onnx" extra), optionally
+    # quantized to int8 on first use
+    EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBEDDING_BACKEND: Literal["torch", "onnx"] = "torch"
+    EMBEDDING_ONNX_QUANTIZE: bool = True
+    EMBEDDING_ONNX_CACHE_DIR: str = "~/.cache/cuda/onnx"
+    # Threads per ONNX inference, zero for the onnxruntime default
+    EMBEDDING_ONNX_THREADS: int = 0
+
+    # Concurrent embedding requests encoded together on a dedicated thread
+    EMBEDDING_BATCH_MAX_SIZE: int = 32
+    EMBEDDING_BATCH_MAX_WAIT_MS: int = 10
+
+    # Long pages are also embedded as overlapping passages that do not cross
+    # headings, and search scores a page by its best passages: the best one
+    # ("max") or the sum of the top ones ("top_k_sum")
+    CHUNK_MAX_CHARS: int = 1000
+    CHUNK_OVERLAP_CHARS: int = 200
+    CHUNK_MAX_PER_DOCUMENT: int = 64
+    SEARCH_CHUNK_AGGREGATION: Literal["max", "top_k_sum"] = "max"
+    SEARCH_CHUNK_TOP_K: int = 3
+    # Candidate list size of HNSW index scans, set per search query, and the
+    # number of nearest passages fetched, as a scan returns at most this many
+    # rows: higher values trade latency for recall. It is only raised when a
+    # query asks for more than limit * SEARCH_CHUNK_TOP_K passages
+    SEARCH_HNSW_EF_SEARCH: int = 200
+    # Searches scoped to a collection or tags compare the passages of at most
+    # this many matching pages exactly; larger scopes use an iterative HNSW
+    # scan that continues until enough rows pass the filter, visiting at most
+    # SEARCH_HNSW_MAX_SCAN_TUPLES rows. Iterative scans need pgvector 0.8 or
+    # later; with older versions every scoped search is compared exactly
+    SEARCH_EXACT_FILTER_MAX_PAGES: int = 500
+    SEARCH_HNSW_MAX_SCAN_TUPLES: int = 20_000
+    # Search by embeddings ("vector"), full text ("lexical") or both fused by
+    # reciprocal rank ("hybrid"), unless a query asks for a mode; hybrid
+    # search fuses this many candidates of each leg
+    SEARCH_DEFAULT_MODE: Literal["vector", "lexical", "hybrid"] = "hybrid"
+    SEARCH_HYBRID_CANDIDATES: int = 50
+    SEARCH_RRF_K: int = 60
+
+    # Embeddings of normalized search queries kept per worker, least recently
+    # used first out and expiring after a TTL; with SEARCH_QUERY_CACHE_SHARED
+    # they are also stored in the database for all workers
+    SEARCH_QUERY_CACHE_MAX_ENTRIES: int = 10_000
+    SEARCH_QUERY_CACHE_TTL_SECONDS: float = 3600.0
+    SEARCH_QUERY_CACHE_SHARED: bool = False
+    SEARCH_QUERY_CACHE_SHARED_TTL_DAYS: int = 7
+    SEARCH_QUERY_CACHE_SHARED_MAX_ENTRIES: int = 100_000
+    SEARCH_QUERY_CACHE_PRUNE_EVERY: int = 500
+
+    # Time limit of each concurrent analysis step (LLM calls, embedding); time
+    # LLM requests wait for the rate limiter or its breaker is not counted
+    ANALYSIS_STAGE_TIMEOUT_SECONDS: float = 120.0
+
+    @model_validator(mode="after")
+    def check_llm_provider(self) -> "Settings":
+        if self.LLM_PROVIDER == "gemini" and not self.GEMINI_API_KEY:
+            raise ValueError("GEMINI_API_KEY is required with LLM_PROVIDER=gemini")
+        return self
 
     @computed_field
     @property
@@ -0,0 +1,111 @@
+"""Splitting of Markdown into passages."""
+
+import re
+
+from app.llm.chunking import chunk_markdown
+
+WORD = re.compile(r"word\d+")
+
+
+def words(start: int, stop: int) -> str:
+    return " ".join(f"word{i}" for i in range(start, stop))
+
+
+def test_short_document_is_one_passage():
+    chunks = chunk_markdown("Some text.\n\nMore text.")
+
+    assert [(chunk.heading, chunk.text) for chunk in chunks] == [
+        ("", "Some text.\n\nMore text.")
+    ]
+
+
+def test_passages_carry_their_heading_path():
+    markdown = (
+        "# Installation\n\nIntro.\n\n## Linux\n\nUse apt.\n\n"
+        "## macOS\n\nUse brew.\n\n# Usage\n\nRun it."
+    )
+
+    chunks = chunk_markdown(markdown)
+
+    assert [(chunk.heading, chunk.text) for chunk in chunks] == [
+        ("Installation", "Intro."),
+        ("Installation > Linux", "Use apt."),
+        ("Installation > macOS", "Use brew."),
+        ("Usage", "Run it."),
+    ]
+    assert chunks[1].embedding_text == "Installation > Linux\n\nUse apt."
+
+
+def test_setext_underlined_paragraph_is_a_heading():
+    chunks = chunk_markdown("Title\n=====\n\nIntro.\n\nPart\n----\n\nBody.")
+
+    assert [(chunk.heading, chunk.text) for chunk in chunks] == [
+        ("Title", "Intro."),
+        ("Title > Part", "Body."),
+    ]
+
+
+def test_thematic_break_after_list_keeps_the_list():
+    chunks = chunk_markdown("- a\n- b\n---\nAfter.")
+
+    assert [(chunk.heading, chunk.text) for chunk in chunks] == [
+        ("", "- a\n- b\n\nAfter.")
+    ]
+
+
+def test_fenced_code_is_one_block():
+    markdown = "```\n# not a heading\n\nstill code\n```"
+
+    chunks = chunk_markdown(markdown)
+
+    assert [(chunk.heading, chunk.text) for chunk in chunks] == [("", markdown)]
+
+
+def test_passages_fit_and_start_at_words():
+    markdown = "\n\n".join(
+        [words(0, 60), words(60, 64), words(64, 140), words(140, 200)]
+    )
+
+    chunks = chunk_markdown(markdown, max_chars=300, overlap_chars=80)
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert len(chunk.text) <= 300
+        assert all(WORD.fullmatch(word) for word in chunk.text.split())
+
+
+def test_windows_of_a_long_block_overlap_once():
+    chunks = chunk_markdown(words(0, 200), max_chars=300, overlap_chars=80)
+
+    texts = [chunk.text for chunk in chunks]
+    assert len(texts) > 1
+    for previous, text in zip(texts, texts[1:], strict=False):
+        assert "\n\n" not in text
+        first = text.split()[0]
+        assert first in previous.split()
+        # The overlap repeats at most the end of the previous passage
+        assert len(previous) - previous.index(f"{first} ") <= 80 + len(first)
+    assert set(" ".join(texts).split()) == set(words(0, 200).split())
+
+
+def test_consecutive_blocks_overlap_with_whole_blocks():
+    blocks = [words(i, i + 5) for i in range(0, 60, 5)]
+
+    chunks = chunk_markdown("\n\n".join(blocks), max_chars=200, overlap_chars=80)
+
+    assert len(chunks) > 1
+    for previous, chunk in zip(chunks, chunks[1:], strict=False):
+        previous_blocks = previous.text.split("\n\n")
+        chunk_blocks = chunk.text.split("\n\n")
+        # The passage starts with the trailing blocks of the previous one
+        repeated = previous_blocks[previous_blocks.index(chunk_blocks[0]) :]
+        assert chunk_blocks[: len(repeated)] == repeated
+        assert len("\n\n".join(repeated)) <= 80
+
+
+def test_max_chunks_drops_the_rest():
+    markdown = "\n\n".join(f"# Section {i}\n\nText {i}." for i in range(10))
+
+    chunks = chunk_markdown(markdown, max_chunks=3)
+
+    assert [chunk.text for chunk in chunks] == ["Text 0.", "Text 1.", "Text 2."]
@@ -0,0 +1,49 @@
+"""Agreement of the ONNX embedding backends with the PyTorch backend.
+
+Needs the ``onnx`` extra and the model, skipped when either is unavailable:
+    uv run --extra onnx pytest tests/test_embedding_parity.py
+"""
+
+import pytest
+
+pytest.importorskip("onnxruntime", reason="requires the onnx extra")
+pytest.importorskip("sentence_transformers")
+
+from app.llm.embedding_benchmark import compare, generate_texts  # noqa: E402
+from app.llm.embeddings import create_embedding_backend  # noqa: E402
+
+MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+
+@pytest.fixture(scope="module")
+def texts() -> list[str]:
+    return generate_texts(50)
+
+
+@pytest.fixture(scope="module")
+def reference(texts):
+    try:
+        encoder = create_embedding_backend("torch", MODEL)
+    except OSError as e:
+        pytest.skip(f"{MODEL} is not available: {e}")
+    return encoder.encode(texts)
+
+
+@pytest.mark.parametrize(
+    ("quantize", "min_cosine"),
+    [(False, 0.999), (True, 0.99)],
+    ids=["onnx", "onnx-int8"],
+)
+def test_onnx_agrees_with_torch(
+    tmp_path_factory, texts, reference, quantize, min_cosine
+):
+    encoder = create_embedding_backend(
+        "onnx",
+        MODEL,
+        quantize=quantize,
+        cache_dir=str(tmp_path_factory.mktemp("onnx")),
+    )
+
+    parity = compare(reference, encoder.encode(texts))
+
+    assert parity["min_cosine"] >= min_cosine, parity